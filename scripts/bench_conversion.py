@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: per-request GeminiProvider message/tool conversion time vs history
+length, with and without the conversion cache.
+
+Each "request" appends one user turn to the previous history, like a long TRPG
+session. No network calls are made.
+
+    PYTHONPATH=src python scripts/bench_conversion.py
+"""
+
+import time
+
+from llm_gateway.core.config import settings
+from llm_gateway.extensions.providers.gemini import GeminiProvider
+from llm_gateway.schemas.chat import ChatMessage
+
+HISTORY_LENGTHS = [10, 100, 500, 1000]
+REQUESTS = 50
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": f"tool_{i}",
+            "description": "Resolve a rule check for the current scene.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "actor": {"type": "string"},
+                    "skill": {"type": "string"},
+                    "difficulty": {"type": "integer"},
+                },
+                "required": ["actor", "skill"],
+            },
+        },
+    }
+    for i in range(20)
+]
+
+
+def build_history(length: int) -> list[ChatMessage]:
+    messages = [ChatMessage(role="system", content="You are the GM. " * 200)]
+    for turn in range(length):
+        if turn % 3 == 2:
+            messages.append(
+                ChatMessage(
+                    role="assistant",
+                    tool_calls=[
+                        {
+                            "id": "tool_0",
+                            "type": "function",
+                            "function": {
+                                "name": "tool_0",
+                                "arguments": f'{{"actor": "npc-{turn}", "skill": "x"}}',
+                            },
+                        }
+                    ],
+                )
+            )
+        else:
+            role = "user" if turn % 3 == 0 else "assistant"
+            messages.append(ChatMessage(role=role, content=f"Turn {turn}: " * 20))
+    return messages
+
+
+def run(provider: GeminiProvider, length: int, cached: bool) -> float:
+    messages = build_history(length)
+    elapsed = 0.0
+    for i in range(REQUESTS):
+        messages.append(ChatMessage(role="user", content=f"New action {i}"))
+        if not cached:
+            provider._convert_message_cached.cache_clear()
+            provider._convert_tools_cached.cache_clear()
+
+        start = time.perf_counter()
+        provider._convert_messages(messages)
+        provider._convert_tools(TOOLS)
+        elapsed += time.perf_counter() - start
+    return elapsed / REQUESTS * 1000
+
+
+def main():
+    settings.GOOGLE_API_KEY = settings.GOOGLE_API_KEY or "benchmark"
+    provider = GeminiProvider()
+
+    print(f"{'history':>8} {'uncached ms':>12} {'cached ms':>10} {'speedup':>8}")
+    for length in HISTORY_LENGTHS:
+        uncached = run(provider, length, cached=False)
+        provider._convert_message_cached.cache_clear()
+        cached = run(provider, length, cached=True)
+        speedup = uncached / cached
+        print(f"{length:>8} {uncached:>12.3f} {cached:>10.3f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: semantic cache lookup latency and hit rate vs index size.
+
+Fills the cache with N synthetic NPC questions spread over a few personas
+(context fingerprints), then looks up near-duplicates of stored questions
+(case/punctuation/plural edits) and unrelated questions. Embedding and index
+search are timed separately; the worst case is a single persona, where every
+entry is a candidate for the vectorized dot product.
+
+    PYTHONPATH=src python scripts/bench_semantic_cache.py [--personas 1]
+"""
+
+import argparse
+import random
+import time
+
+from llm_gateway.core.semantic_cache import HashingEmbedder, SemanticCache
+from llm_gateway.core.stats import percentile
+from llm_gateway.schemas.chat import (
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+    ChatResponseChoice,
+)
+
+SIZES = [1_000, 10_000, 100_000]
+LOOKUPS = 1_000
+
+VERBS = ["buy", "sell", "find", "repair", "forge", "steal", "trade", "enchant"]
+ITEMS = ["sword", "shield", "helmet", "bow", "potion", "ring", "map", "lantern"]
+PLACES = ["here", "in town", "near the docks", "at the keep", "in the forest"]
+
+RESPONSE = ChatResponse(
+    id="chatcmpl-benchmark",
+    created=1234567890,
+    model="gemini-2.0-flash",
+    choices=[
+        ChatResponseChoice(
+            index=0,
+            message=ChatMessage(role="assistant", content="Ask the smith."),
+            finish_reason="stop",
+        )
+    ],
+)
+
+
+def question(rng: random.Random, serial: int) -> str:
+    # serial로 질문을 서로 다르게 만든다 (같은 질문의 중복 저장 방지)
+    return (
+        f"Where can I {rng.choice(VERBS)} a {rng.choice(ITEMS)} "
+        f"{rng.choice(PLACES)} for {serial} gold?"
+    )
+
+
+def near_duplicate(text: str) -> str:
+    return text.lower().rstrip("?").replace(" a ", " the ")
+
+
+def make_request(persona: int, text: str) -> ChatRequest:
+    return ChatRequest(
+        model="gemini-2.0-flash",
+        messages=[
+            ChatMessage(role="system", content=f"You are NPC #{persona}."),
+            ChatMessage(role="user", content=text),
+        ],
+    )
+
+
+def run(size: int, personas: int, rng: random.Random) -> None:
+    cache = SemanticCache(HashingEmbedder(), max_entries=size)
+    stored = []
+    for serial in range(size):
+        request = make_request(serial % personas, question(rng, serial))
+        cache.set(cache.key(request), RESPONSE)
+        stored.append(request)
+
+    embed_seconds, search_seconds = [], []
+    hits = false_hits = 0
+    for i in range(LOOKUPS):
+        original = rng.choice(stored)
+        persona = original.messages[0].content
+        if i % 2 == 0:
+            text = near_duplicate(original.messages[1].content)
+        else:
+            text = f"Tell me a story about {rng.choice(ITEMS)} number {i}."
+        request = original.model_copy(
+            update={
+                "messages": [
+                    ChatMessage(role="system", content=persona),
+                    ChatMessage(role="user", content=text),
+                ]
+            }
+        )
+
+        started = time.perf_counter()
+        key = cache.key(request)
+        embedded = time.perf_counter()
+        response, _ = cache.get(key)
+        searched = time.perf_counter()
+        embed_seconds.append(embedded - started)
+        search_seconds.append(searched - embedded)
+        if response is not None:
+            if i % 2 == 0:
+                hits += 1
+            else:
+                false_hits += 1
+
+    megabytes = (cache._vectors.nbytes + cache._fingerprints.nbytes) / 1e6
+    print(
+        f"{size:>8,} entries {personas:>3} personas {megabytes:7.1f} MB | "
+        f"embed p50 {percentile(embed_seconds, 50) * 1e3:6.3f} ms | "
+        f"search p50 {percentile(search_seconds, 50) * 1e3:6.3f} ms "
+        f"p95 {percentile(search_seconds, 95) * 1e3:6.3f} ms | "
+        f"near-dup hit rate {hits / (LOOKUPS / 2):5.1%} "
+        f"false hits {false_hits}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--personas", type=int, nargs="*", default=[1, 50])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for personas in args.personas:
+        for size in SIZES:
+            run(size, personas, rng)
+
+
+if __name__ == "__main__":
+    main()
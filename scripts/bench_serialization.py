@@ -0,0 +1,123 @@
+"""
+Benchmark: gateway CPU time per /chat/completions request vs history length,
+comparing the default FastAPI body/response_model path with the gateway's
+direct JSON path (`model_validate_json` + `model_dump_json`).
+
+Requests go through the ASGI app in-process with a stub engine and only the
+CPU time spent inside the app is counted (HTTP handling, validation and
+serialization; not the benchmark client).
+
+    PYTHONPATH=src python scripts/bench_serialization.py
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from llm_gateway.api.v1 import chat
+from llm_gateway.schemas.chat import (
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+    ChatResponseChoice,
+    ChatUsage,
+)
+
+HISTORY_LENGTHS = [10, 100, 1000]
+REQUESTS = 200
+
+RESPONSE = ChatResponse(
+    id="chatcmpl-benchmark",
+    created=1234567890,
+    model="gemini-2.0-flash",
+    choices=[
+        ChatResponseChoice(
+            index=0,
+            message=ChatMessage(role="assistant", content="The goblin flees. " * 50),
+            finish_reason="stop",
+        )
+    ],
+    usage=ChatUsage(prompt_tokens=1000, completion_tokens=200, total_tokens=1200),
+)
+
+
+class StubEngine:
+    async def chat(self, request: ChatRequest, client: str | None = None):
+        return RESPONSE
+
+
+def build_body(length: int) -> bytes:
+    messages = [{"role": "system", "content": "You are the GM. " * 200}]
+    for turn in range(length):
+        role = "user" if turn % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": f"Turn {turn}: " * 20})
+    return json.dumps({"model": "gemini-2.0-flash", "messages": messages}).encode()
+
+
+def build_apps() -> dict[str, FastAPI]:
+    baseline = FastAPI()
+
+    # 기존 방식: FastAPI가 body를 dict로 파싱 후 검증하고, 응답을 다시 검증/인코딩
+    @baseline.post("/api/v1/chat/completions", response_model=ChatResponse)
+    async def completions(request: ChatRequest):
+        return await StubEngine().chat(request)
+
+    gateway = FastAPI()
+    gateway.include_router(chat.router, prefix="/api/v1/chat")
+
+    for app in (baseline, gateway):
+        app.state.engine = StubEngine()
+    return {"fastapi": baseline, "gateway": gateway}
+
+
+class CPUTimer:
+    """
+    ASGI wrapper accumulating CPU time spent inside the app.
+    """
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self.elapsed = 0.0
+
+    async def __call__(self, scope, receive, send):
+        start = time.process_time()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.elapsed += time.process_time() - start
+
+
+async def run(app: FastAPI, body: bytes) -> float:
+    timer = CPUTimer(app)
+    transport = httpx.ASGITransport(app=timer)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        headers = {"Content-Type": "application/json"}
+        # warm-up
+        await c.post("/api/v1/chat/completions", content=body, headers=headers)
+
+        timer.elapsed = 0.0
+        for _ in range(REQUESTS):
+            response = await c.post(
+                "/api/v1/chat/completions", content=body, headers=headers
+            )
+            assert response.status_code == 200
+        return timer.elapsed / REQUESTS * 1000
+
+
+async def main():
+    apps = build_apps()
+
+    print(f"{'history':>8} {'fastapi ms':>11} {'gateway ms':>11} {'speedup':>8}")
+    for length in HISTORY_LENGTHS:
+        body = build_body(length)
+        baseline = await run(apps["fastapi"], body)
+        gateway = await run(apps["gateway"], body)
+        speedup = baseline / gateway
+        print(f"{length:>8} {baseline:>11.3f} {gateway:>11.3f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
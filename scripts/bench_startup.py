@@ -0,0 +1,102 @@
+"""
+Cold-start benchmark: time module import, app construction, lifespan startup
+(provider construction, SDK import, connection warm-up) and the first and
+second request, each in a fresh interpreter.
+
+With a real GOOGLE_API_KEY and a Gemini model, compare `--no-warmup` to see the
+TLS setup the first request pays without pre-warming:
+
+    PYTHONPATH=src python scripts/bench_startup.py --model gemini-2.0-flash-lite-001
+    PYTHONPATH=src python scripts/bench_startup.py --model gemini-2.0-flash-lite-001 \\
+        --no-warmup
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+CHILD = """
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+import httpx
+from llm_gateway.core.config import settings
+
+settings.GOOGLE_API_KEY = settings.GOOGLE_API_KEY or "bench"
+settings.FAKE_PROVIDER_ENABLED = True
+settings.FAKE_PROVIDER_LATENCY_DISTRIBUTION = "constant"
+settings.FAKE_PROVIDER_LATENCY_SECONDS = 0.0
+settings.STARTUP_WARMUP_ENABLED = {warmup}
+settings.RESPONSE_CACHE_ENABLED = False
+
+from llm_gateway.main import app
+
+imported = time.perf_counter()
+genai_early = "google.genai" in sys.modules
+gateway = app()
+built = time.perf_counter()
+
+
+async def main():
+    timings = {{}}
+    async with gateway.router.lifespan_context(gateway):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=gateway)
+        async with httpx.AsyncClient(transport=transport, base_url="http://b") as c:
+            for name in ("first_request", "second_request"):
+                payload = {{
+                    "model": "{model}",
+                    "messages": [{{"role": "user", "content": name}}],
+                }}
+                t = time.perf_counter()
+                response = await c.post("/api/v1/chat/completions", json=payload)
+                timings[name] = time.perf_counter() - t
+                timings[name + "_status"] = response.status_code
+    timings.update(
+        import_seconds=imported - started,
+        app_seconds=built - imported,
+        lifespan_startup_seconds=ready - built,
+        genai_imported_before_startup=genai_early,
+    )
+    print(json.dumps(timings))
+
+
+asyncio.run(main())
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", default="fake-model")
+    parser.add_argument("--no-warmup", action="store_true")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    code = CHILD.format(warmup=not args.no_warmup, model=args.model)
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=os.environ,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    for run in runs:
+        print(
+            f"import={run['import_seconds'] * 1000:.0f}ms "
+            f"app={run['app_seconds'] * 1000:.1f}ms "
+            f"startup={run['lifespan_startup_seconds'] * 1000:.0f}ms "
+            f"first={run['first_request'] * 1000:.1f}ms "
+            f"second={run['second_request'] * 1000:.1f}ms "
+            f"genai_at_import={run['genai_imported_before_startup']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Load test: drive the gateway at increasing concurrency against the fake
+provider and record throughput, latency percentiles and gateway overhead.
+
+By default the real `main.app()` runs in-process (ASGI transport) with the fake
+provider enabled, so no quota is spent. Use `--url` to target a running
+gateway instead (start it with FAKE_PROVIDER_ENABLED=true). The in-process
+transport buffers response bodies, so use `--url` for meaningful TTFT numbers
+with `--stream`.
+
+Results are written as JSON; pass `--baseline` with a previous results file to
+fail (exit 1) when throughput or p95 latency regress beyond `--max-regression`.
+
+    PYTHONPATH=src python scripts/loadtest.py --concurrency 1,8,32,128 \\
+        --output loadtest.json --baseline loadtest-main.json
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import subprocess
+import sys
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from importlib import metadata
+from pathlib import Path
+
+import httpx
+
+from llm_gateway.core.config import settings
+from llm_gateway.core.stats import percentile
+
+ROUTE = "/api/v1/chat/completions"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="running gateway (default: in-process app)")
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--requests", type=int, default=200, help="per level")
+    parser.add_argument("--history", type=int, default=20, help="messages/request")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--model", default="fake-model")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds")
+    parser.add_argument(
+        "--distribution",
+        choices=["constant", "uniform", "lognormal"],
+        default="lognormal",
+    )
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--output", type=Path, default=Path("loadtest-results.json"))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+@asynccontextmanager
+async def build_client(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    timeout = httpx.Timeout(120.0)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+            yield client
+        return
+
+    settings.GOOGLE_API_KEY = settings.GOOGLE_API_KEY or "loadtest"
+    settings.FAKE_PROVIDER_ENABLED = True
+    settings.FAKE_PROVIDER_LATENCY_SECONDS = args.latency
+    settings.FAKE_PROVIDER_LATENCY_DISTRIBUTION = args.distribution
+    settings.FAKE_PROVIDER_LATENCY_SPREAD = args.spread
+    settings.FAKE_PROVIDER_ERROR_RATE = args.error_rate
+    settings.FAKE_PROVIDER_TOKENS_PER_SECOND = args.tokens_per_second
+
+    from llm_gateway.main import app
+
+    gateway = app()
+    # ASGITransport는 lifespan을 실행하지 않으므로 직접 startup/shutdown 한다
+    async with gateway.router.lifespan_context(gateway):
+        transport = httpx.ASGITransport(app=gateway)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=timeout
+        ) as client:
+            yield client
+
+
+def build_payload(args: argparse.Namespace, level: int, i: int) -> dict:
+    messages = [{"role": "system", "content": "You are the GM. " * 50}]
+    for turn in range(args.history - 1):
+        role = "user" if turn % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": f"Turn {turn}: " * 20})
+    # 요청마다 내용을 달리해 캐시/coalescing에 걸리지 않게 한다
+    messages.append({"role": "user", "content": f"Action {level}-{i}"})
+    return {"model": args.model, "messages": messages, "stream": args.stream}
+
+
+async def overhead_totals(client: httpx.AsyncClient) -> tuple[float, float]:
+    text = (await client.get("/metrics")).text
+    totals = []
+    for suffix in ("sum", "count"):
+        match = re.search(
+            rf'^llm_gateway_overhead_duration_seconds_{suffix}\{{route="{ROUTE}"\}} '
+            r"(\S+)$",
+            text,
+            re.MULTILINE,
+        )
+        totals.append(float(match.group(1)) if match else 0.0)
+    return totals[0], totals[1]
+
+
+async def send(
+    client: httpx.AsyncClient, payload: dict, stream: bool
+) -> tuple[float, float | None]:
+    started = time.perf_counter()
+    ttft = None
+    if not stream:
+        response = await client.post(ROUTE, json=payload)
+        response.raise_for_status()
+        return time.perf_counter() - started, ttft
+
+    async with client.stream("POST", ROUTE, json=payload) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if ttft is None and line.startswith("data: "):
+                ttft = time.perf_counter() - started
+            if '"error"' in line:
+                raise RuntimeError(line)
+    return time.perf_counter() - started, ttft
+
+
+async def run_level(
+    client: httpx.AsyncClient, args: argparse.Namespace, concurrency: int
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    ttfts: list[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            try:
+                latency, ttft = await send(
+                    client, build_payload(args, concurrency, i), args.stream
+                )
+            except Exception:
+                errors += 1
+                return
+            latencies.append(latency)
+            if ttft is not None:
+                ttfts.append(ttft)
+
+    overhead_sum, overhead_count = await overhead_totals(client)
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    new_sum, new_count = await overhead_totals(client)
+
+    def ms(values: list[float]) -> dict:
+        return {f"p{q}": round(percentile(values, q) * 1000, 3) for q in (50, 95, 99)}
+
+    result = {
+        "concurrency": concurrency,
+        "requests": args.requests,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3),
+        "latency_ms": ms(latencies),
+        # 요청 전체 시간 중 upstream(fake provider)을 기다리지 않은 시간
+        "overhead_ms_mean": round(
+            (new_sum - overhead_sum) / (new_count - overhead_count) * 1000, 3
+        )
+        if new_count > overhead_count
+        else None,
+    }
+    if args.stream:
+        result["ttft_ms"] = ms(ttfts)
+
+    # 적응형 동시성 제한이 처리량을 제한하고 있는지 함께 기록한다
+    scheduler = (await client.get("/api/v1/admin/scheduler")).json()
+    if scheduler.get("enabled"):
+        model = scheduler["models"].get(args.model, {})
+        result["scheduler_limit"] = model.get("limit")
+        result["scheduler_shed"] = scheduler["shed"]
+    return result
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def package_version() -> str | None:
+    try:
+        return metadata.version("llm-gateway")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    previous = {level["concurrency"]: level for level in baseline["levels"]}
+    regressions = []
+    for level in results["levels"]:
+        base = previous.get(level["concurrency"])
+        if base is None:
+            continue
+        if level["throughput_rps"] < base["throughput_rps"] * (1 - max_regression):
+            regressions.append(
+                f"c={level['concurrency']}: throughput {level['throughput_rps']} "
+                f"< baseline {base['throughput_rps']}"
+            )
+        p95, base_p95 = level["latency_ms"]["p95"], base["latency_ms"]["p95"]
+        if p95 > base_p95 * (1 + max_regression):
+            regressions.append(
+                f"c={level['concurrency']}: p95 {p95}ms > baseline {base_p95}ms"
+            )
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict:
+    levels = [int(c) for c in args.concurrency.split(",")]
+    results = {
+        "version": package_version(),
+        "commit": git_commit(),
+        "timestamp": datetime.now(UTC).isoformat(),
+        "target": args.url or "in-process",
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "baseline")
+        },
+        "levels": [],
+    }
+
+    async with build_client(args) as client:
+        for concurrency in levels:
+            level = await run_level(client, args, concurrency)
+            results["levels"].append(level)
+            print(
+                f"c={concurrency:<4} rps={level['throughput_rps']:<9} "
+                f"p50={level['latency_ms']['p50']}ms "
+                f"p95={level['latency_ms']['p95']}ms "
+                f"p99={level['latency_ms']['p99']}ms "
+                f"overhead={level['overhead_ms_mean']}ms "
+                f"errors={level['errors']}",
+                file=sys.stderr,
+            )
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Local stand-in for LangSmith: accepts the gateway's trace batches and prints
+each request's stage waterfall, slowest first within a batch.
+
+Point the gateway at it and export every request:
+
+    PYTHONPATH=src python scripts/trace_collector.py [--port 1984]
+    LANGSMITH_TRACING=true LANGSMITH_ENDPOINT=http://127.0.0.1:1984 \
+        TRACING_SAMPLE_RATE=1.0 uvicorn llm_gateway.main:app --factory
+"""
+
+import argparse
+from collections import defaultdict
+from datetime import datetime
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+app = FastAPI()
+
+
+def _seconds(run: dict) -> float:
+    start = datetime.fromisoformat(run["start_time"])
+    end = datetime.fromisoformat(run["end_time"])
+    return (end - start).total_seconds()
+
+
+def _print_trace(runs: list[dict]) -> None:
+    runs.sort(key=lambda run: run["dotted_order"])
+    root = runs[0]
+    started = datetime.fromisoformat(root["start_time"])
+    metadata = root["extra"]["metadata"]
+    print(f"\n{root['name']}  {_seconds(root) * 1000:.1f}ms  {metadata}")
+    for run in runs[1:]:
+        depth = run["dotted_order"].count(".")
+        offset = (datetime.fromisoformat(run["start_time"]) - started).total_seconds()
+        error = f"  error={run['error']}" if "error" in run else ""
+        print(
+            f"  {'  ' * (depth - 1)}{run['name']:<{24 - 2 * depth}}"
+            f" +{offset * 1000:8.1f}ms {_seconds(run) * 1000:8.1f}ms{error}"
+        )
+
+
+@app.post("/runs/batch")
+async def runs_batch(request: Request):
+    traces = defaultdict(list)
+    for run in (await request.json()).get("post", []):
+        traces[run["trace_id"]].append(run)
+    for runs in sorted(
+        traces.values(),
+        key=lambda runs: -max(_seconds(run) for run in runs),
+    ):
+        _print_trace(runs)
+    return {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1984)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
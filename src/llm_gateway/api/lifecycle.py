@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class RequestTracker:
+    """
+    Counts in-flight HTTP requests (open streams included) so shutdown can
+    wait for them to finish.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.draining = False
+        # cold start 이후 첫 요청이 걸린 시간 (warm-up 효과 확인용)
+        self.first_request_seconds: float | None = None
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def enter(self) -> None:
+        self.in_flight += 1
+        self._idle.clear()
+
+    def exit(self) -> None:
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Wait up to `timeout` seconds for the in-flight requests. Returns how
+        many were still running at the deadline.
+        """
+        self.draining = True
+        try:
+            async with asyncio.timeout(timeout):
+                await self._idle.wait()
+        except TimeoutError:
+            pass
+        return self.in_flight
+
+
+class DrainMiddleware:
+    """
+    Pure ASGI middleware feeding a RequestTracker. New connections are
+    refused by the server itself once shutdown starts (uvicorn stops
+    listening before running the lifespan shutdown), so this only counts.
+    """
+
+    def __init__(self, app: ASGIApp, tracker: RequestTracker):
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.tracker.enter()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if self.tracker.first_request_seconds is None:
+                self.tracker.first_request_seconds = time.perf_counter() - started
+            self.tracker.exit()
@@ -0,0 +1,251 @@
+import time
+from collections.abc import Iterable
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from llm_gateway.core.metrics import (
+    GATEWAY_OVERHEAD_SECONDS,
+    HTTP_IN_FLIGHT,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    registry,
+    start_request_timer,
+)
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def route_label(scope: Scope) -> str:
+    """
+    Bounded route name for a request: the matched path, or the route template
+    when it has path parameters.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    # path parameter가 있으면 label cardinality를 막기 위해 템플릿을 쓴다
+    # (include_router의 route.path에는 prefix가 빠져 있을 수 있다)
+    if "{" in route.path:
+        return route.path
+    return scope["path"]
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request counts, status codes, latency and
+    the part of it not spent waiting on upstream providers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._in_flight = HTTP_IN_FLIGHT.labels()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        upstream = start_request_timer()
+        self._in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._in_flight.dec()
+
+            path = route_label(scope)
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, path, str(status)).inc()
+            HTTP_REQUEST_SECONDS.labels(method, path).observe(elapsed)
+            GATEWAY_OVERHEAD_SECONDS.labels(path).observe(
+                max(0.0, elapsed - upstream[0])
+            )
+
+
+def _engine_families(engine) -> Iterable[tuple]:
+    """
+    State that already lives in engine components, read at scrape time.
+    """
+    resilience = getattr(engine.router, "resilience", None)
+    if resilience is not None:
+        yield (
+            "llm_gateway_circuit_breaker_open",
+            "gauge",
+            "1 if the circuit breaker is open or half-open.",
+            [
+                ({"breaker": name}, 0 if breaker.state.value == "closed" else 1)
+                for name, breaker in resilience.breakers.items()
+            ],
+        )
+        yield (
+            "llm_gateway_circuit_breaker_transitions",
+            "counter",
+            "Circuit breaker state transitions.",
+            [
+                ({"breaker": name, "from": previous, "to": state}, count)
+                for (name, previous, state), count in resilience.transitions.items()
+            ],
+        )
+
+    if engine.cache is not None:
+        stats = engine.cache.stats()
+        yield (
+            "llm_gateway_response_cache_hits",
+            "counter",
+            "Response cache hits.",
+            [({}, stats["hits"])],
+        )
+        yield (
+            "llm_gateway_response_cache_misses",
+            "counter",
+            "Response cache misses.",
+            [({}, stats["misses"])],
+        )
+
+    if engine.semantic_cache is not None:
+        stats = engine.semantic_cache.stats()
+        yield (
+            "llm_gateway_semantic_cache_hits",
+            "counter",
+            "Semantic cache hits.",
+            [({}, stats["hits"])],
+        )
+        yield (
+            "llm_gateway_semantic_cache_misses",
+            "counter",
+            "Semantic cache misses.",
+            [({}, stats["misses"])],
+        )
+        yield (
+            "llm_gateway_semantic_cache_entries",
+            "gauge",
+            "Semantic cache entries.",
+            [({}, stats["entries"])],
+        )
+
+    if engine.structured is not None:
+        schemas = engine.structured.stats()["schemas"]
+        yield (
+            "llm_gateway_structured_output_validations",
+            "counter",
+            "Structured output validations by schema and outcome.",
+            [
+                ({"schema": name, "outcome": outcome}, count)
+                for name, stats in schemas.items()
+                for outcome, count in (
+                    ("valid", stats["validations"] - stats["failures"]),
+                    ("invalid", stats["failures"]),
+                )
+            ],
+        )
+        yield (
+            "llm_gateway_structured_output_retries",
+            "counter",
+            "Requests re-sent to the model after failing validation.",
+            [({"schema": name}, stats["retries"]) for name, stats in schemas.items()],
+        )
+        yield (
+            "llm_gateway_structured_output_validation_seconds",
+            "counter",
+            "Time spent validating structured output.",
+            [
+                ({"schema": name}, stats["validation_seconds"])
+                for name, stats in schemas.items()
+            ],
+        )
+
+
+def _pool_families(transport) -> Iterable[tuple]:
+    stats = transport.stats()
+    yield (
+        "llm_gateway_upstream_pool_connections",
+        "gauge",
+        "Upstream HTTP connections by state.",
+        [
+            ({"state": "active"}, stats["active_connections"]),
+            ({"state": "idle"}, stats["idle_connections"]),
+        ],
+    )
+    yield (
+        "llm_gateway_upstream_pool_max_connections",
+        "gauge",
+        "Upstream HTTP connection pool size limit.",
+        [({}, stats["max_connections"])],
+    )
+    yield (
+        "llm_gateway_upstream_pool_waiting",
+        "gauge",
+        "Upstream requests waiting for a pooled connection.",
+        [({}, stats["waiting_for_connection"])],
+    )
+    yield (
+        "llm_gateway_upstream_pool_timeouts",
+        "counter",
+        "Upstream requests that timed out waiting for a pooled connection.",
+        [({}, stats["pool_timeouts"])],
+    )
+
+
+def _tracing_families(tracer) -> Iterable[tuple]:
+    stats = tracer.stats()["export"]
+    if stats is None:
+        return
+    yield (
+        "llm_gateway_traces_exported",
+        "counter",
+        "Traces exported to the trace collector.",
+        [({}, stats["exported"])],
+    )
+    yield (
+        "llm_gateway_traces_dropped",
+        "counter",
+        "Traces dropped because the export queue was full.",
+        [({}, stats["dropped"])],
+    )
+    yield (
+        "llm_gateway_trace_export_failures",
+        "counter",
+        "Traces in batches the collector failed to accept.",
+        [({}, stats["failed"])],
+    )
+    yield (
+        "llm_gateway_trace_export_queue",
+        "gauge",
+        "Traces waiting in the export queue.",
+        [({}, stats["queued"])],
+    )
+
+
+def _samples(name: str, kind: str, samples) -> Iterable[tuple]:
+    suffix = "_total" if kind == "counter" else ""
+    for labels, value in samples:
+        yield f"{name}{suffix}", labels, value
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    families = list(_engine_families(request.app.state.engine))
+    transport = getattr(request.app.state, "upstream_transport", None)
+    if transport is not None:
+        families.extend(_pool_families(transport))
+    tracer = getattr(request.app.state, "tracer", None)
+    if tracer is not None:
+        families.extend(_tracing_families(tracer))
+    extra = [
+        (name, kind, documentation, _samples(name, kind, samples))
+        for name, kind, documentation, samples in families
+    ]
+    return PlainTextResponse(registry.render(extra), media_type=CONTENT_TYPE)
@@ -0,0 +1,43 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from llm_gateway.api.metrics import route_label
+from llm_gateway.core.tracing import Tracer
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening a trace per request. When enabled, stages
+    finished before the response starts are reported in a Server-Timing header
+    (for streams that is everything up to the first chunk); the whole trace is
+    handed to the tracer for sampled export once the response is done.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer, server_timing: bool = False):
+        self.app = app
+        self.tracer = tracer
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = self.tracer.begin(f"{scope['method']} {scope['path']}")
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", trace.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 경로 label과 같은 기준으로 이름을 붙여 trace를 route별로 묶는다
+            trace.root.name = f"{scope['method']} {route_label(scope)}"
+            self.tracer.end(trace, status=status)
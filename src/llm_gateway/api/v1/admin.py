@@ -0,0 +1,139 @@
+# admin.py
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Request
+
+router = APIRouter()
+
+
+@router.get("/cache")
+async def cache_stats(request: Request):
+    cache = request.app.state.engine.cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/semantic-cache")
+async def semantic_cache_stats(request: Request):
+    semantic_cache = request.app.state.engine.semantic_cache
+    if semantic_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **semantic_cache.stats()}
+
+
+@router.get("/structured-output")
+async def structured_output_stats(request: Request):
+    structured = request.app.state.engine.structured
+    if structured is None:
+        return {"enabled": False}
+    return {"enabled": True, **structured.stats()}
+
+
+@router.get("/tracing")
+async def tracing_stats(request: Request):
+    tracer = request.app.state.tracer
+    if tracer is None:
+        return {"enabled": False}
+    return {"enabled": True, **tracer.stats()}
+
+
+@router.get("/coalescing")
+async def coalescing_stats(request: Request):
+    coalescer = request.app.state.engine.coalescer
+    if coalescer is None:
+        return {"enabled": False}
+    return {"enabled": True, **coalescer.stats()}
+
+
+@router.get("/compaction")
+async def compaction_stats(request: Request):
+    compactor = request.app.state.engine.compactor
+    if compactor is None:
+        return {"enabled": False}
+    return {"enabled": True, **compactor.stats()}
+
+
+@router.get("/scheduler")
+async def scheduler_stats(request: Request):
+    scheduler = request.app.state.engine.scheduler
+    if scheduler is None:
+        return {"enabled": False}
+    return {"enabled": True, **scheduler.stats()}
+
+
+@router.get("/rate-limits")
+async def rate_limit_stats(request: Request):
+    rate_limiter = request.app.state.engine.rate_limiter
+    if rate_limiter is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "shared": rate_limiter.store is not None,
+        "shared_failures": rate_limiter.shared_failures,
+        "limits": rate_limiter.stats(),
+    }
+
+
+@router.get("/hedging")
+async def hedging_stats(request: Request):
+    hedging = getattr(request.app.state.engine.router, "hedging", None)
+    if hedging is None:
+        return {"enabled": False}
+    return {"enabled": True, **hedging.stats()}
+
+
+@router.get("/breakers")
+async def breaker_stats(request: Request):
+    resilience = getattr(request.app.state.engine.router, "resilience", None)
+    if resilience is None:
+        return {"enabled": False}
+    return {"enabled": True, **resilience.stats()}
+
+
+@router.get("/upstream-pool")
+async def upstream_pool_stats(request: Request):
+    return request.app.state.upstream_transport.stats()
+
+
+@router.get("/routing")
+async def routing_stats(request: Request):
+    engine_router = request.app.state.engine.router
+    if not hasattr(engine_router, "stats"):
+        return {"adaptive": False}
+    return {"adaptive": True, **engine_router.stats()}
+
+
+@router.get("/usage")
+async def usage_stats(
+    request: Request,
+    client: str | None = None,
+    scope: Literal["worker", "cluster"] = "worker",
+):
+    usage = request.app.state.engine.usage
+    if usage is None:
+        return {"enabled": False}
+    if scope == "worker":
+        return {"enabled": True, **usage.report(client)}
+    # cluster: 모든 worker가 flush한 공유 카운터 기준
+    if usage.store is None:
+        raise HTTPException(status_code=400, detail="No shared state store.")
+    return {"enabled": True, **await usage.cluster_report(client)}
+
+
+@router.get("/lifecycle")
+async def lifecycle_stats(request: Request):
+    state = request.app.state
+    return {
+        "startup_seconds": getattr(state, "startup_seconds", None),
+        "first_request_seconds": state.requests.first_request_seconds,
+        "in_flight": state.requests.in_flight,
+        "draining": state.requests.draining,
+    }
+
+
+@router.get("/state")
+async def state_stats(request: Request):
+    state = request.app.state.state_store
+    stats = state.stats() if hasattr(state, "stats") else {}
+    return {"backend": type(state).__name__, "shared": state.shared, **stats}
@@ -1,19 +1,146 @@
 # chat.py
+import json
+from collections.abc import AsyncIterator
+
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
 
-from llm_gateway.schemas.chat import ChatRequest, ChatResponse
+from llm_gateway.core.config import settings
+from llm_gateway.core.engine import LLMEngine
+from llm_gateway.core.exceptions import GatewayError
+from llm_gateway.core.tracing import annotate, span
+from llm_gateway.schemas.chat import (
+    ChatBatchRequest,
+    ChatCompletionChunk,
+    ChatRequest,
+    ChatResponse,
+)
 
 router = APIRouter()
 
 
-@router.post("/completions", response_model=ChatResponse)
-async def chat_completions(request: Request, body: ChatRequest):
+def _error_status(error: Exception) -> tuple[int, str]:
+    if isinstance(error, ValueError):
+        return 400, str(error)
+    if isinstance(error, GatewayError):
+        return error.status_code, str(error)
+    return 500, "Internal Server Error"
+
+
+async def _parse_request(request: Request) -> ChatRequest:
+    """
+    Validate the raw body straight from JSON bytes (no intermediate dict).
+    """
+    body = await request.body()
+    try:
+        with span("validate", bytes=len(body)):
+            return ChatRequest.model_validate_json(body)
+    except ValidationError as e:
+        # FastAPI 기본 body 검증과 같은 422 응답 형식을 유지한다
+        raise RequestValidationError(
+            [
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ]
+        ) from e
+
+
+async def _sse_events(
+    first: ChatCompletionChunk | None, stream: AsyncIterator[ChatCompletionChunk]
+) -> AsyncIterator[str]:
+    if first is None:
+        # upstream이 청크 없이 끝났으면 [DONE]만 보낸다
+        yield "data: [DONE]\n\n"
+        return
+    yield f"data: {first.model_dump_json(exclude_none=True)}\n\n"
+    try:
+        async for chunk in stream:
+            yield f"data: {chunk.model_dump_json(exclude_none=True)}\n\n"
+    except Exception as e:
+        # 헤더가 이미 전송된 뒤라 상태 코드를 바꿀 수 없으므로 에러 이벤트로 알린다
+        _, message = _error_status(e)
+        error = {"error": {"message": message, "type": "server_error"}}
+        yield f"data: {json.dumps(error)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@router.post(
+    "/completions",
+    response_model=ChatResponse,
+    # body는 _parse_request에서 직접 읽으므로 문서용 스키마만 등록한다
+    # (ChatRequest 스키마는 /batch 요청 스키마를 통해 components에 포함된다)
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": "#/components/schemas/ChatRequest"}
+                }
+            },
+        }
+    },
+)
+async def chat_completions(request: Request):
+    body = await _parse_request(request)
     try:
         engine = request.app.state.engine
-        return await engine.chat(body)
+        client = request.headers.get("X-Client-Id")
+        annotate(model=body.model, stream=body.stream, n=body.n, client=client)
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e)) from e
+        if body.stream:
+            stream = engine.chat_stream(body, client=client)
+            # 첫 청크까지는 일반 응답처럼 에러를 HTTP 상태 코드로 돌려준다
+            first = await anext(stream, None)
+            return StreamingResponse(
+                _sse_events(first, stream),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
+        response = await engine.chat(body, client=client)
+        # 엔진 응답은 이미 검증된 모델이므로 response_model 재검증 없이 직렬화한다
+        with span("serialize"):
+            content = response.model_dump_json()
+        return Response(content, media_type="application/json")
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail="Internal Server Error") from e
+        status_code, detail = _error_status(e)
+        raise HTTPException(status_code=status_code, detail=detail) from e
+
+
+async def _ndjson_results(
+    engine: LLMEngine, body: ChatBatchRequest, client: str | None
+) -> AsyncIterator[str]:
+    concurrency = min(
+        body.max_concurrency or settings.BATCH_MAX_CONCURRENCY,
+        settings.BATCH_MAX_CONCURRENCY,
+    )
+    async for index, result in engine.chat_batch(body.requests, concurrency, client):
+        if isinstance(result, Exception):
+            status_code, message = _error_status(result)
+            error = {"status_code": status_code, "message": message}
+            yield json.dumps({"index": index, "error": error}) + "\n"
+        else:
+            yield f'{{"index":{index},"response":{result.model_dump_json()}}}\n'
+
+
+@router.post("/batch")
+async def chat_batch(request: Request, body: ChatBatchRequest):
+    """
+    Run independent chat requests and stream each result as an NDJSON line
+    ({"index", "response"} or {"index", "error"}) as soon as it finishes.
+    """
+    if len(body.requests) > settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch size exceeds the limit of {settings.BATCH_MAX_SIZE}.",
+        )
+
+    return StreamingResponse(
+        _ndjson_results(
+            request.app.state.engine, body, request.headers.get("X-Client-Id")
+        ),
+        media_type="application/x-ndjson",
+    )
@@ -0,0 +1,228 @@
+"""
+Offline JSONL batch runner.
+
+Each input line is a ChatRequest JSON object with an extra "id" field. Results
+are appended to the output JSONL as {"id", "response"} or {"id", "error"} lines
+as soon as they finish. Ids that already have a response in the output file are
+skipped, so an interrupted run can be resumed with the same command.
+
+    llm-gateway-batch prompts.jsonl results.jsonl --concurrency 16 --rpm 600
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from llm_gateway.core.config import RateLimitQuota, settings
+from llm_gateway.core.engine import LLMEngine
+from llm_gateway.core.ratelimit import RateLimiter
+from llm_gateway.core.stats import percentile
+from llm_gateway.main import build_engine
+from llm_gateway.schemas.chat import ChatRequest
+
+CLIENT_ID = "batch-runner"
+
+
+@dataclass
+class BatchReport:
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "throughput_rps": round((self.completed + self.failed) / self.elapsed, 3)
+            if self.elapsed
+            else 0.0,
+            "latency_p50": round(percentile(self.latencies, 50), 3),
+            "latency_p95": round(percentile(self.latencies, 95), 3),
+            "latency_p99": round(percentile(self.latencies, 99), 3),
+        }
+
+
+def completed_ids(output_path: Path) -> set[str]:
+    """
+    Ids that already have a successful response in the output file.
+    """
+    done = set()
+    if not output_path.exists():
+        return done
+
+    with output_path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 비정상 종료로 잘린 마지막 줄
+                continue
+            if "response" in record:
+                done.add(str(record["id"]))
+    return done
+
+
+def read_requests(input_path: Path) -> Iterator[tuple[str, dict]]:
+    with input_path.open(encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield f"line-{line_number}", {"_error": f"Invalid JSON: {e}"}
+                continue
+            if not isinstance(payload, dict):
+                yield f"line-{line_number}", {"_error": "Expected a JSON object"}
+                continue
+            yield str(payload.pop("id", f"line-{line_number}")), payload
+
+
+async def run_batch(
+    engine: LLMEngine,
+    input_path: Path,
+    output_path: Path,
+    concurrency: int = 8,
+) -> BatchReport:
+    report = BatchReport()
+    done = completed_ids(output_path)
+
+    # 크래시로 마지막 줄이 잘렸으면 이어 쓰기 전에 줄바꿈을 넣는다
+    if output_path.exists() and output_path.stat().st_size:
+        with output_path.open("rb") as f:
+            f.seek(-1, 2)
+            needs_newline = f.read(1) != b"\n"
+    else:
+        needs_newline = False
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    start = time.perf_counter()
+
+    with output_path.open("a", encoding="utf-8") as out:
+        if needs_newline:
+            out.write("\n")
+
+        def write(record: dict) -> None:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+        async def worker() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                request_id, payload = item
+                started = time.perf_counter()
+                try:
+                    if "_error" in payload:
+                        raise ValueError(payload["_error"])
+                    request = ChatRequest.model_validate(payload)
+                    response = await engine.chat(request, client=CLIENT_ID)
+                except Exception as e:
+                    report.failed += 1
+                    write({"id": request_id, "error": str(e) or type(e).__name__})
+                else:
+                    report.completed += 1
+                    report.latencies.append(time.perf_counter() - started)
+                    write(
+                        {
+                            "id": request_id,
+                            "response": response.model_dump(mode="json"),
+                        }
+                    )
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            # 입력은 한 줄씩 읽어 bounded queue로 넘긴다 (전체를 메모리에 올리지 않음)
+            for request_id, payload in read_requests(input_path):
+                if request_id in done:
+                    report.skipped += 1
+                    continue
+                await queue.put((request_id, payload))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="llm-gateway-batch",
+        description="Run a JSONL file of ChatRequests through the LLM engine.",
+    )
+    parser.add_argument("input", type=Path, help="input JSONL (ChatRequest + id)")
+    parser.add_argument("output", type=Path, help="output JSONL (appended)")
+    parser.add_argument("--concurrency", type=positive_int, default=8)
+    parser.add_argument(
+        "--rpm",
+        type=positive_int,
+        help="requests per minute limit for this run (on top of RATE_LIMITS)",
+    )
+    parser.add_argument(
+        "--tpm",
+        type=positive_int,
+        help="tokens per minute limit for this run (on top of RATE_LIMITS)",
+    )
+    return parser.parse_args(argv)
+
+
+async def _run(engine: LLMEngine, args: argparse.Namespace) -> BatchReport:
+    if engine.usage is not None:
+        engine.usage.start()
+    try:
+        return await run_batch(
+            engine, args.input, args.output, concurrency=args.concurrency
+        )
+    finally:
+        # 서버 lifespan 종료와 같이 마지막 사용량 window를 내보내고 연결을 닫는다
+        if engine.usage is not None:
+            await engine.usage.aclose()
+        await engine.aclose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+
+    engine = build_engine()
+    if args.rpm or args.tpm:
+        # batch client quota로 추가한다 (설정된 모델/client quota도 그대로 적용)
+        engine.rate_limiter = RateLimiter(
+            model_quotas=settings.RATE_LIMITS,
+            client_quotas={
+                **settings.CLIENT_RATE_LIMITS,
+                CLIENT_ID: RateLimitQuota(rpm=args.rpm, tpm=args.tpm),
+            },
+            burst_seconds=settings.RATE_LIMIT_BURST_SECONDS,
+            max_wait_seconds=float("inf"),
+            store=engine.state,
+        )
+
+    report = asyncio.run(_run(engine, args))
+    print(json.dumps(report.summary(), indent=2), file=sys.stderr)
+    if report.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
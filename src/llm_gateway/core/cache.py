@@ -0,0 +1,121 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from llm_gateway.schemas.chat import ChatRequest, ChatResponse
+
+# 응답 내용에 영향을 주는 필드만 키에 포함한다 (stream, cache 등은 제외)
+_KEY_FIELDS = {
+    "model",
+    "messages",
+    "temperature",
+    "max_tokens",
+    "n",
+    "response_format",
+    "tools",
+    "tool_choice",
+}
+
+
+def request_cache_key(request: ChatRequest) -> str:
+    """
+    Canonical hash of the fields of a ChatRequest that determine its output.
+    """
+    payload = request.model_dump(include=_KEY_FIELDS)
+    canonical = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def is_cacheable(request: ChatRequest, max_temperature: float = 0.0) -> bool:
+    # 샘플링이 섞인 요청을 캐시하면 응답 다양성이 사라지므로 결정적 요청만 캐시
+    return (
+        request.cache and not request.stream and request.temperature <= max_temperature
+    )
+
+
+class ResponseCache:
+    """
+    Exact-match ChatResponse cache with LRU eviction bounded by entry count and
+    total bytes, and a per-entry TTL.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 300.0,
+        max_temperature: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_temperature = max_temperature
+        self._clock = clock
+
+        # key -> (expires_at, serialized response)
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def accepts(self, request: ChatRequest) -> bool:
+        return is_cacheable(request, self.max_temperature)
+
+    def get(self, key: str) -> ChatResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, data = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # 호출자가 응답을 수정해도 캐시가 오염되지 않도록 매번 새 객체를 만든다
+        return ChatResponse.model_validate_json(data)
+
+    def set(self, key: str, response: ChatResponse) -> None:
+        data = response.model_dump_json().encode()
+        if len(data) > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (self._clock() + self.ttl_seconds, data)
+        self._bytes += len(data)
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, data = self._entries.pop(key)
+        self._bytes -= len(data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,155 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from llm_gateway.schemas.chat import (
+    ChatCompletionChunk,
+    ChatRequest,
+    ChatResponse,
+    ChatUsage,
+    PromptTokensDetails,
+)
+
+
+def split_candidates(n: int, max_per_call: int) -> list[int]:
+    """
+    Candidate counts per upstream call for `n` candidates when one call can
+    generate at most `max_per_call` (e.g. 5 with 2 -> [2, 2, 1]).
+    """
+    max_per_call = max(1, max_per_call)
+    return [min(max_per_call, n - start) for start in range(0, n, max_per_call)]
+
+
+def _offsets(parts: list[int]) -> list[int]:
+    offsets, total = [], 0
+    for count in parts:
+        offsets.append(total)
+        total += count
+    return offsets
+
+
+def merge_usage(usages: list[ChatUsage | None]) -> ChatUsage | None:
+    # 각 호출이 prompt를 따로 보내므로 prompt 토큰도 호출마다 청구된다
+    usages = [usage for usage in usages if usage is not None]
+    if not usages:
+        return None
+    return ChatUsage(
+        prompt_tokens=sum(u.prompt_tokens for u in usages),
+        completion_tokens=sum(u.completion_tokens for u in usages),
+        total_tokens=sum(u.total_tokens for u in usages),
+        prompt_tokens_details=PromptTokensDetails(
+            cached_tokens=sum(
+                u.prompt_tokens_details.cached_tokens
+                for u in usages
+                if u.prompt_tokens_details is not None
+            )
+        ),
+    )
+
+
+def merge_responses(responses: list[ChatResponse]) -> ChatResponse:
+    """
+    One response holding every candidate, re-indexed in call order.
+    """
+    choices = []
+    for response in responses:
+        for choice in response.choices:
+            choices.append(choice.model_copy(update={"index": len(choices)}))
+    return responses[0].model_copy(
+        update={
+            "choices": choices,
+            "usage": merge_usage([response.usage for response in responses]),
+        }
+    )
+
+
+async def fan_out(
+    request: ChatRequest,
+    parts: list[int],
+    call: Callable[[ChatRequest], Awaitable[ChatResponse]],
+) -> ChatResponse:
+    """
+    Generate `request.n` candidates with one concurrent call per part. The
+    request is converted and admitted once; the calls share its messages.
+    """
+    tasks = [
+        asyncio.ensure_future(call(request.model_copy(update={"n": count})))
+        for count in parts
+    ]
+    try:
+        responses = await asyncio.gather(*tasks)
+    except BaseException:
+        # 후보 하나라도 실패하면 요청 전체가 실패하므로 나머지 호출을 멈춘다
+        for task in tasks:
+            task.cancel()
+        raise
+    return merge_responses(responses)
+
+
+async def fan_out_stream(
+    request: ChatRequest,
+    parts: list[int],
+    open_stream: Callable[[ChatRequest], AsyncIterator[ChatCompletionChunk]],
+) -> AsyncIterator[ChatCompletionChunk]:
+    """
+    Stream `request.n` candidates from concurrent calls, interleaving chunks
+    as they arrive. Choice indexes are shifted per call so they stay unique,
+    and the per-call usage is merged into one final usage chunk.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    # 끝난 스트림을 알리는 표시
+    done = object()
+
+    async def pump(position: int, stream: AsyncIterator[ChatCompletionChunk]):
+        try:
+            async for chunk in stream:
+                await queue.put((position, chunk))
+        except Exception as e:
+            await queue.put((position, e))
+        else:
+            await queue.put((position, done))
+
+    offsets = _offsets(parts)
+    tasks = [
+        asyncio.create_task(
+            pump(position, open_stream(request.model_copy(update={"n": count})))
+        )
+        for position, count in enumerate(parts)
+    ]
+    head = None
+    usages = []
+    try:
+        remaining = len(tasks)
+        while remaining:
+            position, item = await queue.get()
+            if item is done:
+                remaining -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+
+            chunk = item
+            if chunk.usage is not None:
+                usages.append(chunk.usage)
+            if not chunk.choices:
+                continue
+            if head is None:
+                head = chunk
+            yield chunk.model_copy(
+                update={
+                    "id": head.id,
+                    "created": head.created,
+                    "usage": None,
+                    "choices": [
+                        choice.model_copy(
+                            update={"index": choice.index + offsets[position]}
+                        )
+                        for choice in chunk.choices
+                    ],
+                }
+            )
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if head is not None:
+        yield head.model_copy(update={"choices": [], "usage": merge_usage(usages)})
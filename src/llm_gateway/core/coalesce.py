@@ -0,0 +1,63 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one in-flight call.
+
+    Every waiter shares the leader's result (or exception). A waiter that gets
+    cancelled only detaches itself; the shared call is cancelled once the last
+    waiter has gone.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # 마지막 대기자까지 연결을 끊었으면 upstream 호출도 취소한다
+                self._forget(key, call)
+                call.task.cancel()
+                self.cancelled += 1
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        total = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "dedup_rate": self.coalesced / total if total else 0.0,
+        }
@@ -0,0 +1,179 @@
+import json
+import time
+from dataclasses import dataclass
+
+from llm_gateway.core.config import CompactionPolicy
+from llm_gateway.core.metrics import STAGE_SECONDS, model_labels, registry
+from llm_gateway.core.tokens import estimate_message_tokens, estimate_tokens
+from llm_gateway.core.tracing import add_span
+from llm_gateway.schemas.chat import ChatMessage, ChatRequest
+
+COMPACTION_SAVED_TOKENS = registry.counter(
+    "llm_gateway_compaction_saved_tokens",
+    "Estimated input tokens removed by history compaction.",
+    ("model",),
+)
+_COMPACTION_STAGE = STAGE_SECONDS.labels("compaction")
+
+
+@dataclass
+class CompactionResult:
+    original_tokens: int
+    tokens: int
+    dropped_messages: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def _groups(messages: list[ChatMessage]) -> list[list[int]]:
+    """
+    Split message indices into units that must be kept or dropped together:
+    an assistant message with tool calls and the tool results that follow it.
+    """
+    groups: list[list[int]] = []
+    for i, msg in enumerate(messages):
+        if msg.role == "tool" and groups and _is_tool_group(messages, groups[-1]):
+            groups[-1].append(i)
+        else:
+            groups.append([i])
+    return groups
+
+
+def _is_tool_group(messages: list[ChatMessage], group: list[int]) -> bool:
+    first = messages[group[0]]
+    return first.role == "tool" or bool(first.role == "assistant" and first.tool_calls)
+
+
+class HistoryCompactor:
+    """
+    Pre-dispatch stage that trims long conversation histories per model,
+    using local token estimates only (no tokenizer, no network).
+
+    Policies are matched by the longest requested-model prefix ("" applies to
+    every model), so aliases like "creative" can have their own policy.
+    """
+
+    def __init__(self, policies: dict[str, CompactionPolicy] | None = None):
+        self.policies = policies or {}
+
+        self.requests = 0
+        self.compacted = 0
+        self.dropped_messages = 0
+        self.saved_tokens = 0
+
+    def policy_for(self, model: str) -> CompactionPolicy | None:
+        matches = [prefix for prefix in self.policies if model.startswith(prefix)]
+        if not matches:
+            return None
+        return self.policies[max(matches, key=len)]
+
+    def compact(self, request: ChatRequest) -> tuple[ChatRequest, CompactionResult]:
+        """
+        Return the (possibly) compacted request and how many tokens it saved.
+        The original request is returned as-is when nothing is dropped.
+        """
+        started = time.perf_counter()
+        self.requests += 1
+        try:
+            return self._compact(request)
+        finally:
+            _COMPACTION_STAGE.observe(time.perf_counter() - started)
+            add_span("compaction", started)
+
+    def _compact(self, request: ChatRequest) -> tuple[ChatRequest, CompactionResult]:
+        messages = request.messages
+        tokens = [estimate_message_tokens(msg) for msg in messages]
+        original_tokens = sum(tokens)
+        result = CompactionResult(original_tokens, original_tokens, 0)
+
+        policy = self.policy_for(request.model)
+        if policy is None:
+            return request, result
+
+        budget = policy.max_input_tokens
+        if request.tools and budget is not None:
+            # tool schema도 입력 토큰을 차지한다
+            budget -= estimate_tokens(json.dumps(request.tools))
+        if policy.stale_tool_result_turns is None and (
+            budget is None or original_tokens <= budget
+        ):
+            # 대부분의 요청은 여기서 끝난다
+            return request, result
+
+        groups = _groups(messages)
+        keep = [True] * len(groups)
+        pinned = [
+            any(messages[i].role in policy.pinned_roles for i in group)
+            for group in groups
+        ]
+
+        # 오래된 tool 결과 제거: 최근 N번의 user 턴 이전의 tool 호출/결과 묶음
+        if policy.stale_tool_result_turns is not None:
+            user_turns = 0
+            for g in range(len(groups) - 1, -1, -1):
+                first = messages[groups[g][0]]
+                if first.role == "user":
+                    user_turns += 1
+                elif (
+                    user_turns >= policy.stale_tool_result_turns
+                    and _is_tool_group(messages, groups[g])
+                    and not pinned[g]
+                ):
+                    keep[g] = False
+
+        # sliding window: 고정 메시지 + 최근 메시지부터 예산 안에서 연속으로 유지
+        kept_tokens = sum(
+            sum(tokens[i] for i in group) for g, group in enumerate(groups) if keep[g]
+        )
+        if budget is not None and kept_tokens > budget:
+            used = sum(
+                sum(tokens[i] for i in group)
+                for g, group in enumerate(groups)
+                if keep[g] and pinned[g]
+            )
+            recent = 0
+            window_closed = False
+            for g in range(len(groups) - 1, -1, -1):
+                if not keep[g] or pinned[g]:
+                    continue
+                size = sum(tokens[i] for i in groups[g])
+                # 마지막 메시지(현재 턴)는 예산을 넘더라도 항상 보낸다
+                must_keep = recent < max(1, policy.keep_recent_messages)
+                if window_closed or (not must_keep and used + size > budget):
+                    window_closed = True
+                    keep[g] = False
+                    continue
+                used += size
+                recent += len(groups[g])
+
+        if all(keep):
+            return request, result
+
+        compacted = [
+            messages[i] for g, group in enumerate(groups) if keep[g] for i in group
+        ]
+        result.tokens = sum(
+            tokens[i] for g, group in enumerate(groups) if keep[g] for i in group
+        )
+        result.dropped_messages = len(messages) - len(compacted)
+
+        self.compacted += 1
+        self.dropped_messages += result.dropped_messages
+        self.saved_tokens += result.saved_tokens
+        COMPACTION_SAVED_TOKENS.labels(model_labels.label(request.model)).inc(
+            result.saved_tokens
+        )
+        return request.model_copy(update={"messages": compacted}), result
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "compacted": self.compacted,
+            "dropped_messages": self.dropped_messages,
+            "saved_tokens": self.saved_tokens,
+            "policies": {
+                prefix: policy.model_dump() for prefix, policy in self.policies.items()
+            },
+        }
@@ -1,6 +1,40 @@
+from typing import Literal
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class RateLimitQuota(BaseModel):
+    rpm: int | None = None  # requests per minute
+    tpm: int | None = None  # tokens per minute
+
+
+class CompactionPolicy(BaseModel):
+    # 입력 토큰 예산 (추정치 기준), None이면 sliding window를 적용하지 않는다
+    max_input_tokens: int | None = None
+    # 예산과 무관하게 항상 유지할 최근 메시지 수
+    keep_recent_messages: int = 4
+    # 최근 N번의 user 턴보다 오래된 tool 호출/결과는 제거 (None이면 유지)
+    stale_tool_result_turns: int | None = None
+    # 항상 유지할 role (tool을 넣으면 tool 호출/결과 묶음도 고정된다)
+    pinned_roles: list[str] = ["system"]
+
+
+class ModelPrice(BaseModel):
+    # USD per 1M tokens
+    input: float
+    output: float
+    cached_input: float | None = None  # 미지정 시 input 가격
+
+
+class UpstreamTimeout(BaseModel):
+    # seconds, httpx 단계별 timeout (pool: 연결을 얻기까지 기다리는 시간)
+    connect: float | None = 5.0
+    read: float | None = 120.0
+    write: float | None = 30.0
+    pool: float | None = 10.0
+
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "LLM Gateway"
     API_V1_STR: str = "/api/v1"
@@ -11,12 +45,179 @@ class Settings(BaseSettings):
 
     # Model Configuration
     GEMINI_DEFAULT_MODEL: str = "gemini-2.0-flash-lite-001"
+    GEMINI_CONVERSION_CACHE_SIZE: int = 8192  # 메시지 단위 변환 결과 LRU 크기
+
+    # Gemini Context Cache (긴 system prompt/history prefix를 provider 측에 캐시)
+    GEMINI_CONTEXT_CACHE_ENABLED: bool = False
+    GEMINI_CONTEXT_CACHE_MIN_TOKENS: int = 4096
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS: int = 600
+
+    # Upstream HTTP (모든 provider가 공유하는 connection pool)
+    UPSTREAM_MAX_CONNECTIONS: int = 100
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    UPSTREAM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    UPSTREAM_HTTP2: bool = False  # 'h2' 패키지 필요 (pip install 'httpx[http2]')
+    UPSTREAM_TIMEOUT: UpstreamTimeout = UpstreamTimeout()
+    # 모델명 prefix → 덮어쓸 timeout 항목 (예: '{"gemini-2.5": {"read": 300}}')
+    UPSTREAM_MODEL_TIMEOUTS: dict[str, UpstreamTimeout] = {}
+
+    # OpenAI-compatible Provider (vLLM/llama.cpp 등 self-hosted 추론 서버)
+    # 예: http://vllm:8000/v1, 미지정 시 비활성
+    OPENAI_COMPAT_BASE_URL: str | None = None
+    OPENAI_COMPAT_API_KEY: str | None = None  # 미지정 시 OPENAI_API_KEY
+    # 이 prefix로 시작하는 모델명을 보낸다 (prefix는 떼고 전달, 예: local/llama-3.1-8b)
+    OPENAI_COMPAT_MODEL_PREFIX: str = "local/"
+    # 한 요청에서 n개 후보를 생성할 수 있는 수 (n을 지원하지 않는 서버는 1)
+    OPENAI_COMPAT_MAX_CANDIDATES: int = 128
+
+    # Fake Provider (부하 테스트/벤치마크용, "fake" 로 시작하는 모델명으로 호출)
+    FAKE_PROVIDER_ENABLED: bool = False
+    FAKE_PROVIDER_LATENCY_SECONDS: float = 0.5  # 중앙값 (스트림은 첫 토큰까지)
+    FAKE_PROVIDER_LATENCY_DISTRIBUTION: Literal["constant", "uniform", "lognormal"] = (
+        "lognormal"
+    )
+    FAKE_PROVIDER_LATENCY_SPREAD: float = 0.5
+    FAKE_PROVIDER_ERROR_RATE: float = 0.0
+    FAKE_PROVIDER_TOKENS_PER_SECOND: float = 50.0
+    FAKE_PROVIDER_COMPLETION_TOKENS: int = 100
+
+    # Routing
+    # 기능 별칭 → 후보 모델 풀 (후보 중 가장 빠르고 건강한 모델로 라우팅)
+    MODEL_ALIASES: dict[str, list[str]] = {
+        "creative": ["gemini-2.5-flash", "gemini-2.0-flash"],
+        "logical": ["gemini-2.5-flash", "gemini-2.0-flash"],
+        "fast": ["gemini-2.0-flash-lite-001", "gemini-2.0-flash"],
+    }
+    # 모델명 prefix → provider 이름 ("google", "openai", "fake")
+    # 별칭 후보에 self-hosted 모델을 넣으면 그쪽으로 간다
+    # (예: MODEL_ALIASES의 "npc": ["local/llama-3.1-8b"])
+    MODEL_ROUTES: dict[str, str] = {}
+    ROUTING_EWMA_ALPHA: float = 0.2
+    ROUTING_MAX_ERROR_RATE: float = 0.5
+    ROUTING_HEALTH_HALF_LIFE_SECONDS: float = 30.0
+
+    # Response Cache (결정적 요청의 exact-match 캐시)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 300.0
+    RESPONSE_CACHE_MAX_TEMPERATURE: float = 0.0
+
+    # Semantic Cache (마지막 user 메시지가 거의 같은 요청끼리 응답 공유, numpy 필요)
+    # 대화 context(모델, 설정, 이전 메시지)가 완전히 같은 요청끼리만 비교한다
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.9  # cosine 유사도 하한
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 10_000
+    SEMANTIC_CACHE_TTL_SECONDS: float = 600.0
+    SEMANTIC_CACHE_MAX_TEMPERATURE: float = 1.0
+    # "hashing" (내장, 단어/문자 n-gram) 또는 "package.module:factory"
+    SEMANTIC_CACHE_EMBEDDER: str = "hashing"
+    SEMANTIC_CACHE_DIM: int = 256
+
+    # Structured Output (response_format JSON 출력을 gateway에서 검증)
+    STRUCTURED_OUTPUT_VALIDATION_ENABLED: bool = True
+    # 검증 실패 시 오류를 알려주고 다시 요청하는 횟수 (0이면 바로 502)
+    STRUCTURED_OUTPUT_MAX_RETRIES: int = 1
+    STRUCTURED_OUTPUT_MAX_SCHEMAS: int = 256  # 컴파일된 validator LRU 크기
+
+    # 동시에 들어온 동일 요청을 하나의 upstream 호출로 합친다
+    REQUEST_COALESCING_ENABLED: bool = True
+
+    # History Compaction (dispatch 전에 긴 대화 history를 줄인다)
+    # 잘린 history는 호출자에게 알리지 않으므로 예산을 정한 모델에만 켠다
+    COMPACTION_ENABLED: bool = False
+    # 요청 모델명(별칭 포함) prefix → 정책, "" 는 모든 모델
+    # 예산은 모델의 context window에 맞춘다
+    # 예: COMPACTION_POLICIES='{"gemini-2.0-flash": {"max_input_tokens": 1000000}}'
+    COMPACTION_POLICIES: dict[str, CompactionPolicy] = {}
+
+    # Admission Scheduler (모델별 적응형 동시성 제한 + 우선순위 큐)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_INITIAL_CONCURRENCY: int = 16
+    SCHEDULER_MIN_CONCURRENCY: int = 1
+    SCHEDULER_MAX_CONCURRENCY: int = 128
+    SCHEDULER_MAX_QUEUE_SIZE: int = 512
+    SCHEDULER_MAX_QUEUE_SECONDS: float = 30.0
+    SCHEDULER_LATENCY_TOLERANCE: float = 2.0
+
+    # Rate Limits
+    # 키는 모델명 prefix (가장 긴 prefix가 적용됨, 예: "gemini" 는 provider 전체)
+    # STATE_BACKEND=redis면 모든 worker의 합이 quota를 넘지 않는다 (memory는 worker별)
+    # 예: RATE_LIMITS='{"gemini-2.0-flash": {"rpm": 2000, "tpm": 4000000}}'
+    RATE_LIMITS: dict[str, RateLimitQuota] = {}
+    # X-Client-Id 헤더 기준 호출 서비스별 quota ("*" 는 기본값)
+    CLIENT_RATE_LIMITS: dict[str, RateLimitQuota] = {}
+    RATE_LIMIT_BURST_SECONDS: float = 6.0
+    RATE_LIMIT_MAX_WAIT_SECONDS: float = 30.0
+    RATE_LIMIT_MAX_CLIENTS: int = 1000  # 넘어선 "*" quota client id는 "other"로 묶는다
+
+    # Hedged Requests (p99 tail latency 완화)
+    HEDGING_ENABLED: bool = False
+    HEDGING_PERCENTILE: float = 95.0  # 이 지연 시간을 넘기면 두 번째 요청을 보낸다
+    HEDGING_MAX_FRACTION: float = 0.05  # 전체 요청 중 hedge 비율 상한
+    HEDGING_MIN_SAMPLES: int = 20
+    HEDGING_ALTERNATES: dict[str, str] = {}  # hedge를 보낼 대체 모델 (기본: 같은 모델)
+
+    # Resilience (circuit breaker / retry / fallback)
+    RESILIENCE_ENABLED: bool = True
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # 연속 실패 횟수
+    CIRCUIT_BREAKER_RESET_SECONDS: float = 30.0  # open 유지 시간 (이후 half-open probe)
+    RETRY_MAX_ATTEMPTS: int = 3  # 모델당 최대 시도 횟수
+    RETRY_BACKOFF_BASE_SECONDS: float = 0.2
+    RETRY_BACKOFF_MAX_SECONDS: float = 2.0
+    # 재시도가 모두 실패하거나 circuit이 열렸을 때 순서대로 시도할 모델
+    FALLBACK_CHAINS: dict[str, list[str]] = {
+        "gemini-2.0-flash-lite-001": ["gemini-2.0-flash"],
+    }
+
+    # Shared State (여러 uvicorn worker가 캐시/circuit breaker/사용량을 공유)
+    STATE_BACKEND: Literal["memory", "redis"] = "memory"  # memory: worker별 상태
+    STATE_REDIS_URL: str = "redis://localhost:6379/0"
+    STATE_KEY_PREFIX: str = "llm-gateway:"
+    STATE_TIMEOUT_SECONDS: float = 0.05  # 초과 시 공유 상태 없이 진행
+    STATE_SYNC_SECONDS: float = 1.0  # 다른 worker의 breaker 상태 확인 주기
+
+    # Lifecycle
+    STARTUP_WARMUP_ENABLED: bool = True  # 시작 시 provider 연결(TLS)을 미리 맺는다
+    STARTUP_WARMUP_TIMEOUT_SECONDS: float = 5.0
+    # 종료 시 진행 중인 요청/스트림을 기다리는 최대 시간
+    # (uvicorn --timeout-graceful-shutdown 으로 넘기며, lifespan은 다시 기다리지 않는다)
+    SHUTDOWN_DRAIN_SECONDS: float = 30.0
+
+    # Batch (/chat/batch)
+    BATCH_MAX_SIZE: int = 256
+    BATCH_MAX_CONCURRENCY: int = 8
+
+    # Usage (호출 서비스별 토큰/비용 집계)
+    USAGE_TRACKING_ENABLED: bool = True
+    USAGE_FLUSH_SECONDS: float = 60.0
+    USAGE_MAX_CLIENTS: int = 1000  # 넘어선 X-Client-Id는 "other"로 묶는다
+    USAGE_LOG_PATH: str | None = None  # 지정 시 flush마다 JSONL로 기록, 없으면 로그
+    # 모델명 prefix → 가격 (가장 긴 prefix가 적용됨)
+    MODEL_PRICES: dict[str, ModelPrice] = {
+        "gemini-2.0-flash-lite": ModelPrice(input=0.075, output=0.30),
+        "gemini-2.0-flash": ModelPrice(input=0.10, output=0.40, cached_input=0.025),
+        "gemini-2.5-flash": ModelPrice(input=0.30, output=2.50, cached_input=0.075),
+    }
 
     # Observability
+    # 설정에 없는 모델명은 이 개수까지만 metric label/scheduler lane을 따로 만든다
+    # (나머지는 "other")
+    METRICS_MAX_MODEL_LABELS: int = 100
     LANGSMITH_TRACING: bool = False
     LANGSMITH_ENDPOINT: str = "https://api.smith.langchain.com"
     LANGSMITH_API_KEY: str | None = None
     LANGSMITH_PROJECT: str = "llm-gateway"
+    # 요청별 단계 span: Server-Timing 헤더는 모든 응답에, LangSmith 전송은 샘플만
+    # (헤더는 내부 단계별 처리 시간을 드러내므로 신뢰할 수 있는 내부망에서만 켠다)
+    SERVER_TIMING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 0.01
+    # 이보다 느린 요청은 샘플링과 무관하게 전송한다 (None이면 끔)
+    TRACING_SLOW_SECONDS: float | None = 10.0
+    # 전송 대기 trace 상한 (가득 차면 버리고 dropped로 센다)
+    TRACING_QUEUE_SIZE: int = 1000
+    TRACING_BATCH_SIZE: int = 50
+    TRACING_FLUSH_SECONDS: float = 2.0
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=True
@@ -1,10 +1,462 @@
-from llm_gateway.core.interfaces import BaseRouter
-from llm_gateway.schemas.chat import ChatRequest, ChatResponse
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import aclosing, asynccontextmanager
+from typing import TYPE_CHECKING
+
+from llm_gateway.core.cache import ResponseCache, is_cacheable, request_cache_key
+from llm_gateway.core.coalesce import SingleFlight
+from llm_gateway.core.compaction import HistoryCompactor
+from llm_gateway.core.interfaces import BaseRouter, CallBudget, call_budget
+from llm_gateway.core.ratelimit import RateLimiter, Reservation
+from llm_gateway.core.scheduler import AdmissionScheduler
+from llm_gateway.core.state import StateStore, write_behind
+from llm_gateway.core.structured import CompiledSchema, StructuredOutputValidator
+from llm_gateway.core.tokens import (
+    CHARS_PER_TOKEN,
+    estimate_request_tokens,
+    estimate_response_tokens,
+)
+from llm_gateway.core.tracing import add_span, span
+from llm_gateway.core.usage import UsageAggregator
+from llm_gateway.schemas.chat import (
+    ChatCompletionChunk,
+    ChatRequest,
+    ChatResponse,
+    ChatUsage,
+)
+
+if TYPE_CHECKING:
+    # numpy import는 semantic cache를 켤 때만 한다 (cold start)
+    from llm_gateway.core.semantic_cache import SemanticCache, SemanticKey
+
+logger = logging.getLogger(__name__)
 
 
 class LLMEngine:
-    def __init__(self, router: BaseRouter):
+    def __init__(
+        self,
+        router: BaseRouter,
+        cache: ResponseCache | None = None,
+        coalescer: SingleFlight | None = None,
+        scheduler: AdmissionScheduler | None = None,
+        rate_limiter: RateLimiter | None = None,
+        usage: UsageAggregator | None = None,
+        compactor: HistoryCompactor | None = None,
+        state: StateStore | None = None,
+        semantic_cache: "SemanticCache | None" = None,
+        structured: StructuredOutputValidator | None = None,
+    ):
         self.router = router
+        self.cache = cache
+        self.coalescer = coalescer
+        self.scheduler = scheduler
+        self.rate_limiter = rate_limiter
+        self.usage = usage
+        self.compactor = compactor
+        # 여러 worker가 응답 캐시를 공유할 때만 사용한다 (로컬 캐시 miss 시 조회)
+        self.state = state if state is not None and state.shared else None
+        self.semantic_cache = semantic_cache
+        self.structured = structured
+
+    @property
+    def providers(self) -> dict:
+        return getattr(self.router, "providers", {})
+
+    async def warm_up(self, timeout: float) -> None:
+        """
+        Warm up every provider concurrently; failures only delay the first
+        request, so they are logged and startup continues.
+        """
+
+        async def warm(name: str, provider) -> None:
+            started = time.perf_counter()
+            try:
+                await provider.warm_up()
+            except Exception as e:
+                logger.warning("Warm-up of provider %s failed: %s", name, e)
+                return
+            logger.info(
+                "Warmed up provider %s in %.3fs", name, time.perf_counter() - started
+            )
+
+        try:
+            async with asyncio.timeout(timeout):
+                await asyncio.gather(
+                    *(warm(name, p) for name, p in self.providers.items())
+                )
+        except TimeoutError:
+            logger.warning("Provider warm-up did not finish within %.1fs", timeout)
+
+    async def aclose(self) -> None:
+        for name, provider in self.providers.items():
+            try:
+                await provider.aclose()
+            except Exception as e:
+                logger.warning("Closing provider %s failed: %s", name, e)
+
+    async def chat(
+        self, request: ChatRequest, client: str | None = None
+    ) -> ChatResponse:
+        started = time.perf_counter()
+        request = self._prepare(request)
+        try:
+            response, cache_hit = await self._chat(request, client)
+        except Exception:
+            if self.usage is not None:
+                self.usage.record_request(
+                    client, request.model, time.perf_counter() - started, failed=True
+                )
+            raise
+        if self.usage is not None:
+            self.usage.record_request(
+                client,
+                response.model,
+                time.perf_counter() - started,
+                cache_hit=cache_hit,
+            )
+        return response
+
+    def _prepare(self, request: ChatRequest) -> ChatRequest:
+        # compaction 정책은 요청한 모델명(별칭 포함)으로 고르므로 resolve 전에 한다
+        if self.compactor is not None:
+            request, _ = self.compactor.compact(request)
+        return self.router.resolve(request)
+
+    async def _chat(
+        self, request: ChatRequest, client: str | None
+    ) -> tuple[ChatResponse, bool]:
+        cache_key = None
+        if self.cache is not None and self.cache.accepts(request):
+            started = time.perf_counter()
+            cache_key = request_cache_key(request)
+            cached = self.cache.get(cache_key)
+            if cached is None and self.state is not None:
+                cached = await self._shared_cache_get(cache_key)
+            add_span("cache", started, hit=cached is not None)
+            if cached is not None:
+                return cached, True
+
+        semantic_key = None
+        if self.semantic_cache is not None and self.semantic_cache.accepts(request):
+            started = time.perf_counter()
+            # embedding은 한 번만 계산해 miss 후 저장할 때 재사용한다
+            semantic_key = await self.semantic_cache.akey(request)
+            cached, similarity = self.semantic_cache.get(semantic_key)
+            add_span(
+                "semantic_cache", started, hit=cached is not None, similarity=similarity
+            )
+            if cached is not None:
+                return cached, True
+
+        if self.coalescer is not None and (
+            cache_key is not None if self.cache is not None else is_cacheable(request)
+        ):
+            # 동시에 들어온 동일 요청은 하나의 upstream 호출 결과를 공유한다
+            # (캐시할 수 있는 결정적 요청만, 토큰은 leader에게 청구되므로 client별로)
+            response = await self.coalescer.do(
+                f"{client or ''}:{cache_key or request_cache_key(request)}",
+                lambda: self._dispatch(request, cache_key, client, semantic_key),
+            )
+            return response.model_copy(deep=True), False
+
+        return await self._dispatch(request, cache_key, client, semantic_key), False
+
+    async def _shared_cache_get(self, cache_key: str) -> ChatResponse | None:
+        try:
+            data = await self.state.get(f"cache:{cache_key}")
+            if data is None:
+                return None
+            # 깨지거나 다른 버전이 쓴 항목은 miss로 취급한다
+            response = ChatResponse.model_validate_json(data)
+        except Exception as e:
+            logger.warning("Shared cache lookup failed: %s", e)
+            return None
+        self.cache.set(cache_key, response)
+        return response
+
+    async def chat_batch(
+        self,
+        requests: list[ChatRequest],
+        concurrency: int,
+        client: str | None = None,
+    ) -> AsyncIterator[tuple[int, ChatResponse | Exception]]:
+        """
+        Run independent requests with bounded concurrency, yielding
+        (index, response or exception) pairs in completion order.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(index: int, request: ChatRequest):
+            async with semaphore:
+                try:
+                    return index, await self.chat(request, client=client)
+                except Exception as e:
+                    return index, e
+
+        tasks = [
+            asyncio.create_task(run(index, request))
+            for index, request in enumerate(requests)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 호출자가 중간에 끊으면 남은 요청도 취소한다
+            for task in tasks:
+                task.cancel()
+
+    @asynccontextmanager
+    async def _admission(
+        self, request: ChatRequest, client: str | None, observe_latency: bool = True
+    ) -> AsyncIterator[Reservation | None]:
+        """
+        Wait for rate limit capacity, then hold a scheduler slot.
+        """
+        started = time.perf_counter()
+        reservation = None
+        if self.rate_limiter is not None:
+            # 속도 제한 대기 중에는 동시성 슬롯을 잡지 않는다
+            # 후보를 여러 호출로 나눠 보내면 호출마다 요청과 prompt가 청구된다
+            calls = self.router.upstream_calls(request)
+            reservation = await self.rate_limiter.acquire(
+                request.model,
+                client,
+                estimate_request_tokens(request) * calls,
+                requests=calls,
+            )
+
+        try:
+            if self.scheduler is None:
+                add_span("admission", started)
+                yield reservation
+                return
+
+            async with self.scheduler.slot(
+                request.model, request.priority, observe_latency=observe_latency
+            ):
+                add_span("admission", started)
+                yield reservation
+        except Exception:
+            # 슬롯을 못 받았거나(shed/timeout) upstream 호출이 실패하면 예약을 돌려준다
+            if reservation is not None:
+                self.rate_limiter.refund(reservation)
+            raise
+
+    async def _dispatch(
+        self,
+        request: ChatRequest,
+        cache_key: str | None,
+        client: str | None,
+        semantic_key: "SemanticKey | None" = None,
+    ) -> ChatResponse:
+        # 잘못된 스키마는 토큰을 예약하기 전에 400으로 거절한다
+        compiled = self._compiled_for(request)
+        async with self._admission(request, client) as reservation:
+            token = call_budget.set(
+                CallBudget(
+                    admit=lambda extra: self._admission(extra, client),
+                    charge=lambda extra, response: self._charge_discarded(
+                        client, extra, response
+                    ),
+                )
+            )
+            try:
+                response, rejected_tokens = await self._route_chat(
+                    request, client, compiled
+                )
+            finally:
+                call_budget.reset(token)
+
+        # 토큰은 실제 upstream을 호출한 요청에만 청구한다 (coalesced/cached 제외)
+        if self.usage is not None and response.usage is not None:
+            self.usage.record_tokens(client, response.model, response.usage)
+        if reservation is not None:
+            if response.usage is not None:
+                actual_tokens = response.usage.total_tokens
+            else:
+                actual_tokens = reservation.estimated_tokens + estimate_response_tokens(
+                    response
+                )
+            self.rate_limiter.reconcile(reservation, actual_tokens + rejected_tokens)
+        if cache_key is not None:
+            self.cache.set(cache_key, response)
+            if self.state is not None:
+                write_behind(
+                    self.state.set(
+                        f"cache:{cache_key}",
+                        response.model_dump_json().encode(),
+                        ttl=self.cache.ttl_seconds,
+                    ),
+                    "cache write",
+                )
+        if semantic_key is not None:
+            self.semantic_cache.set(semantic_key, response)
+        return response
+
+    def _charge_discarded(
+        self, client: str | None, request: ChatRequest, response: ChatResponse | None
+    ) -> None:
+        if self.usage is None:
+            return
+        if response is not None and response.usage is not None:
+            usage = response.usage
+        else:
+            # 중간에 취소된 호출도 입력 토큰은 청구된다
+            prompt_tokens = estimate_request_tokens(request)
+            completion_tokens = (
+                estimate_response_tokens(response) if response is not None else 0
+            )
+            usage = ChatUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            )
+        self.usage.record_tokens(client, request.model, usage)
+
+    def _compiled_for(self, request: ChatRequest) -> CompiledSchema | None:
+        if self.structured is None:
+            return None
+        return self.structured.compiled_for(request)
+
+    async def _route_chat(
+        self,
+        request: ChatRequest,
+        client: str | None,
+        compiled: CompiledSchema | None = None,
+    ) -> tuple[ChatResponse, int]:
+        """
+        Route the request; structured output that fails validation is sent
+        back to the model with the errors, up to `max_retries` times. Returns
+        the accepted response and the tokens spent on rejected attempts.
+        """
+        if compiled is None:
+            with span("route"):
+                return await self.router.route_chat(request), 0
+
+        attempt, rejected_tokens = request, 0
+        for retry in range(self.structured.max_retries + 1):
+            with span("route", attempt=retry):
+                response = await self.router.route_chat(attempt)
+            with span("structured_output", schema=compiled.name):
+                content, errors = self.structured.check_response(compiled, response)
+            if not errors:
+                return response, rejected_tokens
+
+            # 버린 응답의 토큰도 청구된다
+            if response.usage is not None:
+                rejected_tokens += response.usage.total_tokens
+                if self.usage is not None:
+                    self.usage.record_tokens(client, response.model, response.usage)
+            else:
+                rejected_tokens += estimate_request_tokens(
+                    attempt
+                ) + estimate_response_tokens(response)
+            if retry == self.structured.max_retries:
+                raise self.structured.fail(compiled, errors)
+            self.structured.record_retry(compiled)
+            attempt = self.structured.repair_request(request, content, errors)
+
+    async def _route_chat_stream(
+        self,
+        request: ChatRequest,
+        client: str | None = None,
+        compiled: CompiledSchema | None = None,
+        rejected_tokens: list[int] | None = None,
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        """
+        Stream the response, checking structured output as it arrives: a
+        violation aborts the upstream stream, and is retried with the errors
+        while no content has been sent to the caller yet. Tokens spent on
+        rejected attempts are added to `rejected_tokens[0]`.
+        """
+        if compiled is None:
+            async for chunk in self.router.route_chat_stream(request):
+                yield chunk
+            return
+
+        attempt = request
+        for retry in range(self.structured.max_retries + 1):
+            validation = self.structured.stream(compiled, request.n)
+            emitted = False
+            model, usage, completion_chars = attempt.model, None, 0
+            async with aclosing(self.router.route_chat_stream(attempt)) as stream:
+                async for chunk in stream:
+                    model = chunk.model
+                    usage = chunk.usage or usage
+                    for choice in chunk.choices:
+                        completion_chars += len(choice.delta.content or "")
+                    # 위반이 보이면 해당 chunk부터 보내지 않고 upstream을 끊는다
+                    if validation.feed(chunk):
+                        break
+                    emitted = emitted or any(c.delta.content for c in chunk.choices)
+                    yield chunk
+
+            content, errors = validation.finish()
+            if not errors:
+                return
+
+            # 버린 시도의 토큰도 청구된다 (중간에 끊긴 스트림은 usage가 없어 추정한다)
+            if usage is None:
+                prompt_tokens = estimate_request_tokens(attempt)
+                completion_tokens = completion_chars // CHARS_PER_TOKEN
+                usage = ChatUsage(
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    total_tokens=prompt_tokens + completion_tokens,
+                )
+            if rejected_tokens is not None:
+                rejected_tokens[0] += usage.total_tokens
+            if self.usage is not None:
+                self.usage.record_tokens(client, model, usage)
+            if emitted or retry == self.structured.max_retries:
+                raise self.structured.fail(compiled, errors)
+            self.structured.record_retry(compiled)
+            attempt = self.structured.repair_request(request, content, errors)
+
+    async def chat_stream(
+        self, request: ChatRequest, client: str | None = None
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        started = time.perf_counter()
+        request = self._prepare(request)
+        completion_chars = 0
+        model = request.model
+        usage = None
+        rejected_tokens = [0]
+
+        try:
+            # 잘못된 스키마는 토큰을 예약하기 전에 400으로 거절한다
+            compiled = self._compiled_for(request)
+            # 스트림이 끝날 때까지 슬롯을 점유한다
+            async with self._admission(
+                request, client, observe_latency=False
+            ) as reservation:
+                async for chunk in self._route_chat_stream(
+                    request, client, compiled, rejected_tokens
+                ):
+                    model = chunk.model
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    for choice in chunk.choices:
+                        completion_chars += len(choice.delta.content or "")
+                    yield chunk
+        except Exception:
+            if self.usage is not None:
+                self.usage.record_request(
+                    client, model, time.perf_counter() - started, failed=True
+                )
+            raise
 
-    async def chat(self, request: ChatRequest) -> ChatResponse:
-        return await self.router.route_chat(request)
+        if self.usage is not None:
+            self.usage.record_request(client, model, time.perf_counter() - started)
+            if usage is not None:
+                self.usage.record_tokens(client, model, usage)
+        if reservation is not None:
+            if usage is not None:
+                actual_tokens = usage.total_tokens
+            else:
+                actual_tokens = (
+                    reservation.estimated_tokens + completion_chars // CHARS_PER_TOKEN
+                )
+            self.rate_limiter.reconcile(reservation, actual_tokens + rejected_tokens[0])
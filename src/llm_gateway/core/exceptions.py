@@ -0,0 +1,70 @@
+class GatewayError(Exception):
+    """
+    Base class for errors the gateway maps to a specific HTTP status code.
+    """
+
+    status_code: int = 500
+
+
+class OverloadedError(GatewayError):
+    """
+    The gateway shed the request (queue full or queue wait exceeded).
+    """
+
+    status_code = 503
+
+
+class UpstreamError(GatewayError):
+    """
+    An upstream LLM provider failed the request.
+    """
+
+    status_code = 502
+
+    def __init__(
+        self, message: str, retryable: bool = False, status_code: int | None = None
+    ):
+        super().__init__(message)
+        self.retryable = retryable
+        if status_code is not None:
+            self.status_code = status_code
+
+
+class UpstreamRateLimitError(UpstreamError):
+    """
+    The upstream provider rejected the request with a rate limit (HTTP 429).
+    """
+
+    status_code = 429
+
+    def __init__(self, message: str):
+        super().__init__(message, retryable=True)
+        # 이미 scheduler에 알렸는지 (재시도 중 알린 429를 slot이 다시 세지 않도록)
+        self.signaled = False
+
+
+class RateLimitExceededError(GatewayError):
+    """
+    The request would have to wait longer than allowed for a rate limit slot.
+    """
+
+    status_code = 429
+
+
+class CircuitOpenError(GatewayError):
+    """
+    Every model in the fallback chain has an open circuit breaker.
+    """
+
+    status_code = 503
+
+
+class StructuredOutputError(UpstreamError):
+    """
+    The model's output did not match the requested response_format after
+    every allowed repair attempt.
+    """
+
+    def __init__(self, message: str, errors: list[str]):
+        super().__init__(message)
+        self.errors = errors
@@ -0,0 +1,159 @@
+import logging
+import re
+from collections.abc import AsyncIterator, Callable
+
+import httpx
+
+from llm_gateway.core.config import UpstreamTimeout
+
+logger = logging.getLogger(__name__)
+
+# Gemini REST 경로의 모델명 (.../models/gemini-2.0-flash:generateContent)
+_MODEL_IN_PATH = re.compile(r"/models/([^/:]+)")
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, done: Callable[[], None]):
+        self._stream = stream
+        self._done = done
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._done()
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """
+    Shared connection pool for upstream providers with per-model timeouts and
+    utilization stats.
+
+    Requests sent without an explicit timeout (the Gemini SDK passes None
+    unless configured) get the timeout configured for the model found in the
+    URL path, falling back to the defaults. A request counts as in flight
+    until its response body is closed, so long streams show up as pool usage.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: UpstreamTimeout | None = None,
+        model_timeouts: dict[str, UpstreamTimeout] | None = None,
+    ):
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning(
+                    "UPSTREAM_HTTP2 is set but the 'h2' package is not installed "
+                    "(pip install 'httpx[http2]'); using HTTP/1.1."
+                )
+                http2 = False
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.timeout = timeout or UpstreamTimeout()
+        self.model_timeouts = model_timeouts or {}
+        self._transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=http2)
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.pool_timeouts = 0
+
+    def timeout_for(self, model: str | None) -> httpx.Timeout:
+        timeout = self.timeout
+        if model is not None:
+            matches = [
+                prefix for prefix in self.model_timeouts if model.startswith(prefix)
+            ]
+            if matches:
+                override = self.model_timeouts[max(matches, key=len)]
+                timeout = self.timeout.model_copy(
+                    update=override.model_dump(exclude_unset=True)
+                )
+        return httpx.Timeout(
+            connect=timeout.connect,
+            read=timeout.read,
+            write=timeout.write,
+            pool=timeout.pool,
+        )
+
+    def _finish(self) -> None:
+        self.in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        timeout = request.extensions.get("timeout")
+        if not timeout or all(value is None for value in timeout.values()):
+            match = _MODEL_IN_PATH.search(request.url.path)
+            request.extensions["timeout"] = self.timeout_for(
+                match.group(1) if match else None
+            ).as_dict()
+
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.PoolTimeout:
+            self.pool_timeouts += 1
+            self._finish()
+            raise
+        except BaseException:
+            self._finish()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TrackedStream(response.stream, self._finish),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def stats(self) -> dict:
+        # httpx는 pool 상태를 공개하지 않으므로 내부 httpcore pool을 읽는다
+        connections = self._transport._pool.connections
+        idle = sum(1 for connection in connections if connection.is_idle())
+        active = len(connections) - idle
+        return {
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "http2": self.http2,
+            "connections": len(connections),
+            "active_connections": active,
+            "idle_connections": idle,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            # HTTP/1.1에서는 연결 하나에 요청 하나: 남는 요청은 pool을 기다리는 중
+            "waiting_for_connection": 0
+            if self.http2
+            else max(0, self.in_flight - active),
+            "utilization": active / self.limits.max_connections
+            if self.limits.max_connections
+            else 0.0,
+            "requests": self.requests,
+            "pool_timeouts": self.pool_timeouts,
+        }
+
+
+def build_http_client(transport: PooledTransport) -> httpx.AsyncClient:
+    # 요청별 timeout은 transport가 모델 기준으로 채운다
+    return httpx.AsyncClient(transport=transport, timeout=transport.timeout_for(None))
@@ -1,6 +1,16 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager
+from contextvars import ContextVar
+from dataclasses import dataclass
 
-from llm_gateway.schemas.chat import ChatRequest, ChatResponse
+from llm_gateway.schemas.chat import (
+    ChatChunkChoice,
+    ChatCompletionChunk,
+    ChatDelta,
+    ChatRequest,
+    ChatResponse,
+)
 
 
 class BaseLLMProvider(ABC):
@@ -8,6 +18,9 @@ class BaseLLMProvider(ABC):
     Abstract base class for all LLM providers (e.g., OpenAI, Gemini).
     """
 
+    # 한 번의 upstream 호출로 생성할 수 있는 후보(n) 수, 넘으면 router가 나눠 보낸다
+    max_candidates: int = 1
+
     @abstractmethod
     async def chat_complete(self, request: ChatRequest) -> ChatResponse:
         """
@@ -15,8 +28,94 @@ class BaseLLMProvider(ABC):
         """
         pass
 
+    async def chat_stream(
+        self, request: ChatRequest
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        """
+        Streams the response as OpenAI-style chunks.
+
+        Providers without native streaming fall back to a single chunk built
+        from `chat_complete`.
+        """
+        response = await self.chat_complete(request)
+        last = len(response.choices) - 1
+        for position, choice in enumerate(response.choices):
+            yield ChatCompletionChunk(
+                id=response.id,
+                created=response.created,
+                model=response.model,
+                choices=[
+                    ChatChunkChoice(
+                        index=choice.index,
+                        delta=ChatDelta(
+                            role="assistant",
+                            content=choice.message.content,
+                            tool_calls=[
+                                {"index": i, **tool_call}
+                                for i, tool_call in enumerate(choice.message.tool_calls)
+                            ]
+                            if choice.message.tool_calls
+                            else None,
+                        ),
+                        finish_reason=choice.finish_reason,
+                    )
+                ],
+                usage=response.usage if position == last else None,
+            )
+
+    async def warm_up(self) -> None:  # noqa: B027
+        """
+        Open upstream connections ahead of the first request (optional).
+        """
+
+    async def aclose(self) -> None:  # noqa: B027
+        """
+        Release upstream connections on shutdown (optional).
+        """
+
+
+@dataclass
+class CallBudget:
+    """
+    Lets the router admit and charge upstream calls it makes on top of the
+    one the engine admitted (hedged duplicates).
+    """
+
+    # 추가 호출도 rate limit/scheduler를 거친다 (예약한 입력 토큰은 그대로 청구)
+    admit: Callable[[ChatRequest], AbstractAsyncContextManager]
+    # 결과를 버린 호출의 토큰을 사용량에 기록한다 (취소되어 응답이 없으면 None)
+    charge: Callable[[ChatRequest, ChatResponse | None], None]
+
+
+# engine이 upstream 호출을 감싸는 동안 설정한다
+call_budget: ContextVar[CallBudget | None] = ContextVar("call_budget", default=None)
+
+
+def current_call_budget() -> CallBudget | None:
+    return call_budget.get()
+
 
 class BaseRouter(ABC):
+    def resolve(self, request: ChatRequest) -> ChatRequest:
+        """
+        Resolve the model the request will be sent to (e.g. an alias), before
+        the engine uses it for rate limits, scheduling and cache keys.
+        """
+        return request
+
+    def upstream_calls(self, request: ChatRequest) -> int:
+        """
+        How many upstream calls routing the request takes (candidates split
+        across calls), so admission can reserve one request for each.
+        """
+        return 1
+
     @abstractmethod
     async def route_chat(self, request: ChatRequest) -> ChatResponse:
         raise NotImplementedError
+
+    @abstractmethod
+    def route_chat_stream(
+        self, request: ChatRequest
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        raise NotImplementedError
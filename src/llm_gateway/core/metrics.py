@@ -0,0 +1,381 @@
+"""
+Minimal Prometheus metrics registry.
+
+Metrics are only updated from the event loop thread, so children are plain
+objects with no locks; the hot path is a dict lookup plus a few float adds.
+Callers that record on every request should bind children once with
+`.labels(...)` where the label values are known up front.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Iterable
+from contextvars import ContextVar
+
+from llm_gateway.core.tracing import add_span
+
+# 초 단위 기본 버킷 (LLM 호출은 수 초 ~ 수십 초까지 걸린다)
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # 마지막 칸은 +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    kind = ""
+    _child_type: type
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def _new_child(self):
+        return self._child_type()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {values}"
+                )
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _label_dict(self, values: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, values, strict=True))
+
+    def samples(self) -> Iterable[Sample]:
+        for values, child in self._children.items():
+            yield self.name, self._label_dict(values), child.value
+
+
+class Counter(_Metric):
+    kind = "counter"
+    _child_type = _CounterChild
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterable[Sample]:
+        for values, child in self._children.items():
+            yield f"{self.name}_total", self._label_dict(values), child.value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+    _child_type = _GaugeChild
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def samples(self) -> Iterable[Sample]:
+        for values, child in self._children.items():
+            labels = self._label_dict(values)
+            cumulative = 0
+            for bound, count in zip(
+                (*self.buckets, float("inf")), child.counts, strict=True
+            ):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    {**labels, "le": _format_value(bound)},
+                    cumulative,
+                )
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, child.count
+
+
+class ModelLabels:
+    """
+    Bounds the model names used as metric labels and per-model state keys.
+
+    Model names come straight from client requests, so besides the configured
+    models only the first `max_models` names seen get their own label; the
+    rest are grouped under "other".
+    """
+
+    OTHER = "other"
+
+    def __init__(self, known: Iterable[str] = (), max_models: int = 100):
+        self.configure(known, max_models)
+
+    def configure(self, known: Iterable[str], max_models: int) -> None:
+        self.known = set(known)
+        self.max_models = max_models
+        self._seen: set[str] = set()
+
+    def label(self, model: str) -> str:
+        if model in self.known or model in self._seen:
+            return model
+        if len(self._seen) >= self.max_models:
+            return self.OTHER
+        self._seen.add(model)
+        return model
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, extra: Iterable[tuple] = ()) -> str:
+        """
+        Render the Prometheus text format. `extra` are `(name, kind, help,
+        samples)` families computed at scrape time from state kept elsewhere.
+        """
+        lines = []
+        families = [
+            (m.name, m.kind, m.documentation, m.samples())
+            for m in self._metrics.values()
+        ]
+        families.extend(extra)
+
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(
+                    f"{sample_name}{_format_labels(labels)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+model_labels = ModelLabels()
+
+HTTP_REQUESTS = registry.counter(
+    "llm_gateway_http_requests",
+    "HTTP requests by route and status code.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "llm_gateway_http_request_duration_seconds",
+    "End-to-end HTTP request latency.",
+    ("method", "route"),
+)
+HTTP_IN_FLIGHT = registry.gauge(
+    "llm_gateway_http_requests_in_flight", "HTTP requests currently being served."
+)
+GATEWAY_OVERHEAD_SECONDS = registry.histogram(
+    "llm_gateway_overhead_duration_seconds",
+    "Request latency not spent waiting on upstream providers.",
+    ("route",),
+)
+STAGE_SECONDS = registry.histogram(
+    "llm_gateway_stage_duration_seconds",
+    "Time spent in gateway-side processing stages.",
+    ("stage",),
+)
+UPSTREAM_REQUESTS = registry.counter(
+    "llm_gateway_upstream_requests",
+    "Upstream provider calls by outcome.",
+    ("provider", "model", "outcome"),
+)
+UPSTREAM_SECONDS = registry.histogram(
+    "llm_gateway_upstream_duration_seconds",
+    "Upstream provider call latency (full response or full stream).",
+    ("provider", "model"),
+)
+UPSTREAM_IN_FLIGHT = registry.gauge(
+    "llm_gateway_upstream_requests_in_flight",
+    "Upstream provider calls currently in flight.",
+    ("provider", "model"),
+)
+TIME_TO_FIRST_TOKEN_SECONDS = registry.histogram(
+    "llm_gateway_time_to_first_token_seconds",
+    "Latency until the first streamed chunk arrives from the provider.",
+    ("provider", "model"),
+)
+TOKENS = registry.counter(
+    "llm_gateway_tokens",
+    "Tokens reported by upstream providers.",
+    ("provider", "model", "type"),
+)
+
+# 요청(컨텍스트)별로 upstream에서 보낸 시간을 누적해 gateway 자체 오버헤드를 구한다
+_upstream_elapsed: ContextVar[list[float] | None] = ContextVar(
+    "upstream_elapsed", default=None
+)
+
+
+def start_request_timer() -> list[float]:
+    elapsed = [0.0]
+    _upstream_elapsed.set(elapsed)
+    return elapsed
+
+
+def add_upstream_time(seconds: float) -> None:
+    elapsed = _upstream_elapsed.get()
+    if elapsed is not None:
+        elapsed[0] += seconds
+
+
+class UpstreamCall:
+    """
+    Records one upstream call: in-flight gauge, outcome counter, latency and
+    (for streams) time to first token.
+    """
+
+    __slots__ = ("provider", "model", "label", "started", "first_token_at")
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self.label = model_labels.label(model)
+        self.started = time.perf_counter()
+        self.first_token_at: float | None = None
+        UPSTREAM_IN_FLIGHT.labels(provider, self.label).inc()
+
+    def first_token(self) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            TIME_TO_FIRST_TOKEN_SECONDS.labels(self.provider, self.label).observe(
+                self.first_token_at - self.started
+            )
+
+    def tokens(self, prompt: int | None, completion: int | None) -> None:
+        if isinstance(prompt, int):
+            TOKENS.labels(self.provider, self.label, "prompt").inc(prompt)
+        if isinstance(completion, int):
+            TOKENS.labels(self.provider, self.label, "completion").inc(completion)
+
+    def finish(self, outcome: str) -> None:
+        elapsed = time.perf_counter() - self.started
+        UPSTREAM_IN_FLIGHT.labels(self.provider, self.label).dec()
+        UPSTREAM_REQUESTS.labels(self.provider, self.label, outcome).inc()
+        UPSTREAM_SECONDS.labels(self.provider, self.label).observe(elapsed)
+        add_upstream_time(elapsed)
+        attributes = {}
+        if self.first_token_at is not None:
+            attributes["time_to_first_token"] = self.first_token_at - self.started
+        add_span(
+            "upstream",
+            self.started,
+            provider=self.provider,
+            model=self.model,
+            outcome=outcome,
+            **attributes,
+        )
@@ -0,0 +1,320 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from llm_gateway.core.config import RateLimitQuota
+from llm_gateway.core.exceptions import RateLimitExceededError
+from llm_gateway.core.state import StateStore, write_behind
+
+logger = logging.getLogger(__name__)
+
+# 공유 quota는 1분 단위 window 카운터로 센다
+WINDOW_SECONDS = 60
+# window가 모두 찼을 때 앞으로 찾아볼 최대 window 수
+_MAX_WINDOWS_AHEAD = 60
+# max_clients를 넘어선 "*" quota client id는 이 이름으로 묶는다
+OTHER_CLIENT = "other"
+
+
+class TokenBucket:
+    """
+    Token bucket that paces callers instead of rejecting them.
+
+    `reserve` takes tokens immediately (the balance may go negative) and
+    returns how long the caller must wait for its reservation to be covered,
+    so concurrent callers are served in arrival order without a lock.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        self._refill()
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+@dataclass
+class _Limit:
+    name: str
+    quota: RateLimitQuota
+    requests: TokenBucket | None
+    tokens: TokenBucket | None
+    paced: int = 0
+    rejected: int = 0
+    wait_seconds_total: float = 0.0
+
+
+@dataclass
+class Reservation:
+    estimated_tokens: int
+    requests: int = 1
+    request_buckets: list[TokenBucket] = field(default_factory=list)
+    # (bucket, reserved amount)
+    token_buckets: list[tuple[TokenBucket, float]] = field(default_factory=list)
+    # 공유 window 카운터 (key, reserved amount)
+    shared_requests: list[tuple[str, int]] = field(default_factory=list)
+    shared_tokens: list[tuple[str, int]] = field(default_factory=list)
+
+
+class RateLimiter:
+    """
+    Paces requests against upstream RPM/TPM quotas (per model, matched by the
+    longest configured model-name prefix) and per-client quotas.
+
+    Input tokens are estimated up front and reconciled with the actual usage
+    once the response is known.
+
+    Token buckets only see this worker's traffic. With a shared `store` each
+    request is also reserved in cluster-wide one-minute window counters (the
+    first window with room for it), so N workers together stay within the
+    quota; the local buckets still smooth each worker's bursts. If the store
+    fails the worker falls back to its local buckets.
+
+    Client ids come from a request header, so at most `max_clients` of them
+    get their own "*" quota; the rest share one "client:other" limit.
+    """
+
+    def __init__(
+        self,
+        model_quotas: dict[str, RateLimitQuota] | None = None,
+        client_quotas: dict[str, RateLimitQuota] | None = None,
+        burst_seconds: float = 6.0,
+        max_wait_seconds: float = 30.0,
+        max_clients: int = 1000,
+        store: StateStore | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.model_quotas = model_quotas or {}
+        self.client_quotas = client_quotas or {}
+        self.burst_seconds = burst_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.max_clients = max_clients
+        self.store = store if store is not None and store.shared else None
+        self._clock = clock
+        # window 경계는 모든 worker가 같아야 하므로 wall clock 기준이다
+        self._wall_clock = wall_clock
+
+        self._limits: dict[str, _Limit] = {}
+        # "*" quota로 자기 limit을 받은 client id
+        self._clients: set[str] = set()
+        self.shared_failures = 0
+
+    def _limit(self, name: str, quota: RateLimitQuota) -> _Limit:
+        limit = self._limits.get(name)
+        if limit is None:
+            limit = _Limit(
+                name=name,
+                quota=quota,
+                requests=self._bucket(quota.rpm),
+                tokens=self._bucket(quota.tpm),
+            )
+            self._limits[name] = limit
+        return limit
+
+    def _bucket(self, per_minute: int | None) -> TokenBucket | None:
+        if not per_minute:
+            return None
+        rate = per_minute / 60
+        # 1분치 버스트를 한 번에 보내지 않도록 burst_seconds 만큼만 쌓아둔다
+        return TokenBucket(rate, max(1.0, rate * self.burst_seconds), self._clock)
+
+    def _limits_for(self, model: str, client: str | None) -> list[_Limit]:
+        limits = []
+
+        matches = [prefix for prefix in self.model_quotas if model.startswith(prefix)]
+        if matches:
+            prefix = max(matches, key=len)
+            limits.append(self._limit(f"model:{prefix}", self.model_quotas[prefix]))
+
+        client = client or "anonymous"
+        quota = self.client_quotas.get(client)
+        if quota is None and "*" in self.client_quotas:
+            quota = self.client_quotas["*"]
+            if client not in self._clients:
+                if len(self._clients) >= self.max_clients:
+                    client = OTHER_CLIENT
+                else:
+                    self._clients.add(client)
+        if quota is not None:
+            limits.append(self._limit(f"client:{client}", quota))
+
+        return limits
+
+    async def acquire(
+        self,
+        model: str,
+        client: str | None,
+        estimated_tokens: int,
+        requests: int = 1,
+    ) -> Reservation:
+        """
+        Reserve `requests` upstream calls (a request whose candidates are
+        split across calls makes several) and their estimated tokens.
+        """
+        reservation = Reservation(estimated_tokens=estimated_tokens, requests=requests)
+        limits = self._limits_for(model, client)
+
+        wait = 0.0
+        for limit in limits:
+            if limit.requests is not None:
+                wait = max(wait, limit.requests.reserve(requests))
+                reservation.request_buckets.append(limit.requests)
+            if limit.tokens is not None:
+                # 버킷 용량보다 큰 요청도 언젠가는 통과할 수 있도록 용량으로 자른다
+                amount = min(estimated_tokens, limit.tokens.capacity)
+                wait = max(wait, limit.tokens.reserve(amount))
+                reservation.token_buckets.append((limit.tokens, amount))
+
+        if self.store is not None and limits:
+            wait = max(wait, await self._reserve_shared(limits, reservation))
+
+        if wait > self.max_wait_seconds:
+            self.refund(reservation)
+            for limit in limits:
+                limit.rejected += 1
+            raise RateLimitExceededError(
+                f"Rate limit exceeded for {model}, retry in {wait:.0f}s."
+            )
+
+        if wait > 0:
+            for limit in limits:
+                limit.paced += 1
+                limit.wait_seconds_total += wait
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # 대기 중에 취소된 요청(연결 끊김 등)은 upstream을 쓰지 않았다
+                self.refund(reservation)
+                raise
+
+        return reservation
+
+    async def _reserve_shared(
+        self, limits: list[_Limit], reservation: Reservation
+    ) -> float:
+        """
+        Reserve the request in the first shared window where every counter
+        has room; returns how long to wait for that window to start.
+        """
+        counters = []
+        for limit in limits:
+            if limit.quota.rpm:
+                amount = min(reservation.requests, limit.quota.rpm)
+                counters.append((f"{limit.name}:requests", limit.quota.rpm, amount))
+            if limit.quota.tpm:
+                amount = min(reservation.estimated_tokens, limit.quota.tpm)
+                counters.append((f"{limit.name}:tokens", limit.quota.tpm, amount))
+
+        now = self._wall_clock()
+        first = int(now // WINDOW_SECONDS)
+        try:
+            for window in range(first, first + _MAX_WINDOWS_AHEAD):
+                starts_at = window * WINDOW_SECONDS
+                keys = [f"ratelimit:{name}:{window}" for name, _, _ in counters]
+                # window가 끝난 뒤에 오는 reconcile도 받을 만큼 유지한다
+                ttl = starts_at + 2 * WINDOW_SECONDS - now
+                # 같은 loop iteration의 명령은 store가 한 번의 왕복으로 묶는다
+                counts = await asyncio.gather(
+                    *(
+                        self.store.incr(key, amount, ttl=ttl)
+                        for key, (_, _, amount) in zip(keys, counters, strict=True)
+                    )
+                )
+                fits = all(
+                    count <= quota
+                    for count, (_, quota, _) in zip(counts, counters, strict=True)
+                )
+                # 너무 먼 window면 호출자가 max_wait 초과로 거절하고 환불한다
+                if (
+                    fits
+                    or starts_at - now > self.max_wait_seconds
+                    or window == first + _MAX_WINDOWS_AHEAD - 1
+                ):
+                    break
+                await asyncio.gather(
+                    *(
+                        self.store.incr(key, -amount)
+                        for key, (_, _, amount) in zip(keys, counters, strict=True)
+                    )
+                )
+        except Exception as e:
+            self.shared_failures += 1
+            logger.warning("Shared rate limit unavailable, pacing locally: %s", e)
+            return 0.0
+
+        for key, (name, _, amount) in zip(keys, counters, strict=True):
+            if name.endswith(":tokens"):
+                reservation.shared_tokens.append((key, amount))
+            else:
+                reservation.shared_requests.append((key, amount))
+        return max(0.0, starts_at - now)
+
+    def refund(self, reservation: Reservation) -> None:
+        """
+        Give back a reservation whose request never reached the upstream
+        (shed, timed out or failed).
+        """
+        for bucket in reservation.request_buckets:
+            bucket.refund(reservation.requests)
+        for bucket, amount in reservation.token_buckets:
+            bucket.refund(amount)
+        for key, amount in reservation.shared_requests + reservation.shared_tokens:
+            write_behind(self.store.incr(key, -amount), "rate limit refund")
+
+    def reconcile(self, reservation: Reservation, actual_tokens: int) -> None:
+        """
+        Charge (or refund) the difference between what each bucket reserved
+        and the actual usage.
+        """
+        # 버킷마다 용량으로 잘린 양을 예약했으므로 각자 기록한 양과 비교한다
+        for bucket, amount in reservation.token_buckets:
+            delta = actual_tokens - amount
+            if delta > 0:
+                bucket.reserve(delta)
+            elif delta < 0:
+                bucket.refund(-delta)
+        for key, amount in reservation.shared_tokens:
+            if actual_tokens != amount:
+                write_behind(
+                    self.store.incr(key, actual_tokens - amount), "rate limit reconcile"
+                )
+
+    def stats(self) -> dict:
+        stats = {}
+        for name, limit in self._limits.items():
+            stats[name] = {
+                "paced": limit.paced,
+                "rejected": limit.rejected,
+                "wait_seconds_total": round(limit.wait_seconds_total, 3),
+            }
+            if limit.requests is not None:
+                limit.requests._refill()
+                stats[name]["requests_available"] = round(limit.requests.tokens, 2)
+            if limit.tokens is not None:
+                limit.tokens._refill()
+                stats[name]["tokens_available"] = round(limit.tokens.tokens, 2)
+        return stats
@@ -0,0 +1,350 @@
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from enum import Enum
+from typing import Any
+
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from llm_gateway.core.exceptions import (
+    CircuitOpenError,
+    UpstreamError,
+    UpstreamRateLimitError,
+)
+from llm_gateway.core.state import StateStore, write_behind
+from llm_gateway.schemas.chat import ChatCompletionChunk, ChatRequest, ChatResponse
+
+logger = logging.getLogger(__name__)
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, UpstreamError):
+        return error.retryable
+    return isinstance(
+        error, (TimeoutError, httpx.TimeoutException, httpx.TransportError)
+    )
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive retryable failures, rejects
+    calls for `reset_timeout` seconds, then lets a single probe through
+    (half-open) to decide whether to close again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        on_transition: Callable[[str, CircuitState, CircuitState], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._on_transition = on_transition
+        self._clock = clock
+
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def _transition(self, state: CircuitState) -> None:
+        if state is self.state:
+            return
+        previous, self.state = self.state, state
+        logger.info("Circuit %s: %s -> %s", self.name, previous.value, state.value)
+        if self._on_transition is not None:
+            self._on_transition(self.name, previous, state)
+
+    def allow(self) -> bool:
+        if self.state is CircuitState.CLOSED:
+            return True
+        if self.state is CircuitState.OPEN:
+            if self._clock() - self.opened_at < self.reset_timeout:
+                return False
+            self._transition(CircuitState.HALF_OPEN)
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self._probe_in_flight = False
+        self.failures = 0
+        self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self.failures += 1
+        if (
+            self.state is CircuitState.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            self.opened_at = self._clock()
+            self._transition(CircuitState.OPEN)
+
+    def release(self) -> None:
+        """
+        Give back a half-open probe slot without an outcome (e.g. cancelled).
+        """
+        self._probe_in_flight = False
+
+
+class ResiliencePolicy:
+    """
+    Per provider/model circuit breakers, jittered retries for retryable
+    upstream errors and ordered fallback chains.
+
+    A model whose breaker is open is skipped immediately, so callers fail over
+    to the next model in the chain instead of waiting out a timeout.
+
+    Every upstream 429 is reported to `on_rate_limited` with its model, so
+    admission control backs off even when a retry or fallback succeeds.
+
+    With a shared `store`, a breaker opening in one worker is published for
+    `reset_timeout` and honoured by the others. Remote state is refreshed in
+    the background at most every `sync_seconds`, never on the request path.
+    """
+
+    def __init__(
+        self,
+        fallbacks: dict[str, list[str]] | None = None,
+        max_attempts: int = 3,
+        backoff_base: float = 0.2,
+        backoff_max: float = 2.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        store: StateStore | None = None,
+        sync_seconds: float = 1.0,
+        on_rate_limited: Callable[[str], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.fallbacks = fallbacks or {}
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.store = store if store is not None and store.shared else None
+        self.sync_seconds = sync_seconds
+        self.on_rate_limited = on_rate_limited
+        self._clock = clock
+
+        self.breakers: dict[str, CircuitBreaker] = {}
+        # breaker -> (확인 시각, 다른 worker에서 open 여부)
+        self._remote_open: dict[str, tuple[float, bool]] = {}
+        # (breaker, from, to) -> count
+        self.transitions: dict[tuple[str, str, str], int] = {}
+
+        self.retries = 0
+        self.rate_limited = 0
+        self.fallbacks_used = 0
+        self.short_circuited = 0
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = self.breakers[key] = CircuitBreaker(
+                key,
+                failure_threshold=self.failure_threshold,
+                reset_timeout=self.reset_timeout,
+                on_transition=self._record_transition,
+                clock=self._clock,
+            )
+        return breaker
+
+    def _record_transition(
+        self, name: str, previous: CircuitState, state: CircuitState
+    ) -> None:
+        key = (name, previous.value, state.value)
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        if self.store is None:
+            return
+        if state is CircuitState.OPEN:
+            write_behind(
+                self.store.set(f"breaker:{name}", b"open", ttl=self.reset_timeout),
+                "breaker publish",
+            )
+        elif state is CircuitState.CLOSED:
+            self._remote_open.pop(name, None)
+            write_behind(self.store.delete(f"breaker:{name}"), "breaker publish")
+
+    def _open_elsewhere(self, breaker: CircuitBreaker) -> bool:
+        if self.store is None or breaker.state is not CircuitState.CLOSED:
+            return False
+        checked_at, is_open = self._remote_open.get(breaker.name, (None, False))
+        now = self._clock()
+        if checked_at is None or now - checked_at >= self.sync_seconds:
+            # 중복 조회를 막기 위해 먼저 시각을 기록하고 결과는 나중에 반영한다
+            self._remote_open[breaker.name] = (now, is_open)
+            write_behind(self._sync(breaker.name), "breaker sync")
+        return is_open
+
+    async def _sync(self, name: str) -> None:
+        is_open = await self.store.get(f"breaker:{name}") is not None
+        self._remote_open[name] = (self._clock(), is_open)
+
+    def _allow(self, breaker: CircuitBreaker) -> bool:
+        if self._open_elsewhere(breaker) or not breaker.allow():
+            self.short_circuited += 1
+            return False
+        return True
+
+    def chain(self, model: str) -> list[str]:
+        return [model, *(m for m in self.fallbacks.get(model, []) if m != model)]
+
+    async def _call(
+        self, call: Callable[[], Awaitable[Any]], breaker: CircuitBreaker, model: str
+    ):
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_random_exponential(
+                multiplier=self.backoff_base, max=self.backoff_max
+            ),
+            # breaker가 열리면 같은 모델로 재시도하지 않고 다음 fallback으로 넘어간다
+            retry=retry_if_exception(
+                lambda e: is_retryable(e) and breaker.state is CircuitState.CLOSED
+            ),
+            reraise=True,
+        )
+        async for attempt in retrying:
+            with attempt:
+                if attempt.retry_state.attempt_number > 1:
+                    self.retries += 1
+                try:
+                    result = await call()
+                except Exception as e:
+                    if isinstance(e, UpstreamRateLimitError):
+                        self._signal_rate_limited(e, model)
+                    if is_retryable(e):
+                        breaker.record_failure()
+                    else:
+                        # 요청 자체의 문제이므로 upstream은 정상으로 본다
+                        breaker.record_success()
+                    raise
+                except BaseException:
+                    breaker.release()
+                    raise
+                breaker.record_success()
+                return result
+
+    def _signal_rate_limited(self, error: UpstreamRateLimitError, model: str) -> None:
+        self.rate_limited += 1
+        if self.on_rate_limited is not None:
+            self.on_rate_limited(model)
+            error.signaled = True
+
+    async def run(
+        self,
+        request: ChatRequest,
+        call: Callable[[ChatRequest], Awaitable[ChatResponse]],
+        breaker_key: Callable[[str], str],
+    ) -> ChatResponse:
+        last_error: Exception | None = None
+        for model in self.chain(request.model):
+            breaker = self.breaker(breaker_key(model))
+            if not self._allow(breaker):
+                last_error = CircuitOpenError(f"Circuit open for {breaker.name}.")
+                continue
+
+            if model != request.model:
+                self.fallbacks_used += 1
+            attempt_request = (
+                request
+                if model == request.model
+                else request.model_copy(update={"model": model})
+            )
+            try:
+                return await self._call(
+                    lambda r=attempt_request: call(r), breaker, model
+                )
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+
+        raise last_error
+
+    async def run_stream(
+        self,
+        request: ChatRequest,
+        open_stream: Callable[[ChatRequest], AsyncIterator[ChatCompletionChunk]],
+        breaker_key: Callable[[str], str],
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        """
+        Like `run`, but retries/fails over only until the first chunk arrives;
+        errors after that are passed through to the caller.
+        """
+
+        async def first_chunk(attempt_request: ChatRequest):
+            stream = open_stream(attempt_request)
+            return stream, await anext(stream, None)
+
+        async def opened(attempt_request: ChatRequest):
+            return await self._call(
+                lambda: first_chunk(attempt_request), breaker, attempt_request.model
+            )
+
+        last_error: Exception | None = None
+        for model in self.chain(request.model):
+            breaker = self.breaker(breaker_key(model))
+            if not self._allow(breaker):
+                last_error = CircuitOpenError(f"Circuit open for {breaker.name}.")
+                continue
+
+            if model != request.model:
+                self.fallbacks_used += 1
+            attempt_request = (
+                request
+                if model == request.model
+                else request.model_copy(update={"model": model})
+            )
+            try:
+                stream, first = await opened(attempt_request)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+                continue
+
+            if first is not None:
+                yield first
+            async for chunk in stream:
+                yield chunk
+            return
+
+        raise last_error
+
+    def stats(self) -> dict:
+        return {
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "fallbacks_used": self.fallbacks_used,
+            "short_circuited": self.short_circuited,
+            "breakers": {
+                name: {"state": breaker.state.value, "failures": breaker.failures}
+                for name, breaker in self.breakers.items()
+            },
+            "open_elsewhere": sorted(
+                name for name, (_, is_open) in self._remote_open.items() if is_open
+            ),
+            "transitions": [
+                {"breaker": name, "from": previous, "to": state, "count": count}
+                for (name, previous, state), count in self.transitions.items()
+            ],
+        }
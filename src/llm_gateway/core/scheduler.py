@@ -0,0 +1,224 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from llm_gateway.core.exceptions import OverloadedError, UpstreamRateLimitError
+from llm_gateway.core.metrics import model_labels
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit.
+
+    Every successful call under the latency threshold grows the limit by
+    1/limit (about +1 per limit's worth of calls); when recent latency (a
+    short EWMA) exceeds `latency_tolerance` x the long-run baseline the limit
+    shrinks slightly, and an upstream 429 halves it. Smoothing both sides
+    keeps normal per-call variance (LLM latency is long-tailed) from being
+    mistaken for congestion.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        latency_tolerance: float = 2.0,
+    ):
+        self.value = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.baseline: float | None = None
+        self.recent: float | None = None
+
+    def on_success(self, latency: float | None = None) -> None:
+        if latency is not None:
+            if self.baseline is None:
+                self.baseline = self.recent = latency
+            else:
+                # baseline은 천천히, recent는 빠르게 따라간다
+                self.baseline += (latency - self.baseline) * 0.01
+                self.recent += (latency - self.recent) * 0.5
+
+            if self.recent > self.baseline * self.latency_tolerance:
+                self.value = max(self.min_limit, self.value * 0.9)
+                return
+
+        self.value = min(self.max_limit, self.value + 1 / self.value)
+
+    def on_rate_limited(self) -> None:
+        self.value = max(self.min_limit, self.value * 0.5)
+
+
+class _Lane:
+    def __init__(self, limit: AdaptiveLimit):
+        self.limit = limit
+        self.in_flight = 0
+        self.queued = 0
+        # (priority, seq, future)
+        self.waiters: list[tuple[int, int, asyncio.Future]] = []
+
+
+class AdmissionScheduler:
+    """
+    Admits requests to upstream models under per-model adaptive concurrency
+    limits. Requests over the limit wait in a priority queue; requests that
+    would exceed the queue size, or wait longer than `max_queue_seconds`, are
+    shed with OverloadedError.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 16,
+        min_limit: int = 1,
+        max_limit: int = 128,
+        max_queue_size: int = 512,
+        max_queue_seconds: float = 30.0,
+        latency_tolerance: float = 2.0,
+    ):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue_size = max_queue_size
+        self.max_queue_seconds = max_queue_seconds
+        self.latency_tolerance = latency_tolerance
+
+        self._lanes: dict[str, _Lane] = {}
+        self._seq = itertools.count()
+        self._queued = 0
+
+        self.admitted = 0
+        self.shed = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _lane(self, model: str) -> _Lane:
+        # 요청의 모델명으로 lane을 만들므로 알 수 없는 모델은 "other" lane을 공유한다
+        model = model_labels.label(model)
+        lane = self._lanes.get(model)
+        if lane is None:
+            lane = _Lane(
+                AdaptiveLimit(
+                    self.initial_limit,
+                    self.min_limit,
+                    self.max_limit,
+                    self.latency_tolerance,
+                )
+            )
+            self._lanes[model] = lane
+        return lane
+
+    @asynccontextmanager
+    async def slot(
+        self, model: str, priority: str = "normal", observe_latency: bool = True
+    ) -> AsyncIterator[None]:
+        """
+        Hold one concurrency slot for `model` for the duration of the block.
+
+        Streams pass `observe_latency=False` since their duration depends on
+        output length rather than upstream load.
+        """
+        lane = self._lane(model)
+        await self._acquire(lane, PRIORITIES.get(priority, PRIORITIES["normal"]))
+
+        start = time.monotonic()
+        try:
+            yield
+        except UpstreamRateLimitError as e:
+            if not e.signaled:
+                lane.limit.on_rate_limited()
+            raise
+        else:
+            lane.limit.on_success(time.monotonic() - start if observe_latency else None)
+        finally:
+            self._release(lane)
+
+    def on_rate_limited(self, model: str) -> None:
+        """
+        Shrink `model`'s limit for an upstream 429 seen while a request was
+        still being retried or failed over (the slot sees only the outcome).
+        """
+        lane = self._lanes.get(model_labels.label(model))
+        if lane is not None:
+            lane.limit.on_rate_limited()
+
+    async def _acquire(self, lane: _Lane, priority: int) -> None:
+        if lane.in_flight < lane.limit.value and not lane.queued:
+            lane.in_flight += 1
+            self._record_admission(0.0)
+            return
+
+        if self._queued >= self.max_queue_size:
+            self.shed += 1
+            raise OverloadedError("Gateway is overloaded, please retry later.")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(lane.waiters, (priority, next(self._seq), future))
+        lane.queued += 1
+        self._queued += 1
+        enqueued_at = time.monotonic()
+
+        try:
+            async with asyncio.timeout(self.max_queue_seconds):
+                await future
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # 슬롯을 넘겨받은 직후 취소되었으면 다음 대기자에게 돌려준다
+                self._release(lane)
+            else:
+                future.cancel()
+                lane.queued -= 1
+                self._queued -= 1
+
+            if isinstance(e, TimeoutError):
+                self.timeouts += 1
+                raise OverloadedError(
+                    "Request waited too long in the gateway queue."
+                ) from e
+            raise
+
+        self._record_admission(time.monotonic() - enqueued_at)
+
+    def _release(self, lane: _Lane) -> None:
+        lane.in_flight -= 1
+        while lane.waiters and lane.in_flight < lane.limit.value:
+            _, _, future = heapq.heappop(lane.waiters)
+            if future.done():
+                continue
+            future.set_result(None)
+            lane.in_flight += 1
+            lane.queued -= 1
+            self._queued -= 1
+
+    def _record_admission(self, waited: float) -> None:
+        self.admitted += 1
+        self.wait_seconds_total += waited
+        if waited > self.wait_seconds_max:
+            self.wait_seconds_max = waited
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timeouts": self.timeouts,
+            "avg_wait_seconds": self.wait_seconds_total / self.admitted
+            if self.admitted
+            else 0.0,
+            "max_wait_seconds": self.wait_seconds_max,
+            "models": {
+                model: {
+                    "limit": round(lane.limit.value, 2),
+                    "in_flight": lane.in_flight,
+                    "queued": lane.queued,
+                }
+                for model, lane in self._lanes.items()
+            },
+        }
@@ -0,0 +1,224 @@
+import asyncio
+import hashlib
+import importlib
+import json
+import re
+import time
+import zlib
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError:  # numpy는 semantic cache를 켤 때만 필요하다
+    np = None
+
+from llm_gateway.core.stats import percentile
+from llm_gateway.schemas.chat import ChatRequest, ChatResponse
+
+# 마지막 user 메시지를 제외한, 응답을 결정하는 요청 필드
+_CONTEXT_FIELDS = {
+    "model",
+    "max_tokens",
+    "n",
+    "response_format",
+    "tools",
+    "tool_choice",
+}
+
+_WORD = re.compile(r"\w+")
+
+Embedder = Callable[[str], "np.ndarray"]
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "The semantic cache needs numpy (the 'semantic' extra) "
+            "or SEMANTIC_CACHE_ENABLED=false."
+        )
+
+
+class HashingEmbedder:
+    """
+    Dependency-free local embedder: signed feature hashing of words and
+    character trigrams, L2-normalized. Captures wording overlap (typos,
+    reordering, small edits), not meaning; plug in a sentence-embedding
+    model via SEMANTIC_CACHE_EMBEDDER for paraphrases.
+    """
+
+    def __init__(self, dim: int = 256):
+        _require_numpy()
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        features = []
+        for word in _WORD.findall(text.lower()):
+            features.append(word)
+            padded = f"<{word}>"
+            features.extend(padded[i : i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def __call__(self, text: str) -> "np.ndarray":
+        hashes = np.fromiter(
+            (zlib.crc32(f.encode()) for f in self._features(text)), dtype=np.uint32
+        )
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if hashes.size:
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(vector, hashes % self.dim, signs)
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector /= norm
+        return vector
+
+
+def load_embedder(spec: str, dim: int) -> Embedder:
+    """
+    "hashing" or "package.module:factory" (called with `dim`, returning a
+    text -> vector callable).
+    """
+    if spec == "hashing":
+        return HashingEmbedder(dim)
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)(dim)
+
+
+@dataclass
+class SemanticKey:
+    fingerprint: int
+    vector: "np.ndarray"
+
+
+class SemanticCache:
+    """
+    Near-duplicate response cache: requests whose context (model, settings and
+    all messages but the last) is identical and whose final user turn embeds
+    within `threshold` cosine similarity share a cached response.
+
+    Vectors live in a preallocated matrix searched with one vectorized dot
+    product over the entries sharing the context fingerprint. The matrix is a
+    ring buffer: once full, the oldest entry is overwritten.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        dim: int = 256,
+        max_entries: int = 10_000,
+        threshold: float = 0.9,
+        ttl_seconds: float = 600.0,
+        max_temperature: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        _require_numpy()
+        self.embedder = embedder
+        self.dim = dim
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_temperature = max_temperature
+        self._clock = clock
+
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._fingerprints = np.zeros(max_entries, dtype=np.int64)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._responses: list[bytes | None] = [None] * max_entries
+        self._next = 0
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lookup_seconds: deque[float] = deque(maxlen=1000)
+
+    def accepts(self, request: ChatRequest) -> bool:
+        last = request.messages[-1] if request.messages else None
+        return (
+            request.cache
+            and not request.stream
+            and request.temperature <= self.max_temperature
+            and last is not None
+            and last.role == "user"
+            and bool(last.content)
+        )
+
+    def key(self, request: ChatRequest) -> SemanticKey:
+        context = request.model_dump(include=_CONTEXT_FIELDS)
+        context["history"] = [m.model_dump() for m in request.messages[:-1]]
+        canonical = json.dumps(context, sort_keys=True, ensure_ascii=False)
+        digest = hashlib.blake2b(canonical.encode(), digest_size=8).digest()
+        return SemanticKey(
+            fingerprint=int.from_bytes(digest, "little", signed=True),
+            vector=self.embedder(request.messages[-1].content),
+        )
+
+    async def akey(self, request: ChatRequest) -> SemanticKey:
+        """
+        `key` without blocking the event loop: model embedders run in a
+        worker thread; the hashing embedder is cheap enough to run inline.
+        """
+        if isinstance(self.embedder, HashingEmbedder):
+            return self.key(request)
+        return await asyncio.to_thread(self.key, request)
+
+    def get(self, key: SemanticKey) -> tuple[ChatResponse | None, float]:
+        """
+        Best match for the key and its similarity (0.0 when nothing shares
+        the context).
+        """
+        started = time.perf_counter()
+        candidates = np.flatnonzero(
+            (self._fingerprints[: self._size] == key.fingerprint)
+            & (self._expires[: self._size] > self._clock())
+        )
+        best, similarity = None, 0.0
+        if candidates.size:
+            if candidates.size * 4 > self._size:
+                # 후보가 많으면 행을 복사해 모으기보다 전체 행렬과 곱하는 편이 빠르다
+                similarities = (self._vectors[: self._size] @ key.vector)[candidates]
+            else:
+                similarities = self._vectors[candidates] @ key.vector
+            position = int(np.argmax(similarities))
+            similarity = float(similarities[position])
+            if similarity >= self.threshold:
+                best = self._responses[candidates[position]]
+        self._lookup_seconds.append(time.perf_counter() - started)
+
+        if best is None:
+            self.misses += 1
+            return None, similarity
+        self.hits += 1
+        return ChatResponse.model_validate_json(best), similarity
+
+    def set(self, key: SemanticKey, response: ChatResponse) -> None:
+        slot = self._next
+        if self._responses[slot] is not None:
+            self.evictions += 1
+        self._vectors[slot] = key.vector
+        self._fingerprints[slot] = key.fingerprint
+        self._expires[slot] = self._clock() + self.ttl_seconds
+        self._responses[slot] = response.model_dump_json().encode()
+        self._next = (slot + 1) % self.max_entries
+        self._size = max(self._size, slot + 1)
+
+    def clear(self) -> None:
+        self._expires[:] = 0
+        self._responses = [None] * self.max_entries
+        self._next = self._size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        recent = list(self._lookup_seconds)
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "lookup_ms_p50": round(percentile(recent, 50) * 1000, 3),
+            "lookup_ms_p95": round(percentile(recent, 95) * 1000, 3),
+        }
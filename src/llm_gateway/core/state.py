@@ -0,0 +1,399 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class StateStoreError(Exception):
+    """
+    The shared state store failed or returned an error reply.
+    """
+
+
+class StateStore(ABC):
+    """
+    Key-value store for state that must be shared between gateway workers.
+
+    Callers treat the store as best-effort: errors are logged and the
+    in-process state keeps working, so an unavailable store never fails a
+    request. `shared` is False for stores that only live in this process, so
+    components can skip the extra round trip when nothing would be shared.
+    """
+
+    shared: bool = False
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        """
+        Add `amount` to an integer counter. `ttl` only applies when the
+        counter is created.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def sadd(self, key: str, *members: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def smembers(self, key: str) -> "set[str]":
+        raise NotImplementedError
+
+    async def close(self) -> None:  # noqa: B027 (연결이 없는 store는 할 일이 없다)
+        return None
+
+
+class MemoryStateStore(StateStore):
+    """
+    In-process store (single worker, tests).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        # key -> (value, expires_at)
+        self._data: dict[str, tuple[object, float | None]] = {}
+
+    def _get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            return None
+        return value
+
+    def _expiry(self, ttl: float | None) -> float | None:
+        return self._clock() + ttl if ttl is not None else None
+
+    async def get(self, key: str) -> bytes | None:
+        value = self._get(key)
+        return value if isinstance(value, bytes) else None
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        self._data[key] = (value, self._expiry(ttl))
+
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        current = self._get(key)
+        if current is None:
+            value, expires_at = amount, self._expiry(ttl)
+        else:
+            value, expires_at = int(current) + amount, self._data[key][1]
+        # Redis와 같이 카운터도 bytes로 저장한다
+        self._data[key] = (str(value).encode(), expires_at)
+        return value
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def sadd(self, key: str, *members: str) -> None:
+        current = self._get(key)
+        if not isinstance(current, set):
+            current = set()
+            self._data[key] = (current, None)
+        current.update(members)
+
+    async def smembers(self, key: str) -> "set[str]":
+        current = self._get(key)
+        return set(current) if isinstance(current, set) else set()
+
+
+_background: set[asyncio.Task] = set()
+
+
+def write_behind(coro, what: str) -> None:
+    """
+    Run a store write without blocking the caller; failures are only logged.
+    """
+    try:
+        task = asyncio.get_running_loop().create_task(coro)
+    except RuntimeError:
+        coro.close()
+        return
+
+    def done(task: asyncio.Task) -> None:
+        _background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("State store %s failed: %s", what, task.exception())
+
+    _background.add(task)
+    task.add_done_callback(done)
+
+
+def _encode(args: tuple) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("State store closed the connection.")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        return StateStoreError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise StateStoreError(f"Unexpected reply: {line!r}")
+
+
+class RedisStateStore(StateStore):
+    """
+    Redis (RESP2) client over a single connection with automatic pipelining.
+
+    Commands issued in the same event loop iteration are written with one
+    socket write and their replies are matched in order, so concurrent
+    requests share round trips instead of each paying for its own.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        key_prefix: str = "llm-gateway:",
+        timeout: float = 0.05,
+        reconnect_backoff: float = 0.5,
+        max_reconnect_backoff: float = 30.0,
+    ):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self.reconnect_backoff = reconnect_backoff
+        self.max_reconnect_backoff = max_reconnect_backoff
+
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._connecting: asyncio.Lock | None = None
+        self._reader_task: asyncio.Task | None = None
+        # 전송 대기 중인 명령과 응답을 기다리는 future (요청 순서대로)
+        self._buffer: list[bytes] = []
+        self._pending: deque[asyncio.Future] = deque()
+        self._flush_scheduled = False
+        # 연속 연결 실패 수와 다음 연결 시도가 허용되는 시각 (loop.time())
+        self._connect_failures = 0
+        self._retry_at = 0.0
+
+        self.commands = 0
+        self.writes = 0
+        self.connect_errors = 0
+
+    async def _connect(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 이벤트 루프가 바뀌면 (테스트 등) 기존 연결은 쓸 수 없다
+            self._reset(ConnectionError("Event loop changed."))
+            self._loop = loop
+            self._connecting = asyncio.Lock()
+            self._connect_failures = 0
+            self._retry_at = 0.0
+
+        async with self._connecting:
+            if self._writer is not None:
+                return
+            if loop.time() < self._retry_at:
+                # backoff 중에는 연결을 기다리지 않고 바로 실패한다
+                raise StateStoreError("State store unavailable, retrying later.")
+            try:
+                # 연결과 handshake도 명령과 같은 timeout 안에서 끝나야 한다
+                async with asyncio.timeout(self.timeout):
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                    try:
+                        await self._handshake(reader, writer)
+                    except BaseException:
+                        writer.close()
+                        raise
+            except Exception as e:
+                self.connect_errors += 1
+                self._connect_failures += 1
+                backoff = self.reconnect_backoff * 2 ** (self._connect_failures - 1)
+                self._retry_at = loop.time() + min(backoff, self.max_reconnect_backoff)
+                if isinstance(e, StateStoreError):
+                    raise
+                raise StateStoreError(f"State store unreachable: {e!r}") from e
+            self._connect_failures = 0
+            self._retry_at = 0.0
+            self._reader, self._writer = reader, writer
+            self._reader_task = loop.create_task(self._read_loop(reader))
+
+    async def _handshake(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        handshake = []
+        if self.password:
+            handshake.append(_encode(("AUTH", self.password)))
+        if self.db:
+            handshake.append(_encode(("SELECT", self.db)))
+        if not handshake:
+            return
+        writer.write(b"".join(handshake))
+        await writer.drain()
+        for _ in handshake:
+            reply = await _read_reply(reader)
+            if isinstance(reply, StateStoreError):
+                raise reply
+
+    def _reset(self, error: Exception) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None and not self._reader_task.done():
+            self._reader_task.cancel()
+        self._reader = self._writer = self._reader_task = None
+        self._buffer.clear()
+        self._flush_scheduled = False
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                reply = await _read_reply(reader)
+                future = self._pending.popleft()
+                if future.done():
+                    continue
+                if isinstance(reply, StateStoreError):
+                    future.set_exception(reply)
+                else:
+                    future.set_result(reply)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("State store connection lost: %s", e)
+            self._reset(ConnectionError(str(e)))
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        if not self._buffer or self._writer is None:
+            return
+        self._writer.write(b"".join(self._buffer))
+        self._buffer.clear()
+        self.writes += 1
+
+    async def execute(self, *commands: tuple) -> list:
+        """
+        Send commands as one pipeline and return their replies in order.
+        """
+        if self._writer is None or self._loop is not asyncio.get_running_loop():
+            await self._connect()
+
+        futures = []
+        for command in commands:
+            future = self._loop.create_future()
+            self._buffer.append(_encode(command))
+            self._pending.append(future)
+            futures.append(future)
+        self.commands += len(commands)
+
+        # 같은 루프 iteration에서 들어온 명령을 한 번의 write로 모은다
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+
+        try:
+            async with asyncio.timeout(self.timeout):
+                return list(await asyncio.gather(*futures))
+        except TimeoutError as e:
+            # 응답 순서를 더 이상 신뢰할 수 없으므로 연결을 버린다
+            self._reset(ConnectionError("State store timed out."))
+            raise StateStoreError("State store timed out.") from e
+
+    def _key(self, key: str) -> str:
+        return self.key_prefix + key
+
+    async def get(self, key: str) -> bytes | None:
+        (value,) = await self.execute(("GET", self._key(key)))
+        return value
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        if not keys:
+            return []
+        (values,) = await self.execute(("MGET", *map(self._key, keys)))
+        return values
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        command = ("SET", self._key(key), value)
+        if ttl is not None:
+            command += ("PX", max(1, int(ttl * 1000)))
+        await self.execute(command)
+
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        key = self._key(key)
+        if ttl is None:
+            (value,) = await self.execute(("INCRBY", key, amount))
+            return value
+        # 처음 만들 때만 TTL을 건다 (SET NX 후 INCRBY를 한 번에 보낸다)
+        _, value = await self.execute(
+            ("SET", key, 0, "PX", max(1, int(ttl * 1000)), "NX"),
+            ("INCRBY", key, amount),
+        )
+        return value
+
+    async def delete(self, key: str) -> None:
+        await self.execute(("DEL", self._key(key)))
+
+    async def sadd(self, key: str, *members: str) -> None:
+        if members:
+            await self.execute(("SADD", self._key(key), *members))
+
+    async def smembers(self, key: str) -> "set[str]":
+        (members,) = await self.execute(("SMEMBERS", self._key(key)))
+        return {member.decode() for member in members}
+
+    async def close(self) -> None:
+        self._reset(ConnectionError("State store closed."))
+
+    def stats(self) -> dict:
+        return {
+            "connected": self._writer is not None,
+            "commands": self.commands,
+            "writes": self.writes,
+            "connect_errors": self.connect_errors,
+            "commands_per_write": self.commands / self.writes if self.writes else 0.0,
+        }
@@ -0,0 +1,12 @@
+import math
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile (q in 0-100) of `values`; 0.0 when empty.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
@@ -0,0 +1,843 @@
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from llm_gateway.core.exceptions import StructuredOutputError
+from llm_gateway.core.stats import percentile
+from llm_gateway.schemas.chat import (
+    ChatCompletionChunk,
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+)
+
+# (value, JSON path, errors) -> None, 위반 사항을 errors에 추가한다
+Check = Callable[[Any, str, list[str]], None]
+
+_MAX_ERRORS = 5
+# $ref 체인/중첩 조합의 최대 깊이 (순환 스키마가 루프를 돌지 않게 한다)
+_MAX_REF_DEPTH = 32
+
+_FENCE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+# 값의 첫 글자로 JSON 타입을 정한다 (숫자/-는 number)
+_START_KINDS = {"{": "object", "[": "array", '"': "string", "t": "boolean"}
+_START_KINDS.update({"f": "boolean", "n": "null"})
+_SCALAR_CHARS = frozenset("0123456789+-.eEtruefalsn")
+
+REPAIR_PROMPT = (
+    "Your previous reply did not match the required JSON schema:\n{errors}\n"
+    "Reply again with only the corrected JSON."
+)
+
+
+def schema_hash(schema: Any) -> str:
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _kind(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def _is_type(value: Any, expected: str) -> bool:
+    kind = _kind(value)
+    if expected == "number":
+        return kind in ("integer", "number")
+    if expected == "integer":
+        return kind == "integer" or (kind == "number" and value.is_integer())
+    return kind == expected
+
+
+def _int_bound(schema: dict, key: str) -> int | None:
+    bound = schema.get(key)
+    if bound is not None and (isinstance(bound, bool) or not isinstance(bound, int)):
+        raise ValueError(f"{key} must be an integer, got {bound!r}")
+    return bound
+
+
+def _schema_types(schema: dict) -> list[str] | None:
+    types = schema.get("type")
+    if types is None:
+        return None
+    types = [types] if isinstance(types, str) else list(types)
+    # Gemini(OpenAPI) 스키마의 nullable
+    if schema.get("nullable"):
+        types.append("null")
+    return [t.lower() for t in types]
+
+
+class _Compiler:
+    """
+    Compiles the JSON Schema subset supported by structured-output APIs
+    (type, enum/const, properties/required/additionalProperties, items,
+    string/number/array bounds, pattern, anyOf/oneOf/allOf, local $ref) into
+    nested closures. Other keywords are ignored.
+    """
+
+    def __init__(self, root: Any):
+        self.root = root
+        self._refs: dict[str, Check | None] = {}
+        # 같은 값에 대해 이어지는 $ref (allOf/anyOf 등으로, 값 안으로 내려가지 않음)
+        # 간선; 순환이 있으면 검증이 끝나지 않는다
+        self._owners: list[str | None] = ["#"]
+        self._edges: dict[str, set[str]] = {}
+
+    def resolve(self, schema: Any) -> Any:
+        seen: set[str] = set()
+        while isinstance(schema, dict) and "$ref" in schema:
+            ref = schema["$ref"]
+            if ref in seen or len(seen) >= _MAX_REF_DEPTH:
+                raise ValueError(f"circular $ref {ref!r}")
+            seen.add(ref)
+            schema = self._target(ref)
+        return schema
+
+    def _target(self, ref: Any) -> Any:
+        if not isinstance(ref, str) or not ref.startswith("#"):
+            raise ValueError(f"unsupported $ref {ref!r} (only local refs)")
+        target = self.root
+        path = ref.removeprefix("#").removeprefix("/")
+        for part in path.split("/") if path else []:
+            part = part.replace("~1", "/").replace("~0", "~")
+            try:
+                target = target[int(part) if isinstance(target, list) else part]
+            except (KeyError, IndexError, TypeError, ValueError):
+                raise ValueError(f"unresolvable $ref {ref!r}") from None
+        return target
+
+    def compile_root(self) -> Check:
+        check = self.compile(self.root)
+        self._check_cycles()
+        return check
+
+    def _nested(self, schema: Any) -> Check:
+        # 값 안(property/item)으로 내려가는 하위 스키마는 순환이어도 유한하다
+        self._owners.append(None)
+        try:
+            return self.compile(schema)
+        finally:
+            self._owners.pop()
+
+    def _check_cycles(self) -> None:
+        done: set[str] = set()
+
+        def visit(ref: str, path: list[str]) -> None:
+            if ref in path:
+                raise ValueError(f"circular $ref {ref!r}")
+            if ref in done:
+                return
+            for target in self._edges.get(ref, ()):
+                visit(target, [*path, ref])
+            done.add(ref)
+
+        for ref in list(self._edges):
+            visit(ref, [])
+
+    def compile(self, schema: Any) -> Check:
+        if schema is False:
+            return lambda value, path, errors: errors.append(f"{path}: not allowed")
+        if not isinstance(schema, dict) or not schema:
+            return lambda value, path, errors: None
+        if "$ref" in schema:
+            return self._compile_ref(schema["$ref"])
+
+        checks: list[Check] = []
+        types = _schema_types(schema)
+        if types is not None:
+            checks.append(self._type_check(types))
+        if "enum" in schema:
+            options = schema["enum"]
+            checks.append(
+                lambda value, path, errors: (
+                    None
+                    if value in options
+                    else errors.append(f"{path}: {value!r} is not one of {options!r}")
+                )
+            )
+        if "const" in schema:
+            const = schema["const"]
+            checks.append(
+                lambda value, path, errors: (
+                    None
+                    if value == const
+                    else errors.append(f"{path}: expected {const!r}")
+                )
+            )
+        checks.extend(self._string_checks(schema))
+        checks.extend(self._number_checks(schema))
+        checks.extend(self._object_checks(schema))
+        checks.extend(self._array_checks(schema))
+        checks.extend(self._combinator_checks(schema))
+
+        def check(value: Any, path: str, errors: list[str]) -> None:
+            for step in checks:
+                step(value, path, errors)
+                if len(errors) >= _MAX_ERRORS:
+                    return
+
+        return check
+
+    def _compile_ref(self, ref: str) -> Check:
+        owner = self._owners[-1]
+        if owner is not None:
+            self._edges.setdefault(owner, set()).add(ref)
+        if ref not in self._refs:
+            # 재귀 스키마: 먼저 자리를 잡아두고 호출 시점에 찾는다
+            self._refs[ref] = None
+            self._owners.append(ref)
+            try:
+                self._refs[ref] = self.compile(self.resolve({"$ref": ref}))
+            finally:
+                self._owners.pop()
+        refs = self._refs
+        return lambda value, path, errors: refs[ref](value, path, errors)
+
+    def _type_check(self, types: list[str]) -> Check:
+        def check(value: Any, path: str, errors: list[str]) -> None:
+            if not any(_is_type(value, expected) for expected in types):
+                errors.append(f"{path}: expected {'/'.join(types)}, got {_kind(value)}")
+
+        return check
+
+    def _string_checks(self, schema: dict) -> list[Check]:
+        checks = []
+        min_length = _int_bound(schema, "minLength")
+        max_length = _int_bound(schema, "maxLength")
+        if min_length is not None or max_length is not None:
+
+            def length(value: Any, path: str, errors: list[str]) -> None:
+                if not isinstance(value, str):
+                    return
+                if min_length is not None and len(value) < min_length:
+                    errors.append(f"{path}: shorter than {min_length} characters")
+                if max_length is not None and len(value) > max_length:
+                    errors.append(f"{path}: longer than {max_length} characters")
+
+            checks.append(length)
+        if "pattern" in schema:
+            try:
+                pattern = re.compile(schema["pattern"])
+            except (re.error, TypeError) as e:
+                raise ValueError(f"invalid pattern {schema['pattern']!r}: {e}") from e
+            checks.append(
+                lambda value, path, errors: (
+                    None
+                    if not isinstance(value, str) or pattern.search(value)
+                    else errors.append(f"{path}: does not match {pattern.pattern!r}")
+                )
+            )
+        return checks
+
+    def _number_checks(self, schema: dict) -> list[Check]:
+        bounds = [
+            (schema.get("minimum"), lambda v, b: v >= b, ">="),
+            (schema.get("maximum"), lambda v, b: v <= b, "<="),
+            (schema.get("exclusiveMinimum"), lambda v, b: v > b, ">"),
+            (schema.get("exclusiveMaximum"), lambda v, b: v < b, "<"),
+        ]
+        bounds = [bound for bound in bounds if isinstance(bound[0], int | float)]
+        if not bounds:
+            return []
+
+        def check(value: Any, path: str, errors: list[str]) -> None:
+            if _kind(value) not in ("integer", "number"):
+                return
+            for bound, ok, op in bounds:
+                if not ok(value, bound):
+                    errors.append(f"{path}: must be {op} {bound}")
+
+        return [check]
+
+    def _object_checks(self, schema: dict) -> list[Check]:
+        properties = {
+            name: self._nested(sub)
+            for name, sub in (schema.get("properties") or {}).items()
+        }
+        required = list(schema.get("required") or [])
+        additional = schema.get("additionalProperties", True)
+        extra = None if additional is True else self._nested(additional)
+        if not properties and not required and extra is None:
+            return []
+
+        def check(value: Any, path: str, errors: list[str]) -> None:
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}: missing required property {name!r}")
+            for name, item in value.items():
+                child = f"{path}.{name}"
+                if name in properties:
+                    properties[name](item, child, errors)
+                elif additional is False:
+                    errors.append(f"{path}: unexpected property {name!r}")
+                elif extra is not None:
+                    extra(item, child, errors)
+
+        return [check]
+
+    def _array_checks(self, schema: dict) -> list[Check]:
+        items = self._nested(schema["items"]) if "items" in schema else None
+        min_items = _int_bound(schema, "minItems")
+        max_items = _int_bound(schema, "maxItems")
+        if items is None and min_items is None and max_items is None:
+            return []
+
+        def check(value: Any, path: str, errors: list[str]) -> None:
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{path}: fewer than {min_items} items")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{path}: more than {max_items} items")
+            if items is not None:
+                for index, item in enumerate(value):
+                    items(item, f"{path}[{index}]", errors)
+
+        return [check]
+
+    def _combinator_checks(self, schema: dict) -> list[Check]:
+        checks = []
+        for sub in schema.get("allOf") or []:
+            checks.append(self.compile(sub))
+        # oneOf는 anyOf로 취급한다 (배타성은 검사하지 않는다)
+        branches = [
+            self.compile(sub)
+            for sub in (schema.get("anyOf") or []) + (schema.get("oneOf") or [])
+        ]
+        if branches:
+
+            def any_of(value: Any, path: str, errors: list[str]) -> None:
+                for branch in branches:
+                    branch_errors: list[str] = []
+                    branch(value, path, branch_errors)
+                    if not branch_errors:
+                        return
+                errors.append(f"{path}: does not match any allowed schema")
+
+            checks.append(any_of)
+        return checks
+
+
+@dataclass
+class CompiledSchema:
+    name: str
+    hash: str
+    schema: Any
+    check: Check
+    resolve: Callable[[Any], Any]
+
+    @property
+    def id(self) -> str:
+        # 클라이언트가 정한 이름만으로는 서로 다른 스키마가 섞이므로 hash를 붙인다
+        return f"{self.name[:64]}:{self.hash[:8]}"
+
+    def validate(self, value: Any) -> list[str]:
+        errors: list[str] = []
+        self.check(value, "$", errors)
+        # 중첩 검사는 한도를 넘겨 쌓을 수 있다
+        return errors[:_MAX_ERRORS]
+
+
+def compile_schema(schema: Any, name: str | None = None) -> CompiledSchema:
+    """
+    Compile a response_format schema; raises ValueError when it is malformed
+    (bad pattern, unresolvable or circular $ref).
+    """
+    digest = schema_hash(schema)
+    compiler = _Compiler(schema)
+    try:
+        check = compiler.compile_root()
+    except (AttributeError, TypeError) as e:
+        # 예: properties가 객체가 아니거나 required가 목록이 아닌 경우
+        raise ValueError(f"invalid schema: {e}") from e
+    return CompiledSchema(
+        name=name or digest[:12],
+        hash=digest,
+        schema=schema,
+        check=check,
+        resolve=compiler.resolve,
+    )
+
+
+def _extract_json(text: str) -> str | None:
+    """
+    JSON wrapped in a markdown fence or surrounded by prose, if any.
+    """
+    text = text.strip()
+    match = _FENCE.match(text)
+    if match:
+        return match.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    end = max(text.rfind("}"), text.rfind("]"))
+    if starts and end > min(starts):
+        return text[min(starts) : end + 1]
+    return None
+
+
+def _parse(text: str | None) -> tuple[Any, str | None]:
+    if not text:
+        return None, "$: empty output"
+    try:
+        return json.loads(text), None
+    except ValueError as e:
+        return None, f"$: invalid JSON ({e})"
+
+
+class _Frame:
+    __slots__ = ("kind", "schema", "key", "index", "empty", "pending")
+
+    def __init__(self, kind: str, schema: Any):
+        self.kind = kind
+        self.schema = schema
+        self.key: str | None = None
+        self.index = 0
+        self.empty = True
+        self.pending: Any = None
+
+
+class JSONStreamChecker:
+    """
+    Incremental check of streamed JSON output. `feed` returns the first
+    violation visible from the text so far (not JSON, a value of the wrong
+    type, an unexpected property) so a bad stream can be aborted early;
+    `finish` fully validates the complete output.
+    """
+
+    def __init__(self, compiled: CompiledSchema):
+        self.compiled = compiled
+        self.error: str | None = None
+        self.seconds = 0.0
+        self._parts: list[str] = []
+        self._stack: list[_Frame] = []
+        self._state = "value"
+        self._schema = compiled.resolve(compiled.schema)
+        self._in_string = False
+        self._escape = False
+        self._key: list[str] | None = None
+        self._scalar = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, text: str) -> str | None:
+        if self.error is None:
+            started = time.perf_counter()
+            self._parts.append(text)
+            for char in text:
+                self.error = self._step(char)
+                if self.error is not None:
+                    break
+            self.seconds += time.perf_counter() - started
+        return self.error
+
+    def finish(self) -> list[str]:
+        if self.error is not None:
+            return [self.error]
+        started = time.perf_counter()
+        value, error = _parse(self.text)
+        errors = [error] if error else self.compiled.validate(value)
+        self.seconds += time.perf_counter() - started
+        return errors
+
+    def _path(self) -> str:
+        path = "$"
+        for frame in self._stack:
+            if frame.kind == "array":
+                path += f"[{frame.index}]"
+            elif frame.key is not None:
+                path += f".{frame.key}"
+        return path
+
+    def _step(self, char: str) -> str | None:
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+                return None
+            elif char == '"':
+                self._in_string = False
+                if self._key is not None:
+                    return self._end_key()
+                self._state = "after_value"
+                return None
+            if self._key is not None:
+                self._key.append(char)
+            return None
+
+        if self._scalar:
+            if char in _SCALAR_CHARS:
+                return None
+            self._scalar = False
+            self._state = "after_value"
+        if char in " \t\r\n":
+            return None
+
+        frame = self._stack[-1] if self._stack else None
+        if self._state == "value":
+            if char == "]" and frame is not None and frame.kind == "array":
+                if frame.empty:
+                    return self._close(char)
+            return self._start_value(char)
+        if self._state == "key":
+            if char == '"':
+                self._in_string = True
+                self._key = []
+                return None
+            if char == "}" and frame.empty:
+                return self._close(char)
+            return f"{self._path()}: expected a property name, got {char!r}"
+        if self._state == "colon":
+            if char != ":":
+                return f"{self._path()}: expected ':', got {char!r}"
+            self._state = "value"
+            self._schema = frame.pending
+            return None
+
+        # after_value
+        if frame is None:
+            return f"$: unexpected {char!r} after the JSON value"
+        if char == ",":
+            if frame.kind == "object":
+                self._state = "key"
+            else:
+                frame.index += 1
+                self._state = "value"
+                self._schema = self._items(frame.schema)
+            return None
+        if char in "}]":
+            return self._close(char)
+        return f"{self._path()}: expected ',' or a closing bracket, got {char!r}"
+
+    def _start_value(self, char: str) -> str | None:
+        kind = "number" if char in "-0123456789" else _START_KINDS.get(char)
+        if kind is None:
+            return f"{self._path()}: expected a JSON value, got {char!r}"
+        expected = self._expected(self._schema)
+        if expected is not None and kind not in expected:
+            return f"{self._path()}: expected {'/'.join(sorted(expected))}, got {kind}"
+
+        if self._stack:
+            self._stack[-1].empty = False
+        if kind == "object":
+            self._stack.append(_Frame("object", self._schema))
+            self._state = "key"
+        elif kind == "array":
+            self._stack.append(_Frame("array", self._schema))
+            self._state = "value"
+            self._schema = self._items(self._schema)
+        elif kind == "string":
+            self._in_string = True
+        else:
+            self._scalar = True
+        return None
+
+    def _end_key(self) -> str | None:
+        frame = self._stack[-1]
+        frame.key = "".join(self._key)
+        self._key = None
+        self._state = "colon"
+        schema = frame.schema if isinstance(frame.schema, dict) else {}
+        properties = schema.get("properties") or {}
+        additional = schema.get("additionalProperties", True)
+        if frame.key in properties:
+            frame.pending = self.compiled.resolve(properties[frame.key])
+        elif additional is False:
+            return f"{self._path()}: unexpected property"
+        else:
+            frame.pending = self.compiled.resolve(additional)
+        return None
+
+    def _close(self, char: str) -> str | None:
+        frame = self._stack.pop()
+        if (char == "}") != (frame.kind == "object"):
+            return f"{self._path()}: mismatched {char!r}"
+        self._state = "after_value"
+        return None
+
+    def _items(self, schema: Any) -> Any:
+        if isinstance(schema, dict):
+            return self.compiled.resolve(schema.get("items"))
+        return None
+
+    def _expected(self, schema: Any, depth: int = 0) -> set[str] | None:
+        """
+        JSON kinds a value for `schema` may start as; None when unconstrained.
+        """
+        if not isinstance(schema, dict) or depth >= _MAX_REF_DEPTH:
+            return None
+        branches = (schema.get("anyOf") or []) + (schema.get("oneOf") or [])
+        if branches:
+            kinds: set[str] = set()
+            for branch in branches:
+                branch_kinds = self._expected(self.compiled.resolve(branch), depth + 1)
+                if branch_kinds is None:
+                    return None
+                kinds |= branch_kinds
+            return kinds
+        types = _schema_types(schema)
+        if types is None:
+            if "enum" in schema:
+                return {
+                    "number" if kind == "integer" else kind
+                    for kind in map(_kind, schema["enum"])
+                }
+            return None
+        return {"number" if t == "integer" else t for t in types}
+
+
+@dataclass
+class _SchemaStats:
+    id: str
+    requests: int = 0
+    validations: int = 0
+    failures: int = 0
+    repaired: int = 0
+    retries: int = 0
+    stream_aborts: int = 0
+    exhausted: int = 0
+    validation_seconds: float = 0.0
+    recent_seconds: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+    def describe(self) -> dict:
+        recent = list(self.recent_seconds)
+        return {
+            "requests": self.requests,
+            "validations": self.validations,
+            "failures": self.failures,
+            "repaired": self.repaired,
+            "retries": self.retries,
+            "stream_aborts": self.stream_aborts,
+            "exhausted": self.exhausted,
+            "retry_rate": self.retries / self.requests if self.requests else 0.0,
+            "validation_ms_p50": round(percentile(recent, 50) * 1000, 3),
+            "validation_ms_p95": round(percentile(recent, 95) * 1000, 3),
+            "validation_seconds": self.validation_seconds,
+        }
+
+
+class StructuredOutputValidator:
+    """
+    Gateway-side validation of `response_format` output. Validators are
+    compiled once per schema and kept in an LRU keyed by schema hash; the
+    engine re-asks the model with the validation errors up to `max_retries`
+    times when the output does not conform.
+    """
+
+    def __init__(self, max_retries: int = 1, max_schemas: int = 256):
+        self.max_retries = max_retries
+        self.max_schemas = max_schemas
+        self._compiled: OrderedDict[str, CompiledSchema] = OrderedDict()
+        # schema hash -> 통계 (컴파일 캐시처럼 max_schemas개로 제한한다)
+        self._stats: OrderedDict[str, _SchemaStats] = OrderedDict()
+        self.compiles = 0
+        self.compile_hits = 0
+
+    def compiled_for(self, request: ChatRequest) -> CompiledSchema | None:
+        """
+        The compiled validator for the request's response_format, if any.
+        Raises ValueError (HTTP 400) when the schema is malformed.
+        """
+        response_format = request.response_format or {}
+        kind = response_format.get("type")
+        if kind == "json_object":
+            schema, name = {}, "json_object"
+        elif kind == "json_schema":
+            spec = response_format.get("json_schema") or {}
+            if not isinstance(spec, dict):
+                raise ValueError("response_format.json_schema must be an object")
+            schema, name = spec.get("schema") or {}, spec.get("name")
+            if name is not None and not isinstance(name, str):
+                raise ValueError("response_format.json_schema.name must be a string")
+        else:
+            return None
+
+        digest = schema_hash(schema)
+        compiled = self._compiled.get(digest)
+        if compiled is not None:
+            self.compile_hits += 1
+            self._compiled.move_to_end(digest)
+        else:
+            self.compiles += 1
+            compiled = compile_schema(schema, name)
+            self._compiled[digest] = compiled
+            if len(self._compiled) > self.max_schemas:
+                self._compiled.popitem(last=False)
+        self._schema_stats(compiled).requests += 1
+        return compiled
+
+    def _schema_stats(self, compiled: CompiledSchema) -> _SchemaStats:
+        stats = self._stats.get(compiled.hash)
+        if stats is None:
+            stats = self._stats[compiled.hash] = _SchemaStats(compiled.id)
+            if len(self._stats) > self.max_schemas:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(compiled.hash)
+        return stats
+
+    def _record(self, compiled: CompiledSchema, seconds: float, ok: bool) -> None:
+        stats = self._schema_stats(compiled)
+        stats.validations += 1
+        stats.failures += not ok
+        stats.validation_seconds += seconds
+        stats.recent_seconds.append(seconds)
+
+    def check(
+        self, compiled: CompiledSchema, content: str | None
+    ) -> tuple[str | None, list[str]]:
+        """
+        Validate a complete output. Returns the (possibly locally repaired)
+        JSON text and the violations found; fenced or prose-wrapped JSON is
+        unwrapped before giving up.
+        """
+        started = time.perf_counter()
+        value, error = _parse(content)
+        errors = [error] if error else compiled.validate(value)
+        if error and content:
+            extracted = _extract_json(content)
+            repaired, repair_error = _parse(extracted)
+            if repair_error is None:
+                content, errors = extracted, compiled.validate(repaired)
+                if not errors:
+                    self._schema_stats(compiled).repaired += 1
+        self._record(compiled, time.perf_counter() - started, not errors)
+        return content, errors
+
+    def check_response(
+        self, compiled: CompiledSchema, response: ChatResponse
+    ) -> tuple[str | None, list[str]]:
+        """
+        Validate every candidate of a response, keeping locally repaired
+        content. Returns the first rejected output and its violations.
+        """
+        for choice in response.choices:
+            message = choice.message
+            if message.tool_calls:
+                continue
+            content, errors = self.check(compiled, message.content)
+            if errors:
+                return message.content, errors
+            message.content = content
+        return None, []
+
+    def stream(self, compiled: CompiledSchema, n: int = 1) -> "StreamValidation":
+        return StreamValidation(self, compiled, n)
+
+    def record_stream(
+        self, compiled: CompiledSchema, checker: JSONStreamChecker, ok: bool
+    ) -> None:
+        self._record(compiled, checker.seconds, ok)
+        if checker.error is not None:
+            self._schema_stats(compiled).stream_aborts += 1
+
+    def record_retry(self, compiled: CompiledSchema) -> None:
+        self._schema_stats(compiled).retries += 1
+
+    def fail(
+        self, compiled: CompiledSchema, errors: list[str]
+    ) -> StructuredOutputError:
+        self._schema_stats(compiled).exhausted += 1
+        return StructuredOutputError(
+            f"Output does not match response_format {compiled.name!r}: "
+            + "; ".join(errors),
+            errors,
+        )
+
+    def repair_request(
+        self, request: ChatRequest, content: str | None, errors: list[str]
+    ) -> ChatRequest:
+        """
+        The original request followed by the rejected output and the errors.
+        """
+        feedback = REPAIR_PROMPT.format(
+            errors="\n".join(f"- {error}" for error in errors)
+        )
+        messages = [
+            *request.messages,
+            ChatMessage(role="assistant", content=content or ""),
+            ChatMessage(role="user", content=feedback),
+        ]
+        return request.model_copy(update={"messages": messages})
+
+    def stats(self) -> dict:
+        return {
+            "max_retries": self.max_retries,
+            "compiled_schemas": len(self._compiled),
+            "compiles": self.compiles,
+            "compile_hits": self.compile_hits,
+            "schemas": {stats.id: stats.describe() for stats in self._stats.values()},
+        }
+
+
+class StreamValidation:
+    """
+    Incremental validation of one streamed attempt, one checker per
+    candidate.
+    """
+
+    def __init__(
+        self, validator: StructuredOutputValidator, compiled: CompiledSchema, n: int
+    ):
+        self.validator = validator
+        self.compiled = compiled
+        self.checkers = {index: JSONStreamChecker(compiled) for index in range(n)}
+        self.tool_calls: set[int] = set()
+        self.aborted: JSONStreamChecker | None = None
+
+    def feed(self, chunk: ChatCompletionChunk) -> bool:
+        """
+        Check a chunk; True when it shows a violation and the stream should
+        be aborted before the chunk is sent.
+        """
+        for choice in chunk.choices:
+            checker = self.checkers.get(choice.index)
+            if checker is None:
+                continue
+            if choice.delta.tool_calls:
+                self.tool_calls.add(choice.index)
+            if choice.delta.content and checker.feed(choice.delta.content):
+                self.aborted = checker
+                return True
+        return False
+
+    def finish(self) -> tuple[str | None, list[str]]:
+        """
+        The first rejected output and its violations, if any.
+        """
+        if self.aborted is not None:
+            # 끊긴 스트림의 다른 후보는 미완성이므로 검사하지 않는다
+            checkers = [self.aborted]
+        else:
+            checkers = [
+                checker
+                for index, checker in self.checkers.items()
+                if index not in self.tool_calls
+            ]
+        rejected: tuple[str | None, list[str]] = (None, [])
+        for checker in checkers:
+            errors = checker.finish()
+            self.validator.record_stream(self.compiled, checker, not errors)
+            if errors and not rejected[1]:
+                rejected = (checker.text, errors)
+        return rejected
@@ -0,0 +1,32 @@
+import json
+
+from llm_gateway.schemas.chat import ChatMessage, ChatRequest, ChatResponse
+
+# 토크나이저 없이 쓰는 근사치: 대략 4글자당 1토큰
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str | None) -> int:
+    return len(text) // CHARS_PER_TOKEN if text else 0
+
+
+def estimate_message_tokens(message: ChatMessage) -> int:
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.content)
+    if message.tool_calls:
+        tokens += estimate_tokens(json.dumps(message.tool_calls))
+    return tokens
+
+
+def estimate_request_tokens(request: ChatRequest) -> int:
+    """
+    Rough input token count for a request (messages + tool schemas).
+    """
+    tokens = sum(estimate_message_tokens(msg) for msg in request.messages)
+    if request.tools:
+        tokens += estimate_tokens(json.dumps(request.tools))
+    return tokens
+
+
+def estimate_response_tokens(response: ChatResponse) -> int:
+    return sum(estimate_message_tokens(choice.message) for choice in response.choices)
@@ -0,0 +1,386 @@
+"""
+Per-request stage tracing.
+
+Every request records its stages (validation, compaction, admission, routing,
+upstream calls, serialization) as spans in a contextvar-held trace, cheap
+enough to feed a Server-Timing header on every response. Only a sample of
+traces, plus slow requests, is exported: finished traces go to a bounded
+queue drained in batches by a background task, so export never blocks a
+request and overflow is dropped and counted.
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, eq=False)
+class Span:
+    name: str
+    start: float  # time.perf_counter()
+    end: float | None = None
+    # id는 전송할 때만 만든다 (요청마다 uuid를 만드는 비용을 피함)
+    parent: "Span | None" = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class Trace:
+    """
+    Spans recorded while serving one request, under a root span.
+    """
+
+    def __init__(self, name: str, sampled: bool):
+        self.root = Span(name, time.perf_counter())
+        self.spans: list[Span] = []
+        self.sampled = sampled
+        self.started_at = time.time()
+        self._token: Token | None = None
+
+    def wall_time(self, perf: float) -> datetime:
+        return datetime.fromtimestamp(
+            self.started_at + (perf - self.root.start), tz=UTC
+        )
+
+    def server_timing(self) -> str:
+        """
+        Server-Timing header value: finished spans summed by name plus the
+        total so far, in milliseconds.
+        """
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            if span.end is not None:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        entries = [
+            f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items()
+        ]
+        entries.append(f"total;dur={self.root.duration * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_trace: ContextVar[Trace | None] = ContextVar("trace", default=None)
+_parent: ContextVar[Span | None] = ContextVar("trace_parent", default=None)
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+def _current_parent(trace: Trace) -> Span:
+    return _parent.get() or trace.root
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """
+    Time a block as a child of the current span. Not for blocks spanning an
+    async generator's yields (the context may change between them); use
+    `add_span` there.
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    current = Span(
+        name, time.perf_counter(), parent=_current_parent(trace), attributes=attributes
+    )
+    token = _parent.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _parent.reset(token)
+        trace.spans.append(current)
+
+
+def add_span(name: str, started: float, **attributes: Any) -> None:
+    """
+    Record a span that started at `started` (perf_counter) and ends now.
+    """
+    trace = _trace.get()
+    if trace is not None:
+        trace.spans.append(
+            Span(
+                name,
+                started,
+                time.perf_counter(),
+                parent=_current_parent(trace),
+                attributes=attributes,
+            )
+        )
+
+
+def annotate(**attributes: Any) -> None:
+    """
+    Add attributes (model, client, ...) to the current request's root span.
+    """
+    trace = _trace.get()
+    if trace is not None:
+        trace.root.attributes.update(attributes)
+
+
+class BatchExporter:
+    """
+    Exports finished traces in the background, in batches of up to
+    `batch_size` or every `flush_seconds`. `submit` never blocks: when the
+    bounded queue is full the trace is dropped and counted.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[list[Trace]], Awaitable[None]],
+        max_queue: int = 1000,
+        batch_size: int = 50,
+        flush_seconds: float = 1.0,
+    ):
+        self.sink = sink
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: asyncio.Queue[Trace] = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+        self._inflight: asyncio.Future | None = None
+        # 모으는 중인 batch (종료 시 함께 내보낸다)
+        self._batch: list[Trace] = []
+        self._closed = False
+
+        self.submitted = 0
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def submit(self, trace: Trace) -> bool:
+        if self._closed:
+            self.dropped += 1
+            return False
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        try:
+            self._queue.put_nowait(trace)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batch.append(await self._queue.get())
+            deadline = loop.time() + self.flush_seconds
+            while len(self._batch) < self.batch_size:
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        self._batch.append(await self._queue.get())
+                except TimeoutError:
+                    break
+            batch, self._batch = self._batch, []
+            # 종료(cancel) 중에도 보내고 있던 batch는 끝까지 보낸다
+            self._inflight = asyncio.ensure_future(self._export(batch))
+            await asyncio.shield(self._inflight)
+
+    async def _export(self, batch: list[Trace]) -> None:
+        self.batches += 1
+        try:
+            await self.sink(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.warning("Exporting %d traces failed: %s", len(batch), e)
+        else:
+            self.exported += len(batch)
+
+    async def aclose(self, timeout: float = 5.0) -> None:
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        # 종료 시 남은 trace를 마지막으로 내보낸다
+        remaining, self._batch = self._batch, []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        try:
+            async with asyncio.timeout(timeout):
+                if self._inflight is not None:
+                    await self._inflight
+                for start in range(0, len(remaining), self.batch_size):
+                    await self._export(remaining[start : start + self.batch_size])
+        except TimeoutError:
+            logger.warning("Trace export did not finish within %.1fs", timeout)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+class LangSmithSink:
+    """
+    Posts traces to the LangSmith batch run API (or any collector speaking
+    it). Runs carry timings and request metadata, not prompt or output text.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        api_key: str | None,
+        project: str,
+        client: httpx.AsyncClient | None = None,
+    ):
+        self.url = f"{endpoint.rstrip('/')}/runs/batch"
+        self.headers = {"x-api-key": api_key} if api_key else {}
+        self.project = project
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # 첫 전송 때 만든다 (app 생성 시 TLS 설정 비용을 피함)
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=10.0)
+        return self._client
+
+    def runs(self, trace: Trace) -> list[dict]:
+        spans = [trace.root, *trace.spans]
+        ids = {current: str(uuid.uuid4()) for current in spans}
+        dotted: dict[Span, str] = {}
+
+        def dotted_order(current: Span) -> str:
+            # root부터 이어진 "시작시각+id" 경로 (LangSmith의 run tree 정렬 키)
+            if current not in dotted:
+                start = trace.wall_time(current.start)
+                order = f"{start:%Y%m%dT%H%M%S%fZ}{ids[current]}"
+                if current.parent in ids:
+                    order = f"{dotted_order(current.parent)}.{order}"
+                dotted[current] = order
+            return dotted[current]
+
+        runs = []
+        for current in spans:
+            start = trace.wall_time(current.start)
+            order = dotted_order(current)
+            attributes = dict(current.attributes)
+            error = attributes.pop("error", None)
+            run = {
+                "id": ids[current],
+                "trace_id": ids[trace.root],
+                "parent_run_id": ids.get(current.parent),
+                "dotted_order": order,
+                "name": current.name,
+                "run_type": "llm" if current.name == "upstream" else "chain",
+                "start_time": start.isoformat(),
+                "end_time": trace.wall_time(
+                    current.end if current.end is not None else current.start
+                ).isoformat(),
+                "inputs": {},
+                "outputs": {},
+                "extra": {"metadata": attributes},
+                "session_name": self.project,
+            }
+            if error is not None:
+                run["error"] = error
+            runs.append(run)
+        return runs
+
+    async def __call__(self, traces: list[Trace]) -> None:
+        runs = [run for trace in traces for run in self.runs(trace)]
+        response = await self.client.post(
+            self.url, json={"post": runs}, headers=self.headers
+        )
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+
+
+class Tracer:
+    """
+    Opens a trace per request and exports a sample of them: a
+    `sample_rate` fraction, plus every request slower than `slow_seconds`.
+    Spans are recorded for every request so Server-Timing is always
+    available; export is the only sampled part.
+    """
+
+    def __init__(
+        self,
+        exporter: BatchExporter | None = None,
+        sample_rate: float = 0.0,
+        slow_seconds: float | None = None,
+        random_fn: Callable[[], float] = random.random,
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self._random = random_fn
+        self.traces = 0
+        self.sampled = 0
+        self.slow = 0
+
+    def begin(self, name: str) -> Trace:
+        trace = Trace(name, sampled=self._random() < self.sample_rate)
+        trace._token = _trace.set(trace)
+        self.traces += 1
+        return trace
+
+    def end(self, trace: Trace, **attributes: Any) -> None:
+        trace.root.end = time.perf_counter()
+        trace.root.attributes.update(attributes)
+        if trace._token is not None:
+            _trace.reset(trace._token)
+            trace._token = None
+        if self.exporter is None:
+            return
+        slow = (
+            self.slow_seconds is not None and trace.root.duration >= self.slow_seconds
+        )
+        if trace.sampled or slow:
+            self.sampled += trace.sampled
+            self.slow += slow and not trace.sampled
+            self.exporter.submit(trace)
+
+    async def aclose(self) -> None:
+        if self.exporter is not None:
+            await self.exporter.aclose()
+            sink_close = getattr(self.exporter.sink, "aclose", None)
+            if sink_close is not None:
+                await sink_close()
+
+    def stats(self) -> dict:
+        stats = {
+            "traces": self.traces,
+            "sample_rate": self.sample_rate,
+            "slow_seconds": self.slow_seconds,
+            "sampled": self.sampled,
+            "slow": self.slow,
+            "export": None,
+        }
+        if self.exporter is not None:
+            stats["export"] = self.exporter.stats()
+        return stats
@@ -0,0 +1,323 @@
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, fields
+
+from llm_gateway.core.config import ModelPrice
+from llm_gateway.core.metrics import model_labels
+from llm_gateway.core.state import StateStore
+from llm_gateway.schemas.chat import ChatUsage
+
+logger = logging.getLogger(__name__)
+
+# max_clients를 넘어선 새 client id는 이 이름으로 묶는다
+OTHER_CLIENT = "other"
+
+
+@dataclass
+class UsageTotals:
+    requests: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_seconds: float = 0.0
+
+    def add(self, other: "UsageTotals") -> None:
+        for name, value in asdict(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+
+class UsageAggregator:
+    """
+    In-memory token/latency totals per (caller, model).
+
+    Recording only bumps counters. Every `flush_seconds` the current window is
+    swapped out and handed to `sink` on a worker thread, so a slow disk never
+    blocks request handling. Without a sink the window is logged. `start`
+    flushes on a timer even when no requests arrive, and `aclose` flushes
+    the last window.
+
+    Client ids come from a request header, so at most `max_clients` are
+    tracked; further ids are counted under "other". Model names are bounded
+    the same way by `model_labels`.
+
+    With a shared `store` each flushed window is also added to cluster-wide
+    counters (one pipelined batch per flush), read back by `cluster_report`.
+    """
+
+    def __init__(
+        self,
+        prices: dict[str, ModelPrice] | None = None,
+        flush_seconds: float = 60.0,
+        sink: Callable[[dict], None] | None = None,
+        store: StateStore | None = None,
+        max_clients: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.prices = prices or {}
+        self.flush_seconds = flush_seconds
+        self.max_clients = max_clients
+        self.sink = sink or _log_sink
+        self.store = store if store is not None and store.shared else None
+        self._clock = clock
+
+        self.started_at = clock()
+        # (client, model) -> 누적 / 마지막 flush 이후
+        self._totals: dict[tuple[str, str], UsageTotals] = {}
+        self._window: dict[tuple[str, str], UsageTotals] = {}
+        self._window_started = time.time()
+        self._last_flush = clock()
+        self._flushing: asyncio.Task | None = None
+        self._periodic: asyncio.Task | None = None
+        self._clients: set[str] = set()
+
+        self.flushes = 0
+        self.flush_failures = 0
+        self.publish_failures = 0
+
+    def _entries(self, client: str | None, model: str) -> tuple[UsageTotals, ...]:
+        client = client or "anonymous"
+        if client not in self._clients:
+            if len(self._clients) >= self.max_clients:
+                client = OTHER_CLIENT
+            else:
+                self._clients.add(client)
+        key = (client, model_labels.label(model))
+        totals = self._totals.get(key)
+        if totals is None:
+            totals = self._totals[key] = UsageTotals()
+        window = self._window.get(key)
+        if window is None:
+            window = self._window[key] = UsageTotals()
+        return totals, window
+
+    def record_request(
+        self,
+        client: str | None,
+        model: str,
+        latency: float,
+        cache_hit: bool = False,
+        failed: bool = False,
+    ) -> None:
+        for entry in self._entries(client, model):
+            entry.requests += 1
+            entry.latency_seconds += latency
+            if cache_hit:
+                entry.cache_hits += 1
+            if failed:
+                entry.errors += 1
+        self._maybe_flush()
+
+    def record_tokens(self, client: str | None, model: str, usage: ChatUsage) -> None:
+        cached = (
+            usage.prompt_tokens_details.cached_tokens
+            if usage.prompt_tokens_details
+            else 0
+        )
+        for entry in self._entries(client, model):
+            entry.prompt_tokens += usage.prompt_tokens
+            entry.completion_tokens += usage.completion_tokens
+            entry.cached_tokens += cached
+
+    def price_for(self, model: str) -> ModelPrice | None:
+        matches = [prefix for prefix in self.prices if model.startswith(prefix)]
+        if not matches:
+            return None
+        return self.prices[max(matches, key=len)]
+
+    def cost(self, model: str, totals: UsageTotals) -> float | None:
+        price = self.price_for(model)
+        if price is None:
+            return None
+        cached_price = (
+            price.cached_input if price.cached_input is not None else price.input
+        )
+        return (
+            (totals.prompt_tokens - totals.cached_tokens) * price.input
+            + totals.cached_tokens * cached_price
+            + totals.completion_tokens * price.output
+        ) / 1_000_000
+
+    def _maybe_flush(self) -> None:
+        if self._clock() - self._last_flush < self.flush_seconds:
+            return
+        if self._flushing is not None and not self._flushing.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flushing = loop.create_task(self.flush())
+
+    def start(self) -> None:
+        """
+        Flush every `flush_seconds` in the background, so the last window
+        before a quiet period is not held back until the next request.
+        """
+        if self._periodic is None:
+            self._periodic = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            self._maybe_flush()
+
+    async def aclose(self) -> None:
+        """
+        Stop the periodic flush and flush the current window.
+        """
+        if self._periodic is not None:
+            self._periodic.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._periodic
+            self._periodic = None
+        if self._flushing is not None:
+            await self._flushing
+        await self.flush()
+
+    async def flush(self) -> None:
+        self._last_flush = self._clock()
+        window, self._window = self._window, {}
+        started, self._window_started = self._window_started, time.time()
+        if not window:
+            return
+
+        record = {
+            "window_start": started,
+            "window_end": self._window_started,
+            "usage": [
+                {
+                    "client": client,
+                    "model": model,
+                    **asdict(totals),
+                    "cost_usd": self.cost(model, totals),
+                }
+                for (client, model), totals in window.items()
+            ],
+        }
+        try:
+            await asyncio.to_thread(self.sink, record)
+            self.flushes += 1
+        except Exception:
+            self.flush_failures += 1
+            logger.warning("Failed to flush usage window", exc_info=True)
+
+        if self.store is not None:
+            try:
+                await self._publish(window)
+            except Exception as e:
+                self.publish_failures += 1
+                logger.warning("Failed to publish usage window: %s", e)
+
+    async def _publish(self, window: dict[tuple[str, str], UsageTotals]) -> None:
+        # 명령을 한 번에 내보내 store의 pipelining으로 한 번의 왕복에 묶는다
+        writes = [self.store.sadd(_PAIRS_KEY, *map(_pair_member, window))]
+        for pair, totals in window.items():
+            for name, value in _counters(totals).items():
+                if value:
+                    writes.append(self.store.incr(_counter_key(pair, name), value))
+        await asyncio.gather(*writes)
+
+    async def cluster_report(self, client: str | None = None) -> dict:
+        """
+        Like `report`, but from the counters shared by all workers (flushed
+        windows only).
+        """
+        pairs = [tuple(json.loads(m)) for m in await self.store.smembers(_PAIRS_KEY)]
+        if client is not None:
+            pairs = [pair for pair in pairs if pair[0] == client]
+        names = list(_counters(UsageTotals()))
+        values = await self.store.mget(
+            [_counter_key(pair, name) for pair in pairs for name in names]
+        )
+        totals = {}
+        for i, pair in enumerate(pairs):
+            counters = values[i * len(names) : (i + 1) * len(names)]
+            totals[pair] = _from_counters(
+                {name: int(v or 0) for name, v in zip(names, counters, strict=True)}
+            )
+        return self._describe(totals, client)
+
+    def report(self, client: str | None = None) -> dict:
+        """
+        Totals since startup per caller and model, with cost and throughput.
+        """
+        return self._describe(self._totals, client)
+
+    def _describe(
+        self, totals_by_key: dict[tuple[str, str], UsageTotals], client: str | None
+    ) -> dict:
+        elapsed_minutes = max(self._clock() - self.started_at, 1e-9) / 60
+        callers: dict[str, dict] = {}
+        for (caller, model), totals in totals_by_key.items():
+            if client is not None and caller != client:
+                continue
+            cost = self.cost(model, totals)
+            tokens = totals.prompt_tokens + totals.completion_tokens
+            callers.setdefault(caller, {"cost_usd": 0.0, "models": {}})
+            callers[caller]["models"][model] = {
+                **asdict(totals),
+                "latency_seconds": round(totals.latency_seconds, 3),
+                "avg_latency_seconds": round(
+                    totals.latency_seconds / totals.requests, 3
+                )
+                if totals.requests
+                else 0.0,
+                "cost_usd": round(cost, 6) if cost is not None else None,
+                "requests_per_minute": round(totals.requests / elapsed_minutes, 3),
+                "tokens_per_minute": round(tokens / elapsed_minutes, 3),
+            }
+            callers[caller]["cost_usd"] = round(
+                callers[caller]["cost_usd"] + (cost or 0.0), 6
+            )
+        return {
+            "uptime_seconds": round(self._clock() - self.started_at, 3),
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "publish_failures": self.publish_failures,
+            "callers": callers,
+        }
+
+
+_PAIRS_KEY = "usage:pairs"
+
+
+def _pair_member(pair: tuple[str, str]) -> str:
+    return json.dumps(pair, ensure_ascii=False)
+
+
+def _counter_key(pair: tuple[str, str], name: str) -> str:
+    return f"usage:{_pair_member(pair)}:{name}"
+
+
+def _counters(totals: UsageTotals) -> dict[str, int]:
+    # store 카운터는 정수만 다루므로 지연 시간은 microsecond로 저장한다
+    counters = {
+        f.name: getattr(totals, f.name)
+        for f in fields(totals)
+        if f.name != "latency_seconds"
+    }
+    counters["latency_us"] = round(totals.latency_seconds * 1_000_000)
+    return counters
+
+
+def _from_counters(counters: dict[str, int]) -> UsageTotals:
+    latency_us = counters.pop("latency_us")
+    return UsageTotals(**counters, latency_seconds=latency_us / 1_000_000)
+
+
+def _log_sink(record: dict) -> None:
+    logger.info("usage %s", json.dumps(record, ensure_ascii=False))
+
+
+def jsonl_sink(path: str) -> Callable[[dict], None]:
+    def write(record: dict) -> None:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    return write
@@ -1 +1,11 @@
-from .gemini import GeminiProvider
+from .fake import FakeProvider
+from .openai_compat import OpenAICompatibleProvider
+
+
+def __getattr__(name: str):
+    # google.genai SDK는 import 비용이 크므로 GeminiProvider가 필요할 때 로드한다
+    if name == "GeminiProvider":
+        from .gemini import GeminiProvider
+
+        return GeminiProvider
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,157 @@
+import asyncio
+import math
+import random
+import time
+import uuid
+from collections.abc import AsyncIterator
+from typing import Literal
+
+from llm_gateway.core.exceptions import UpstreamError
+from llm_gateway.core.interfaces import BaseLLMProvider
+from llm_gateway.core.metrics import UpstreamCall
+from llm_gateway.core.tokens import estimate_request_tokens
+from llm_gateway.schemas.chat import (
+    ChatChunkChoice,
+    ChatCompletionChunk,
+    ChatDelta,
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+    ChatResponseChoice,
+    ChatUsage,
+)
+
+PROVIDER_NAME = "fake"
+
+LatencyDistribution = Literal["constant", "uniform", "lognormal"]
+
+
+class FakeProvider(BaseLLMProvider):
+    """
+    Provider that answers locally after an injected delay, for load tests and
+    benchmarks that must not spend real quota.
+
+    `latency` is the median time to the full response (time to first token
+    for streams); `spread` is the relative jitter for "uniform" and the sigma
+    for "lognormal". Streams then emit `completion_tokens` tokens at
+    `tokens_per_second`.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        distribution: LatencyDistribution = "lognormal",
+        spread: float = 0.5,
+        error_rate: float = 0.0,
+        tokens_per_second: float = 50.0,
+        completion_tokens: int = 100,
+        chunk_tokens: int = 5,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.distribution = distribution
+        self.spread = spread
+        self.error_rate = error_rate
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.chunk_tokens = chunk_tokens
+        self._random = random.Random(seed)
+
+    def sample_latency(self) -> float:
+        if self.latency <= 0:
+            # 지연 없는 부하 테스트용 (lognormal은 log(0)을 계산할 수 없다)
+            return 0.0
+        if self.distribution == "constant":
+            return self.latency
+        if self.distribution == "uniform":
+            return self._random.uniform(
+                self.latency * (1 - self.spread), self.latency * (1 + self.spread)
+            )
+        # lognormal: 중앙값이 latency, 꼬리가 긴 실제 LLM 지연 분포에 가깝다
+        return self._random.lognormvariate(math.log(self.latency), self.spread)
+
+    def _maybe_fail(self) -> None:
+        if self._random.random() < self.error_rate:
+            raise UpstreamError("Injected fake provider error.", retryable=True)
+
+    def _usage(self, request: ChatRequest) -> ChatUsage:
+        prompt_tokens = estimate_request_tokens(request)
+        return ChatUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            total_tokens=prompt_tokens + self.completion_tokens,
+        )
+
+    async def chat_complete(self, request: ChatRequest) -> ChatResponse:
+        call = UpstreamCall(PROVIDER_NAME, request.model)
+        try:
+            await asyncio.sleep(self.sample_latency())
+            self._maybe_fail()
+        except BaseException:
+            call.finish("error")
+            raise
+        call.finish("success")
+
+        return ChatResponse(
+            id=f"chatcmpl-{uuid.uuid4()}",
+            created=int(time.time()),
+            model=request.model,
+            choices=[
+                ChatResponseChoice(
+                    index=0,
+                    message=ChatMessage(
+                        role="assistant", content="lorem " * self.completion_tokens
+                    ),
+                    finish_reason="stop",
+                )
+            ],
+            usage=self._usage(request),
+        )
+
+    async def chat_stream(
+        self, request: ChatRequest
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        chunk_id = f"chatcmpl-{uuid.uuid4()}"
+        created = int(time.time())
+
+        call = UpstreamCall(PROVIDER_NAME, request.model)
+        outcome = "cancelled"
+        try:
+            await asyncio.sleep(self.sample_latency())
+            self._maybe_fail()
+            call.first_token()
+
+            sent = 0
+            while sent < self.completion_tokens:
+                tokens = min(self.chunk_tokens, self.completion_tokens - sent)
+                if sent:
+                    await asyncio.sleep(tokens / self.tokens_per_second)
+                yield ChatCompletionChunk(
+                    id=chunk_id,
+                    created=created,
+                    model=request.model,
+                    choices=[
+                        ChatChunkChoice(
+                            index=0,
+                            delta=ChatDelta(
+                                role="assistant" if not sent else None,
+                                content="lorem " * tokens,
+                            ),
+                        )
+                    ],
+                )
+                sent += tokens
+            outcome = "success"
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            call.finish(outcome)
+
+        yield ChatCompletionChunk(
+            id=chunk_id,
+            created=created,
+            model=request.model,
+            choices=[ChatChunkChoice(index=0, delta=ChatDelta(), finish_reason="stop")],
+            usage=self._usage(request),
+        )
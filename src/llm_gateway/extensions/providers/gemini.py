@@ -1,26 +1,172 @@
 import json
 import time
 import uuid
+from collections.abc import AsyncIterator
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any
 
+import httpx
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
 from llm_gateway.core.config import settings
+from llm_gateway.core.exceptions import UpstreamError, UpstreamRateLimitError
 from llm_gateway.core.interfaces import BaseLLMProvider
+from llm_gateway.core.metrics import STAGE_SECONDS, UpstreamCall
+from llm_gateway.core.tracing import add_span
+from llm_gateway.extensions.providers.gemini_cache import GeminiContextCache
 from llm_gateway.schemas.chat import (
+    ChatChunkChoice,
+    ChatCompletionChunk,
+    ChatDelta,
     ChatMessage,
     ChatRequest,
     ChatResponse,
     ChatResponseChoice,
+    ChatUsage,
+    PromptTokensDetails,
 )
 
+PROVIDER_NAME = "google"
+
+_CONVERT_STAGE = STAGE_SECONDS.labels("convert")
+_PARSE_STAGE = STAGE_SECONDS.labels("parse")
+
+
+def _convert_message(
+    role: str,
+    content: str | None,
+    tool_call_id: str | None,
+    tool_calls_json: str | None,
+) -> types.Content:
+    """
+    Convert a single non-system ChatMessage (given by its fields) to Gemini Content.
+
+    Arguments are hashable so results can be memoized across requests; the
+    returned Content is shared and must not be mutated.
+    """
+    if role == "tool":
+        # Tool Response
+        return types.Content(
+            role="tool",
+            parts=[
+                types.Part(
+                    function_response=types.FunctionResponse(
+                        name=tool_call_id,
+                        response={"result": content},  # content is usually JSON string
+                    )
+                )
+            ],
+        )
+
+    parts = []
+
+    if content:
+        parts.append(types.Part(text=content))
+
+    if tool_calls_json:
+        for tool_call in json.loads(tool_calls_json):
+            if tool_call.get("type") == "function":
+                fn = tool_call["function"]
+                parts.append(
+                    types.Part(
+                        function_call=types.FunctionCall(
+                            name=fn["name"],
+                            args=json.loads(fn["arguments"])
+                            if isinstance(fn["arguments"], str)
+                            else fn["arguments"],
+                        )
+                    )
+                )
+
+    return types.Content(role="model" if role == "assistant" else "user", parts=parts)
+
+
+def _convert_tools(tools_json: str) -> tuple[types.Tool, ...]:
+    function_declarations = []
+    for tool in json.loads(tools_json):
+        if tool.get("type") == "function":
+            fn = tool["function"]
+            # OpenAI schema to Gemini Schema mapping
+            function_declarations.append(
+                types.FunctionDeclaration(
+                    name=fn.get("name"),
+                    description=fn.get("description"),
+                    parameters=fn.get("parameters"),
+                )
+            )
+
+    if not function_declarations:
+        return ()
+
+    return (types.Tool(function_declarations=function_declarations),)
+
+
+@contextmanager
+def _upstream_errors():
+    """
+    Translate Gemini SDK errors the gateway handles specially.
+    """
+    try:
+        yield
+    except errors.APIError as e:
+        if e.code == 429:
+            raise UpstreamRateLimitError(str(e.message)) from e
+        if e.code >= 500:
+            raise UpstreamError(str(e.message), retryable=True) from e
+        # 잘못된 요청(400)은 호출자에게 그대로, 그 외 4xx는 gateway 쪽 문제로 본다
+        raise UpstreamError(
+            str(e.message), status_code=400 if e.code == 400 else 502
+        ) from e
+
+
+async def _prepend(first, stream: AsyncIterator) -> AsyncIterator:
+    if first is None:
+        return
+    yield first
+    async for item in stream:
+        yield item
+
 
 class GeminiProvider(BaseLLMProvider):
-    def __init__(self):
+    # GenerateContentConfig.candidate_count 상한
+    max_candidates = 8
+
+    def __init__(self, http_client: httpx.AsyncClient | None = None):
         if not settings.GOOGLE_API_KEY:
             raise ValueError("GOOGLE_API_KEY is not set in environment variables.")
         # Client 초기화는 동기적으로 수행
-        self.client = genai.Client(api_key=settings.GOOGLE_API_KEY)
+        # http_client가 있으면 gateway가 관리하는 공유 connection pool을 쓴다
+        # (chats.create로 만드는 세션 객체는 이 client의 pool을 공유한다)
+        self.client = genai.Client(
+            api_key=settings.GOOGLE_API_KEY,
+            http_options=types.HttpOptions(httpx_async_client=http_client)
+            if http_client is not None
+            else None,
+        )
+
+        # 긴 세션은 매 요청마다 같은 history와 tool schema를 다시 보내므로
+        # 메시지/툴 단위 변환 결과를 내용 기준으로 재사용한다
+        self._convert_message_cached = lru_cache(
+            maxsize=settings.GEMINI_CONVERSION_CACHE_SIZE
+        )(_convert_message)
+        self._convert_tools_cached = lru_cache(maxsize=64)(_convert_tools)
+
+        self.context_cache = None
+        if settings.GEMINI_CONTEXT_CACHE_ENABLED:
+            self.context_cache = GeminiContextCache(
+                self.client.aio.caches,
+                min_tokens=settings.GEMINI_CONTEXT_CACHE_MIN_TOKENS,
+                ttl_seconds=settings.GEMINI_CONTEXT_CACHE_TTL_SECONDS,
+            )
+
+    async def warm_up(self) -> None:
+        # 가벼운 모델 메타데이터 조회로 DNS/TLS 연결을 미리 맺어 둔다
+        await self.client.aio.models.get(model=settings.GEMINI_DEFAULT_MODEL)
+
+    async def aclose(self) -> None:
+        await self.client.aio.aclose()
 
     def _convert_messages(
         self, messages: list[ChatMessage]
@@ -37,46 +183,17 @@ class GeminiProvider(BaseLLMProvider):
                     system_instruction = msg.content
                 else:
                     system_instruction += f"\n{msg.content}"
-            elif msg.role == "tool":
-                # Tool Response
+            else:
                 history.append(
-                    types.Content(
-                        role="tool",
-                        parts=[
-                            types.Part(
-                                function_response=types.FunctionResponse(
-                                    name=msg.tool_call_id,
-                                    response={
-                                        "result": msg.content
-                                    },  # content is usually JSON string
-                                )
-                            )
-                        ],
+                    self._convert_message_cached(
+                        msg.role,
+                        msg.content,
+                        msg.tool_call_id,
+                        json.dumps(msg.tool_calls, sort_keys=True)
+                        if msg.tool_calls
+                        else None,
                     )
                 )
-            else:
-                role = "model" if msg.role == "assistant" else "user"
-                parts = []
-
-                if msg.content:
-                    parts.append(types.Part(text=msg.content))
-
-                if msg.tool_calls:
-                    for tool_call in msg.tool_calls:
-                        if tool_call.get("type") == "function":
-                            fn = tool_call["function"]
-                            parts.append(
-                                types.Part(
-                                    function_call=types.FunctionCall(
-                                        name=fn["name"],
-                                        args=json.loads(fn["arguments"])
-                                        if isinstance(fn["arguments"], str)
-                                        else fn["arguments"],
-                                    )
-                                )
-                            )
-
-                history.append(types.Content(role=role, parts=parts))
 
         return history, system_instruction
 
@@ -84,25 +201,32 @@ class GeminiProvider(BaseLLMProvider):
         if not tools:
             return None
 
-        function_declarations = []
-        for tool in tools:
-            if tool.get("type") == "function":
-                fn = tool["function"]
-                # OpenAI schema to Gemini Schema mapping
-                function_declarations.append(
-                    types.FunctionDeclaration(
-                        name=fn.get("name"),
-                        description=fn.get("description"),
-                        parameters=fn.get("parameters"),
-                    )
-                )
+        gemini_tools = self._convert_tools_cached(json.dumps(tools, sort_keys=True))
+        return list(gemini_tools) if gemini_tools else None
 
-        if not function_declarations:
-            return None
+    def conversion_cache_stats(self) -> dict:
+        stats = {}
+        for name, cached in (
+            ("messages", self._convert_message_cached),
+            ("tools", self._convert_tools_cached),
+        ):
+            info = cached.cache_info()
+            stats[name] = {
+                "hits": info.hits,
+                "misses": info.misses,
+                "entries": info.currsize,
+            }
+        return stats
 
-        return [types.Tool(function_declarations=function_declarations)]
+    def _prepare_chat(self, request: ChatRequest, use_context_cache: bool = True):
+        """
+        Build the Gemini chat session and the message to send for a request.
+
+        Returns the chat, the resolved model name, the message to send and the
+        cached content name referenced by the chat config (if any).
+        """
+        started = time.perf_counter()
 
-    async def chat_complete(self, request: ChatRequest) -> ChatResponse:
         # 모델명 결정
         model_name = request.model
         if not model_name or model_name == "gemini" or model_name == "google":
@@ -152,20 +276,46 @@ class GeminiProvider(BaseLLMProvider):
                 )
             )
 
+        chat_history = (
+            history[:-1] if history and history[-1].role == "user" else history
+        )
+
+        cached_content = None
+        if use_context_cache and self.context_cache is not None:
+            cached_content, covered = self.context_cache.lookup(
+                model_name,
+                system_instruction,
+                request.tools,
+                request.tool_choice,
+                [msg for msg in request.messages if msg.role != "system"],
+                chat_history,
+                gemini_tools,
+                tool_config,
+            )
+            if cached_content:
+                # 캐시된 prefix는 다시 보내지 않는다
+                # (system instruction, tools, tool config도 캐시에 포함됨)
+                chat_history = chat_history[covered:]
+                system_instruction = None
+                gemini_tools = None
+                tool_config = None
+
         config = types.GenerateContentConfig(
             temperature=request.temperature,
             max_output_tokens=request.max_tokens,
+            candidate_count=request.n if request.n > 1 else None,
             system_instruction=system_instruction,
             response_mime_type=response_mime_type,
             response_schema=response_schema,
             tools=gemini_tools,
             tool_config=tool_config,
+            cached_content=cached_content,
         )
 
         chat = self.client.aio.chats.create(
             model=model_name,
             config=config,
-            history=history[:-1] if history and history[-1].role == "user" else history,
+            history=chat_history,
         )
 
         last_message_content = ""
@@ -178,15 +328,61 @@ class GeminiProvider(BaseLLMProvider):
         else:
             last_message_content = "..."
 
-        # 비동기 호출 (이미 await 사용 중)
-        response = await chat.send_message(message=last_message_content)
+        _CONVERT_STAGE.observe(time.perf_counter() - started)
+        add_span("convert", started)
+        return chat, model_name, last_message_content, cached_content
 
-        # Response parsing
+    def _should_fallback(self, cached_content: str | None, error: Exception) -> bool:
+        if cached_content is None or not self.context_cache.should_fallback(error):
+            return False
+        # 만료/삭제된 context cache를 참조한 경우 캐시 없이 재시도한다
+        self.context_cache.invalidate(cached_content)
+        return True
+
+    def _usage(self, response) -> ChatUsage | None:
+        """
+        OpenAI-style usage from a Gemini response's usage metadata.
+        """
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is None or not isinstance(metadata.prompt_token_count, int):
+            return None
+
+        prompt_tokens = metadata.prompt_token_count
+        # thinking 모델의 사고 토큰도 출력 토큰으로 과금된다
+        completion_tokens = (metadata.candidates_token_count or 0) + (
+            metadata.thoughts_token_count or 0
+        )
+        return ChatUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens_details=PromptTokensDetails(
+                cached_tokens=metadata.cached_content_token_count or 0
+            ),
+        )
+
+    def _candidates(self, response) -> list[tuple[int, Any]]:
+        """
+        (choice index, candidate) pairs of a Gemini response (or chunk).
+        """
+        return [
+            # 후보가 하나면 index가 비어 있을 수 있다
+            (
+                candidate.index if isinstance(candidate.index, int) else position,
+                candidate,
+            )
+            for position, candidate in enumerate(response.candidates or [])
+        ]
+
+    def _parse_parts(self, candidate) -> tuple[str | None, list[dict]]:
+        """
+        Extract text and OpenAI-style tool calls from a Gemini response candidate.
+        """
         response_content = None
         tool_calls = []
 
-        if response.candidates and response.candidates[0].content.parts:
-            for part in response.candidates[0].content.parts:
+        if candidate.content is not None and candidate.content.parts:
+            for part in candidate.content.parts:
                 if part.text:
                     if response_content is None:
                         response_content = ""
@@ -204,13 +400,44 @@ class GeminiProvider(BaseLLMProvider):
                         }
                     )
 
-        return ChatResponse(
-            id=f"chatcmpl-{uuid.uuid4()}",
-            created=int(time.time()),
-            model=model_name,
-            choices=[
+        return response_content, tool_calls
+
+    async def chat_complete(self, request: ChatRequest) -> ChatResponse:
+        chat, model_name, last_message_content, cached_content = self._prepare_chat(
+            request
+        )
+
+        # 비동기 호출 (이미 await 사용 중)
+        call = UpstreamCall(PROVIDER_NAME, model_name)
+        with _upstream_errors():
+            try:
+                try:
+                    response = await chat.send_message(message=last_message_content)
+                except Exception as e:
+                    if not self._should_fallback(cached_content, e):
+                        raise
+                    chat, _, last_message_content, _ = self._prepare_chat(
+                        request, use_context_cache=False
+                    )
+                    response = await chat.send_message(message=last_message_content)
+            except BaseException:
+                call.finish("error")
+                raise
+        call.finish("success")
+        usage = self._usage(response)
+        if usage is not None:
+            call.tokens(usage.prompt_tokens, usage.completion_tokens)
+
+        # Response parsing
+        started = time.perf_counter()
+        choices = []
+        for index, candidate in self._candidates(response) or [(0, None)]:
+            response_content, tool_calls = (
+                self._parse_parts(candidate) if candidate is not None else (None, [])
+            )
+            choices.append(
                 ChatResponseChoice(
-                    index=0,
+                    index=index,
                     message=ChatMessage(
                         role="assistant",
                         content=response_content if response_content else "",
@@ -218,5 +445,106 @@ class GeminiProvider(BaseLLMProvider):
                     ),
                     finish_reason="tool_calls" if tool_calls else "stop",
                 )
+            )
+
+        chat_response = ChatResponse(
+            id=f"chatcmpl-{uuid.uuid4()}",
+            created=int(time.time()),
+            model=model_name,
+            choices=choices,
+            usage=usage,
+        )
+        _PARSE_STAGE.observe(time.perf_counter() - started)
+        add_span("parse", started)
+        return chat_response
+
+    async def chat_stream(
+        self, request: ChatRequest
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        chat, model_name, last_message_content, cached_content = self._prepare_chat(
+            request
+        )
+
+        chunk_id = f"chatcmpl-{uuid.uuid4()}"
+        created = int(time.time())
+        # 후보(choice index)별 상태
+        role_sent: set[int] = set()
+        tool_call_counts: dict[int, int] = {}
+        usage = None
+
+        call = UpstreamCall(PROVIDER_NAME, model_name)
+        outcome = "cancelled"
+        try:
+            # 첫 토큰이 도착하는 즉시 내보내기 위해 SDK의 비동기 스트림을 그대로 사용
+            with _upstream_errors():
+                stream = await chat.send_message_stream(message=last_message_content)
+                try:
+                    first = await anext(stream, None)
+                except Exception as e:
+                    # 아직 아무것도 내보내지 않았으므로 캐시 없이 다시 시도할 수 있다
+                    if not self._should_fallback(cached_content, e):
+                        raise
+                    chat, _, last_message_content, _ = self._prepare_chat(
+                        request, use_context_cache=False
+                    )
+                    stream = await chat.send_message_stream(
+                        message=last_message_content
+                    )
+                    first = await anext(stream, None)
+                call.first_token()
+
+                async for response in _prepend(first, stream):
+                    # 누적 사용량은 마지막 chunk 기준
+                    usage = self._usage(response) or usage
+                    choices = []
+                    for index, candidate in self._candidates(response):
+                        content, tool_calls = self._parse_parts(candidate)
+                        if content is None and not tool_calls:
+                            continue
+
+                        delta = ChatDelta(content=content)
+                        if index not in role_sent:
+                            delta.role = "assistant"
+                            role_sent.add(index)
+                        if tool_calls:
+                            count = tool_call_counts.get(index, 0)
+                            delta.tool_calls = [
+                                {"index": count + i, **tool_call}
+                                for i, tool_call in enumerate(tool_calls)
+                            ]
+                            tool_call_counts[index] = count + len(tool_calls)
+                        choices.append(ChatChunkChoice(index=index, delta=delta))
+                    if not choices:
+                        continue
+
+                    yield ChatCompletionChunk(
+                        id=chunk_id,
+                        created=created,
+                        model=model_name,
+                        choices=choices,
+                    )
+            outcome = "success"
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            call.finish(outcome)
+            if usage is not None:
+                call.tokens(usage.prompt_tokens, usage.completion_tokens)
+
+        yield ChatCompletionChunk(
+            id=chunk_id,
+            created=created,
+            model=model_name,
+            choices=[
+                ChatChunkChoice(
+                    index=index,
+                    delta=ChatDelta(role=None if index in role_sent else "assistant"),
+                    finish_reason="tool_calls"
+                    if tool_call_counts.get(index)
+                    else "stop",
+                )
+                for index in range(request.n)
             ],
+            usage=usage,
         )
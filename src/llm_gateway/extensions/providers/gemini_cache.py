@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from google.genai import errors, types
+
+from llm_gateway.core.tokens import estimate_tokens
+from llm_gateway.schemas.chat import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    name: str
+    covered: int  # 캐시에 포함된 history 항목 수
+    tokens: int
+    expires_at: float
+
+
+class GeminiContextCache:
+    """
+    Manages provider-side cached content for long, stable request prefixes
+    (system instruction + tools + leading history).
+
+    Lookups are synchronous and never wait on the network: cache creation and
+    TTL refreshes run in the background, so the request that first sees a long
+    prefix goes out uncached and later requests reference the cached content.
+    `caches` is `client.aio.caches` (or a compatible fake).
+    """
+
+    def __init__(
+        self,
+        caches,
+        min_tokens: int = 4096,
+        ttl_seconds: int = 600,
+        refresh_margin_seconds: int = 60,
+        max_entries: int = 128,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.caches = caches
+        self.min_tokens = min_tokens
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+
+        # prefix digest -> entry
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._pending: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.creates = 0
+        self.create_failures = 0
+        self.refreshes = 0
+        self.fallbacks = 0
+        self.cached_tokens = 0
+
+    def lookup(
+        self,
+        model: str,
+        system_instruction: str | None,
+        tools: list[dict] | None,
+        tool_choice: str | dict | None,
+        messages: list[ChatMessage],
+        history: list[types.Content],
+        gemini_tools: list[types.Tool] | None,
+        tool_config: types.ToolConfig | None,
+    ) -> tuple[str | None, int]:
+        """
+        Return the cached content name covering the longest known prefix of
+        `history` and the number of history entries it covers.
+
+        `messages` are the non-system messages that `history` was converted
+        from (one Content per message).
+        """
+        now = self._clock()
+
+        digest = hashlib.sha256(
+            json.dumps(
+                [model, system_instruction, tools, tool_choice],
+                sort_keys=True,
+                ensure_ascii=False,
+            ).encode()
+        )
+        tokens = estimate_tokens(system_instruction) + estimate_tokens(
+            json.dumps(tools) if tools else None
+        )
+        prefixes = [(digest.hexdigest(), tokens)]
+        for msg in messages[: len(history)]:
+            digest.update(
+                json.dumps(
+                    [msg.role, msg.content, msg.tool_call_id, msg.tool_calls],
+                    sort_keys=True,
+                    ensure_ascii=False,
+                ).encode()
+            )
+            tokens += estimate_tokens(msg.content) + estimate_tokens(
+                json.dumps(msg.tool_calls) if msg.tool_calls else None
+            )
+            prefixes.append((digest.hexdigest(), tokens))
+
+        hit = None
+        for key, _ in reversed(prefixes):
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            if entry.expires_at <= now:
+                # 만료된 캐시는 참조하지 않고 새로 만든다
+                del self._entries[key]
+                continue
+            hit = entry
+            self._entries.move_to_end(key)
+            break
+
+        total_tokens = prefixes[-1][1]
+        cached_tokens = hit.tokens if hit else 0
+        # 캐시되지 않은 꼬리 부분이 충분히 길어지면 더 긴 prefix로 새 캐시를 만든다
+        if total_tokens - cached_tokens >= self.min_tokens:
+            key = prefixes[-1][0]
+            if key not in self._entries and key not in self._pending:
+                self._pending.add(key)
+                self._spawn(
+                    self._create(
+                        key,
+                        model,
+                        system_instruction,
+                        history,
+                        gemini_tools,
+                        tool_config,
+                        total_tokens,
+                    )
+                )
+
+        if hit is None:
+            self.misses += 1
+            return None, 0
+
+        self.hits += 1
+        self.cached_tokens += hit.tokens
+        if hit.expires_at - now <= self.refresh_margin_seconds:
+            hit.expires_at = now + self.ttl_seconds
+            self._spawn(self._refresh(hit.name))
+        return hit.name, hit.covered
+
+    def invalidate(self, name: str) -> None:
+        """
+        Forget a cached content that the provider no longer recognizes.
+        """
+        self.fallbacks += 1
+        for key, entry in list(self._entries.items()):
+            if entry.name == name:
+                del self._entries[key]
+
+    def should_fallback(self, error: Exception) -> bool:
+        if not isinstance(error, errors.APIError):
+            return False
+        return error.code in (403, 404) or "cache" in str(error.message).lower()
+
+    async def _create(
+        self,
+        key: str,
+        model: str,
+        system_instruction: str | None,
+        history: list[types.Content],
+        gemini_tools: list[types.Tool] | None,
+        tool_config: types.ToolConfig | None,
+        tokens: int,
+    ) -> None:
+        try:
+            cached = await self.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    contents=history or None,
+                    system_instruction=system_instruction,
+                    tools=gemini_tools,
+                    tool_config=tool_config,
+                    ttl=f"{self.ttl_seconds}s",
+                ),
+            )
+        except Exception:
+            self.create_failures += 1
+            logger.warning("Failed to create Gemini context cache", exc_info=True)
+            return
+        finally:
+            self._pending.discard(key)
+
+        self.creates += 1
+        self._entries[key] = _CacheEntry(
+            name=cached.name,
+            covered=len(history),
+            tokens=tokens,
+            expires_at=self._clock() + self.ttl_seconds,
+        )
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._spawn(self._delete(evicted.name))
+
+    async def _refresh(self, name: str) -> None:
+        try:
+            await self.caches.update(
+                name=name,
+                config=types.UpdateCachedContentConfig(ttl=f"{self.ttl_seconds}s"),
+            )
+            self.refreshes += 1
+        except Exception:
+            # 갱신에 실패하면 다음 요청에서 만료 처리되어 자연스럽게 fallback 된다
+            logger.warning("Failed to refresh Gemini context cache", exc_info=True)
+
+    async def _delete(self, name: str) -> None:
+        try:
+            await self.caches.delete(name=name)
+        except Exception:
+            logger.debug("Failed to delete Gemini context cache", exc_info=True)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "creates": self.creates,
+            "create_failures": self.create_failures,
+            "refreshes": self.refreshes,
+            "fallbacks": self.fallbacks,
+            "cached_tokens": self.cached_tokens,
+        }
@@ -0,0 +1,169 @@
+from collections.abc import AsyncIterator, Callable
+
+import httpx
+from pydantic import ValidationError
+
+from llm_gateway.core.exceptions import UpstreamError, UpstreamRateLimitError
+from llm_gateway.core.interfaces import BaseLLMProvider
+from llm_gateway.core.metrics import UpstreamCall
+from llm_gateway.schemas.chat import ChatCompletionChunk, ChatRequest, ChatResponse
+
+PROVIDER_NAME = "openai"
+
+# upstream에 그대로 전달하는 OpenAI chat-completions 필드 (gateway 확장 필드 제외)
+_WIRE_FIELDS = {
+    "messages",
+    "temperature",
+    "max_tokens",
+    "n",
+    "response_format",
+    "tools",
+    "tool_choice",
+}
+
+
+def _upstream_error(response: httpx.Response) -> UpstreamError:
+    try:
+        message = response.json()["error"]["message"]
+    except (ValueError, KeyError, TypeError):
+        message = response.text or response.reason_phrase
+    if response.status_code == 429:
+        return UpstreamRateLimitError(message)
+    if response.status_code >= 500:
+        return UpstreamError(message, retryable=True)
+    # 잘못된 요청(400)은 호출자에게 그대로, 그 외 4xx는 gateway 쪽 문제로 본다
+    return UpstreamError(
+        message, status_code=400 if response.status_code == 400 else 502
+    )
+
+
+class OpenAICompatibleProvider(BaseLLMProvider):
+    """
+    Provider for servers speaking the OpenAI chat-completions wire format
+    (vLLM, llama.cpp, TGI, Ollama, OpenAI itself).
+
+    Gateway model names carry `model_prefix` (e.g. "local/llama-3.1-8b") so
+    the router can tell them apart; the prefix is stripped before the request
+    goes upstream and responses report the gateway model name.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str | None = None,
+        model_prefix: str = "",
+        http_client: httpx.AsyncClient | None = None,
+        timeout: Callable[[str], httpx.Timeout] | None = None,
+        max_candidates: int = 128,
+    ):
+        self.base_url = base_url.rstrip("/")
+        # n을 무시하는 서버(llama.cpp 등)는 1로 두면 gateway가 나눠 보낸다
+        self.max_candidates = max_candidates
+        self.model_prefix = model_prefix
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._owns_client = http_client is None
+        self.client = http_client or httpx.AsyncClient(timeout=120.0)
+        self._timeout = timeout
+
+    def upstream_model(self, model: str) -> str:
+        if self.model_prefix and model.startswith(self.model_prefix):
+            return model[len(self.model_prefix) :]
+        return model
+
+    def _payload(self, request: ChatRequest, stream: bool) -> dict:
+        payload = request.model_dump(include=_WIRE_FIELDS, exclude_none=True)
+        payload["messages"] = [
+            message.model_dump(exclude_none=True) for message in request.messages
+        ]
+        payload["model"] = self.upstream_model(request.model)
+        if request.n == 1:
+            del payload["n"]
+        if stream:
+            # 마지막 chunk에 usage를 받는다
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+
+    def _request_kwargs(self, request: ChatRequest, stream: bool) -> dict:
+        kwargs = {"json": self._payload(request, stream), "headers": self.headers}
+        if self._timeout is not None:
+            kwargs["timeout"] = self._timeout(request.model)
+        return kwargs
+
+    async def warm_up(self) -> None:
+        response = await self.client.get(
+            f"{self.base_url}/models", headers=self.headers
+        )
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def chat_complete(self, request: ChatRequest) -> ChatResponse:
+        call = UpstreamCall(PROVIDER_NAME, request.model)
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/chat/completions",
+                **self._request_kwargs(request, stream=False),
+            )
+            if response.status_code != 200:
+                raise _upstream_error(response)
+            try:
+                result = ChatResponse.model_validate_json(response.content)
+            except ValidationError as e:
+                raise UpstreamError(f"Malformed upstream response: {e}") from e
+        except BaseException:
+            call.finish("error")
+            raise
+        call.finish("success")
+
+        if result.usage is not None:
+            call.tokens(result.usage.prompt_tokens, result.usage.completion_tokens)
+        result.model = request.model
+        return result
+
+    async def chat_stream(
+        self, request: ChatRequest
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        call = UpstreamCall(PROVIDER_NAME, request.model)
+        outcome = "cancelled"
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                **self._request_kwargs(request, stream=True),
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    raise _upstream_error(response)
+
+                first = True
+                async for line in response.aiter_lines():
+                    # SSE: "data: {...}" 줄만 처리하고 keep-alive 주석 등은 무시한다
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = ChatCompletionChunk.model_validate_json(data)
+                    except ValidationError as e:
+                        raise UpstreamError(
+                            f"Malformed upstream chunk: {data[:200]}"
+                        ) from e
+                    if first:
+                        call.first_token()
+                        first = False
+                    if chunk.usage is not None:
+                        call.tokens(
+                            chunk.usage.prompt_tokens, chunk.usage.completion_tokens
+                        )
+                    chunk.model = request.model
+                    yield chunk
+            outcome = "success"
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            call.finish(outcome)
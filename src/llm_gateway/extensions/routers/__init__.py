@@ -1 +1,3 @@
+from .adaptive_router import AdaptiveRouter
+from .hedging import HedgingPolicy
 from .simple_router import SimpleRouter
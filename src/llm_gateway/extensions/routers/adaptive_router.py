@@ -0,0 +1,201 @@
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+
+from llm_gateway.core.interfaces import BaseLLMProvider
+from llm_gateway.core.resilience import ResiliencePolicy, is_retryable
+from llm_gateway.extensions.routers.hedging import HedgingPolicy
+from llm_gateway.extensions.routers.simple_router import SimpleRouter
+from llm_gateway.schemas.chat import ChatCompletionChunk, ChatRequest, ChatResponse
+
+
+@dataclass
+class ModelHealth:
+    latency_ewma: float | None = None
+    error_ewma: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    updated_at: float = 0.0
+    # 측정(explore)을 위해 보낸 횟수와 마지막 시각
+    probes: int = 0
+    probed_at: float | None = None
+
+
+class AdaptiveRouter(SimpleRouter):
+    """
+    Router that resolves capability aliases (e.g. "creative", "logical") to a
+    pool of candidate models and sends each request to the fastest healthy
+    candidate, based on a rolling EWMA of latency and error rate per model.
+
+    Error rates decay towards zero with `health_half_life` so a model that
+    was marked unhealthy gets traffic again once it has had time to recover.
+    Only retryable upstream errors count as failures; a caller's bad request
+    says nothing about the model. A candidate without a latency measurement
+    gets one probe per `probe_interval`, so a burst of concurrent requests is
+    not all sent to the same unmeasured model.
+    """
+
+    def __init__(
+        self,
+        providers: dict[str, BaseLLMProvider],
+        aliases: dict[str, list[str]] | None = None,
+        hedging: HedgingPolicy | None = None,
+        resilience: ResiliencePolicy | None = None,
+        model_routes: dict[str, str] | None = None,
+        alpha: float = 0.2,
+        max_error_rate: float = 0.5,
+        health_half_life: float = 30.0,
+        probe_interval: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(
+            providers,
+            hedging=hedging,
+            resilience=resilience,
+            model_routes=model_routes,
+        )
+        self.aliases = aliases or {}
+        # 상태는 별칭 후보 모델만 기록한다 (요청 모델명은 호출자가 정한다)
+        self._candidates = {c for pool in self.aliases.values() for c in pool}
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.health_half_life = health_half_life
+        self.probe_interval = probe_interval
+        self._clock = clock
+
+        self.health: dict[str, ModelHealth] = {}
+        self.decisions: deque[dict] = deque(maxlen=100)
+
+    def _health(self, model: str) -> ModelHealth:
+        health = self.health.get(model)
+        if health is None:
+            health = self.health[model] = ModelHealth(updated_at=self._clock())
+        return health
+
+    def error_rate(self, model: str) -> float:
+        health = self.health.get(model)
+        if health is None:
+            return 0.0
+        elapsed = self._clock() - health.updated_at
+        return health.error_ewma * 0.5 ** (elapsed / self.health_half_life)
+
+    def select_model(self, model: str) -> str:
+        candidates = self.aliases.get(model)
+        if not candidates:
+            return model
+
+        healthy = [c for c in candidates if self.error_rate(c) <= self.max_error_rate]
+        if not healthy:
+            # 모두 불안정하면 그나마 에러율이 가장 낮은 모델로 보낸다
+            selected = min(candidates, key=self.error_rate)
+            reason = "least_errors"
+        else:
+            # 지연 시간 기록이 없는 후보는 probe_interval마다 한 번씩 보내 측정한다
+            now = self._clock()
+            untried = [c for c in healthy if self._health(c).latency_ewma is None]
+            tried = [c for c in healthy if c not in untried]
+            probes = [
+                c
+                for c in untried
+                if self._health(c).probed_at is None
+                or now - self._health(c).probed_at >= self.probe_interval
+            ]
+            if probes or not tried:
+                # 측정 중인 후보만 남았으면 가장 적게 보낸 후보로 분산한다
+                selected = (
+                    probes[0]
+                    if probes
+                    else min(untried, key=lambda c: self._health(c).probes)
+                )
+                self._health(selected).probes += 1
+                self._health(selected).probed_at = now
+                reason = "explore"
+            else:
+                selected = min(tried, key=lambda c: self._health(c).latency_ewma)
+                reason = "fastest"
+
+        self.decisions.append(
+            {
+                "time": time.time(),
+                "alias": model,
+                "selected": selected,
+                "reason": reason,
+            }
+        )
+        return selected
+
+    def _record(self, model: str, latency: float | None, failed: bool) -> None:
+        if model not in self._candidates:
+            return
+        health = self._health(model)
+        health.error_ewma = self.error_rate(model)
+        health.error_ewma += self.alpha * ((1.0 if failed else 0.0) - health.error_ewma)
+        health.updated_at = self._clock()
+        health.requests += 1
+        if failed:
+            health.errors += 1
+        if latency is not None:
+            if health.latency_ewma is None:
+                health.latency_ewma = latency
+            else:
+                health.latency_ewma += self.alpha * (latency - health.latency_ewma)
+
+    def resolve(self, request: ChatRequest) -> ChatRequest:
+        model = self.select_model(request.model)
+        if model == request.model:
+            return request
+        return request.model_copy(update={"model": model})
+
+    async def _complete(self, request: ChatRequest) -> ChatResponse:
+        provider = self._select_provider(request.model)
+        started = self._clock()
+        try:
+            response = await provider.chat_complete(request)
+        except Exception as e:
+            if is_retryable(e):
+                self._record(request.model, None, failed=True)
+            raise
+        self._record(request.model, self._clock() - started, failed=False)
+        return response
+
+    def _open_stream(self, request: ChatRequest) -> AsyncIterator[ChatCompletionChunk]:
+        return self._recorded_stream(request, super()._open_stream(request))
+
+    async def _recorded_stream(
+        self, request: ChatRequest, stream: AsyncIterator[ChatCompletionChunk]
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        # fallback 시도마다 실제로 호출한 모델에 기록한다 (호출자가 끊으면 생략)
+        started = self._clock()
+        try:
+            async for chunk in stream:
+                yield chunk
+        except Exception as e:
+            if is_retryable(e):
+                self._record(request.model, None, failed=True)
+            raise
+        self._record(request.model, self._clock() - started, failed=False)
+
+    async def route_chat(self, request: ChatRequest) -> ChatResponse:
+        return await super().route_chat(self.resolve(request))
+
+    async def route_chat_stream(
+        self, request: ChatRequest
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        async for chunk in super().route_chat_stream(self.resolve(request)):
+            yield chunk
+
+    def stats(self) -> dict:
+        return {
+            "aliases": self.aliases,
+            "models": {
+                model: {
+                    "latency_ewma": health.latency_ewma,
+                    "error_rate": round(self.error_rate(model), 4),
+                    "requests": health.requests,
+                    "errors": health.errors,
+                }
+                for model, health in self.health.items()
+            },
+            "recent_decisions": list(self.decisions),
+        }
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from llm_gateway.core.interfaces import CallBudget, current_call_budget
+from llm_gateway.core.metrics import model_labels
+from llm_gateway.core.stats import percentile
+from llm_gateway.schemas.chat import ChatRequest, ChatResponse
+
+
+class HedgingPolicy:
+    """
+    Hedged requests: if a call has not returned after the configured
+    percentile of recent latency for its model, fire a second attempt (same or
+    alternate model), take whichever succeeds first and cancel the other.
+
+    Hedges are capped at `max_fraction` of all requests. Inside the engine the
+    hedge is admitted through the rate limiter and scheduler like any other
+    call, and the tokens of whichever attempt is discarded are still charged.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        max_fraction: float = 0.05,
+        window: int = 200,
+        min_samples: int = 20,
+        alternates: dict[str, str] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.percentile = percentile
+        self.max_fraction = max_fraction
+        self.window = window
+        self.min_samples = min_samples
+        self.alternates = alternates or {}
+        self._clock = clock
+
+        self._latencies: dict[str, deque[float]] = {}
+
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def record(self, model: str, latency: float) -> None:
+        model = model_labels.label(model)
+        samples = self._latencies.get(model)
+        if samples is None:
+            samples = self._latencies[model] = deque(maxlen=self.window)
+        samples.append(latency)
+
+    def delay_for(self, model: str) -> float | None:
+        samples = self._latencies.get(model_labels.label(model))
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        return percentile(list(samples), self.percentile)
+
+    async def run(
+        self,
+        request: ChatRequest,
+        call: Callable[[ChatRequest], Awaitable[ChatResponse]],
+    ) -> ChatResponse:
+        self.requests += 1
+        budget = current_call_budget()
+        hedge_sent = False
+
+        async def attempt(attempt_request: ChatRequest) -> ChatResponse:
+            started = self._clock()
+            response = await call(attempt_request)
+            self.record(attempt_request.model, self._clock() - started)
+            return response
+
+        async def hedge_attempt(hedge_request: ChatRequest) -> ChatResponse:
+            nonlocal hedge_sent
+            if budget is None:
+                hedge_sent = True
+                return await attempt(hedge_request)
+            async with budget.admit(hedge_request):
+                hedge_sent = True
+                return await attempt(hedge_request)
+
+        primary = asyncio.ensure_future(attempt(request))
+        tasks = [primary]
+        try:
+            delay = self.delay_for(request.model)
+            if delay is None:
+                return await primary
+
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            if self.hedged >= self.max_fraction * self.requests:
+                self.budget_denied += 1
+                return await primary
+
+            alternate = self.alternates.get(request.model)
+            hedge_request = (
+                request.model_copy(update={"model": alternate})
+                if alternate
+                else request
+            )
+            hedge = asyncio.ensure_future(hedge_attempt(hedge_request))
+            tasks.append(hedge)
+            self.hedged += 1
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                            loser, loser_request = primary, request
+                        else:
+                            loser, loser_request = hedge, hedge_request
+                        # admission을 기다리던 hedge는 upstream을 쓰지 않았다
+                        if budget is not None and (loser is primary or hedge_sent):
+                            _charge(budget, loser_request, loser)
+                        return task.result()
+
+            # 두 시도 모두 실패하면 원래 요청의 에러를 그대로 전달한다
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+            "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+            "hedge_win_rate": self.hedge_wins / self.hedged if self.hedged else 0.0,
+            "delays": {model: self.delay_for(model) for model in self._latencies},
+        }
+
+
+def _charge(budget: CallBudget, request: ChatRequest, task: asyncio.Future) -> None:
+    if not task.done():
+        # 곧 취소되므로 응답 없이 입력 토큰만 청구한다
+        budget.charge(request, None)
+    elif not task.cancelled() and task.exception() is None:
+        budget.charge(request, task.result())
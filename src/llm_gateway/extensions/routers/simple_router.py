@@ -1,17 +1,100 @@
+from collections.abc import AsyncIterator
+
+from llm_gateway.core.candidates import fan_out, fan_out_stream, split_candidates
 from llm_gateway.core.interfaces import BaseLLMProvider, BaseRouter
-from llm_gateway.schemas.chat import ChatRequest, ChatResponse
+from llm_gateway.core.metrics import model_labels
+from llm_gateway.core.resilience import ResiliencePolicy
+from llm_gateway.extensions.routers.hedging import HedgingPolicy
+from llm_gateway.schemas.chat import ChatCompletionChunk, ChatRequest, ChatResponse
 
 
 class SimpleRouter(BaseRouter):
-    def __init__(self, providers: dict[str, BaseLLMProvider]):
+    def __init__(
+        self,
+        providers: dict[str, BaseLLMProvider],
+        hedging: HedgingPolicy | None = None,
+        resilience: ResiliencePolicy | None = None,
+        model_routes: dict[str, str] | None = None,
+    ):
         self.providers = providers
+        self.hedging = hedging
+        self.resilience = resilience
+        # 모델명 prefix → provider 이름 (가장 긴 prefix 우선, 등록된 provider만)
+        self.model_routes = model_routes or {}
 
-    def _select_provider(self, model: str) -> BaseLLMProvider:
+    def _provider_name(self, model: str) -> str:
+        routes = [
+            prefix
+            for prefix, provider in self.model_routes.items()
+            if model.startswith(prefix) and provider in self.providers
+        ]
+        if routes:
+            return self.model_routes[max(routes, key=len)]
         if model.startswith("gemini"):
-            return self.providers["google"]
+            return "google"
 
         raise ValueError(f"Unsupported model: {model}")
 
+    def _select_provider(self, model: str) -> BaseLLMProvider:
+        return self.providers[self._provider_name(model)]
+
+    def _breaker_key(self, model: str) -> str:
+        # breaker는 metric label로도 나가므로 모르는 모델은 "other"로 묶는다
+        return f"{self._provider_name(model)}:{model_labels.label(model)}"
+
+    def _candidate_parts(self, request: ChatRequest) -> list[int]:
+        if request.n == 1:
+            return [1]
+        provider = self._select_provider(request.model)
+        return split_candidates(request.n, provider.max_candidates)
+
+    def upstream_calls(self, request: ChatRequest) -> int:
+        return len(self._candidate_parts(request))
+
     async def route_chat(self, request: ChatRequest) -> ChatResponse:
+        parts = self._candidate_parts(request)
+        if len(parts) > 1:
+            # 후보마다 fallback/hedging이 따로 적용된다
+            return await fan_out(request, parts, self._route_one)
+        return await self._route_one(request)
+
+    async def _route_one(self, request: ChatRequest) -> ChatResponse:
+        if self.resilience is not None:
+            return await self.resilience.run(request, self._attempt, self._breaker_key)
+        return await self._attempt(request)
+
+    async def _attempt(self, request: ChatRequest) -> ChatResponse:
+        if self.hedging is not None:
+            return await self.hedging.run(request, self._complete)
+        return await self._complete(request)
+
+    async def _complete(self, request: ChatRequest) -> ChatResponse:
         provider = self._select_provider(request.model)
         return await provider.chat_complete(request)
+
+    async def route_chat_stream(
+        self, request: ChatRequest
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        parts = self._candidate_parts(request)
+        if len(parts) > 1:
+            stream = fan_out_stream(request, parts, self._route_one_stream)
+        else:
+            stream = self._route_one_stream(request)
+        async for chunk in stream:
+            yield chunk
+
+    async def _route_one_stream(
+        self, request: ChatRequest
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        if self.resilience is not None:
+            stream = self.resilience.run_stream(
+                request, self._open_stream, self._breaker_key
+            )
+        else:
+            stream = self._open_stream(request)
+        async for chunk in stream:
+            yield chunk
+
+    def _open_stream(self, request: ChatRequest) -> AsyncIterator[ChatCompletionChunk]:
+        provider = self._select_provider(request.model)
+        return provider.chat_stream(request)
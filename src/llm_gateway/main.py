@@ -1,26 +1,297 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from llm_gateway.api.v1 import chat
+from llm_gateway.api import metrics
+from llm_gateway.api.lifecycle import DrainMiddleware, RequestTracker
+from llm_gateway.api.tracing import TracingMiddleware
+from llm_gateway.api.v1 import admin, chat
+from llm_gateway.core.cache import ResponseCache
+from llm_gateway.core.coalesce import SingleFlight
+from llm_gateway.core.compaction import HistoryCompactor
 from llm_gateway.core.config import settings
 from llm_gateway.core.engine import LLMEngine
-from llm_gateway.extensions.providers import GeminiProvider
-from llm_gateway.extensions.routers import SimpleRouter
+from llm_gateway.core.http import PooledTransport, build_http_client
+from llm_gateway.core.metrics import model_labels
+from llm_gateway.core.ratelimit import RateLimiter
+from llm_gateway.core.resilience import ResiliencePolicy
+from llm_gateway.core.scheduler import AdmissionScheduler
+from llm_gateway.core.state import MemoryStateStore, RedisStateStore, StateStore
+from llm_gateway.core.structured import StructuredOutputValidator
+from llm_gateway.core.tracing import BatchExporter, LangSmithSink, Tracer
+from llm_gateway.core.usage import UsageAggregator, jsonl_sink
+from llm_gateway.extensions.providers import FakeProvider, OpenAICompatibleProvider
+from llm_gateway.extensions.routers import AdaptiveRouter, HedgingPolicy
+
+logger = logging.getLogger(__name__)
+
+# 종료 예산(SHUTDOWN_DRAIN_SECONDS)은 uvicorn이 쓰고, 취소된 요청의 정리에만 쓰는 시간
+SHUTDOWN_UNWIND_SECONDS = 1.0
+
+
+def build_state_store() -> StateStore:
+    if settings.STATE_BACKEND == "redis":
+        return RedisStateStore(
+            settings.STATE_REDIS_URL,
+            key_prefix=settings.STATE_KEY_PREFIX,
+            timeout=settings.STATE_TIMEOUT_SECONDS,
+        )
+    return MemoryStateStore()
+
+
+def build_upstream_transport() -> PooledTransport:
+    return PooledTransport(
+        max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY_SECONDS,
+        http2=settings.UPSTREAM_HTTP2,
+        timeout=settings.UPSTREAM_TIMEOUT,
+        model_timeouts=settings.UPSTREAM_MODEL_TIMEOUTS,
+    )
+
+
+def build_tracer() -> Tracer | None:
+    if not (settings.SERVER_TIMING_ENABLED or settings.LANGSMITH_TRACING):
+        return None
+    exporter = None
+    if settings.LANGSMITH_TRACING:
+        exporter = BatchExporter(
+            LangSmithSink(
+                settings.LANGSMITH_ENDPOINT,
+                api_key=settings.LANGSMITH_API_KEY,
+                project=settings.LANGSMITH_PROJECT,
+            ),
+            max_queue=settings.TRACING_QUEUE_SIZE,
+            batch_size=settings.TRACING_BATCH_SIZE,
+            flush_seconds=settings.TRACING_FLUSH_SECONDS,
+        )
+    return Tracer(
+        exporter,
+        sample_rate=settings.TRACING_SAMPLE_RATE,
+        slow_seconds=settings.TRACING_SLOW_SECONDS,
+    )
+
+
+def configured_models() -> set[str]:
+    """
+    Model names that appear in the settings (always get their own label).
+    """
+    models = {settings.GEMINI_DEFAULT_MODEL, *settings.MODEL_ALIASES}
+    for candidates in settings.MODEL_ALIASES.values():
+        models.update(candidates)
+    for model, chain in settings.FALLBACK_CHAINS.items():
+        models.add(model)
+        models.update(chain)
+    models.update(settings.HEDGING_ALTERNATES)
+    models.update(settings.HEDGING_ALTERNATES.values())
+    models.update(settings.MODEL_PRICES)
+    models.update(settings.RATE_LIMITS)
+    return models
+
+
+def build_engine(
+    state: StateStore | None = None, transport: PooledTransport | None = None
+) -> LLMEngine:
+    """
+    Build the LLMEngine (providers, router and engine stages) from settings.
+    """
+    model_labels.configure(configured_models(), settings.METRICS_MAX_MODEL_LABELS)
+    http_client = build_http_client(transport) if transport is not None else None
+    # google.genai SDK import는 여기(lifespan startup)까지 미룬다
+    from llm_gateway.extensions.providers.gemini import GeminiProvider
+
+    providers = {"google": GeminiProvider(http_client=http_client)}
+    model_routes = dict(settings.MODEL_ROUTES)
+    if settings.OPENAI_COMPAT_BASE_URL:
+        providers["openai"] = OpenAICompatibleProvider(
+            settings.OPENAI_COMPAT_BASE_URL,
+            api_key=settings.OPENAI_COMPAT_API_KEY or settings.OPENAI_API_KEY,
+            model_prefix=settings.OPENAI_COMPAT_MODEL_PREFIX,
+            max_candidates=settings.OPENAI_COMPAT_MAX_CANDIDATES,
+            http_client=http_client,
+            timeout=transport.timeout_for if transport is not None else None,
+        )
+        model_routes.setdefault(settings.OPENAI_COMPAT_MODEL_PREFIX, "openai")
+    if settings.FAKE_PROVIDER_ENABLED:
+        providers["fake"] = FakeProvider(
+            latency=settings.FAKE_PROVIDER_LATENCY_SECONDS,
+            distribution=settings.FAKE_PROVIDER_LATENCY_DISTRIBUTION,
+            spread=settings.FAKE_PROVIDER_LATENCY_SPREAD,
+            error_rate=settings.FAKE_PROVIDER_ERROR_RATE,
+            tokens_per_second=settings.FAKE_PROVIDER_TOKENS_PER_SECOND,
+            completion_tokens=settings.FAKE_PROVIDER_COMPLETION_TOKENS,
+        )
+        model_routes.setdefault("fake", "fake")
+
+    hedging = None
+    if settings.HEDGING_ENABLED:
+        hedging = HedgingPolicy(
+            percentile=settings.HEDGING_PERCENTILE,
+            max_fraction=settings.HEDGING_MAX_FRACTION,
+            min_samples=settings.HEDGING_MIN_SAMPLES,
+            alternates=settings.HEDGING_ALTERNATES,
+        )
+    scheduler = None
+    if settings.SCHEDULER_ENABLED:
+        scheduler = AdmissionScheduler(
+            initial_limit=settings.SCHEDULER_INITIAL_CONCURRENCY,
+            min_limit=settings.SCHEDULER_MIN_CONCURRENCY,
+            max_limit=settings.SCHEDULER_MAX_CONCURRENCY,
+            max_queue_size=settings.SCHEDULER_MAX_QUEUE_SIZE,
+            max_queue_seconds=settings.SCHEDULER_MAX_QUEUE_SECONDS,
+            latency_tolerance=settings.SCHEDULER_LATENCY_TOLERANCE,
+        )
+    resilience = None
+    if settings.RESILIENCE_ENABLED:
+        resilience = ResiliencePolicy(
+            fallbacks=settings.FALLBACK_CHAINS,
+            max_attempts=settings.RETRY_MAX_ATTEMPTS,
+            backoff_base=settings.RETRY_BACKOFF_BASE_SECONDS,
+            backoff_max=settings.RETRY_BACKOFF_MAX_SECONDS,
+            failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_BREAKER_RESET_SECONDS,
+            store=state,
+            sync_seconds=settings.STATE_SYNC_SECONDS,
+            # 재시도/fallback 중의 429도 scheduler의 동시성 한도에 반영한다
+            on_rate_limited=scheduler.on_rate_limited if scheduler else None,
+        )
+    router = AdaptiveRouter(
+        providers,
+        aliases=settings.MODEL_ALIASES,
+        hedging=hedging,
+        resilience=resilience,
+        model_routes=model_routes,
+        alpha=settings.ROUTING_EWMA_ALPHA,
+        max_error_rate=settings.ROUTING_MAX_ERROR_RATE,
+        health_half_life=settings.ROUTING_HEALTH_HALF_LIFE_SECONDS,
+    )
+
+    cache = None
+    if settings.RESPONSE_CACHE_ENABLED:
+        cache = ResponseCache(
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+            max_temperature=settings.RESPONSE_CACHE_MAX_TEMPERATURE,
+        )
+    semantic_cache = None
+    if settings.SEMANTIC_CACHE_ENABLED:
+        from llm_gateway.core.semantic_cache import SemanticCache, load_embedder
+
+        semantic_cache = SemanticCache(
+            load_embedder(
+                settings.SEMANTIC_CACHE_EMBEDDER, settings.SEMANTIC_CACHE_DIM
+            ),
+            dim=settings.SEMANTIC_CACHE_DIM,
+            max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            ttl_seconds=settings.SEMANTIC_CACHE_TTL_SECONDS,
+            max_temperature=settings.SEMANTIC_CACHE_MAX_TEMPERATURE,
+        )
+    structured = None
+    if settings.STRUCTURED_OUTPUT_VALIDATION_ENABLED:
+        structured = StructuredOutputValidator(
+            max_retries=settings.STRUCTURED_OUTPUT_MAX_RETRIES,
+            max_schemas=settings.STRUCTURED_OUTPUT_MAX_SCHEMAS,
+        )
+    coalescer = SingleFlight() if settings.REQUEST_COALESCING_ENABLED else None
+    rate_limiter = None
+    if settings.RATE_LIMITS or settings.CLIENT_RATE_LIMITS:
+        rate_limiter = RateLimiter(
+            model_quotas=settings.RATE_LIMITS,
+            client_quotas=settings.CLIENT_RATE_LIMITS,
+            burst_seconds=settings.RATE_LIMIT_BURST_SECONDS,
+            max_wait_seconds=settings.RATE_LIMIT_MAX_WAIT_SECONDS,
+            max_clients=settings.RATE_LIMIT_MAX_CLIENTS,
+            store=state,
+        )
+    usage = None
+    if settings.USAGE_TRACKING_ENABLED:
+        usage = UsageAggregator(
+            prices=settings.MODEL_PRICES,
+            flush_seconds=settings.USAGE_FLUSH_SECONDS,
+            sink=jsonl_sink(settings.USAGE_LOG_PATH)
+            if settings.USAGE_LOG_PATH
+            else None,
+            store=state,
+            max_clients=settings.USAGE_MAX_CLIENTS,
+        )
+    compactor = None
+    if settings.COMPACTION_ENABLED:
+        compactor = HistoryCompactor(settings.COMPACTION_POLICIES)
+    return LLMEngine(
+        router,
+        cache=cache,
+        coalescer=coalescer,
+        scheduler=scheduler,
+        rate_limiter=rate_limiter,
+        usage=usage,
+        compactor=compactor,
+        state=state,
+        semantic_cache=semantic_cache,
+        structured=structured,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.upstream_transport = build_upstream_transport()
+    app.state.engine = build_engine(app.state.state_store, app.state.upstream_transport)
+    if app.state.engine.usage is not None:
+        app.state.engine.usage.start()
+    if settings.STARTUP_WARMUP_ENABLED:
+        await app.state.engine.warm_up(settings.STARTUP_WARMUP_TIMEOUT_SECONDS)
+    app.state.startup_seconds = time.perf_counter() - app.state.created_at
+    logger.info("Gateway ready in %.3fs", app.state.startup_seconds)
+
+    yield
+
+    # uvicorn이 --timeout-graceful-shutdown 동안 요청/스트림을 기다리고 남은 것은
+    # 취소한 뒤에 lifespan 종료가 온다 (여기서는 취소된 요청의 정리만 기다린다)
+    remaining = await app.state.requests.drain(SHUTDOWN_UNWIND_SECONDS)
+    if remaining:
+        logger.warning(
+            "Shutting down with %d requests still in flight after %.1fs",
+            remaining,
+            SHUTDOWN_UNWIND_SECONDS,
+        )
+    # 마지막 usage window가 버려지지 않도록 종료 전에 내보낸다
+    if app.state.engine.usage is not None:
+        await app.state.engine.usage.aclose()
+    await app.state.engine.aclose()
+    await app.state.upstream_transport.aclose()
+    if app.state.tracer is not None:
+        await app.state.tracer.aclose()
+    await app.state.state_store.close()
 
 
 def app() -> FastAPI:
     app = FastAPI(
         title=settings.PROJECT_NAME,
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        lifespan=lifespan,
     )
 
-    providers = {"google": GeminiProvider()}
-
-    router = SimpleRouter(providers)
-    engine = LLMEngine(router)
-
-    app.state.engine = engine  # 여기 중요
+    app.state.created_at = time.perf_counter()
+    app.state.state_store = build_state_store()
+    app.state.requests = RequestTracker()
+    app.state.tracer = build_tracer()
+    if app.state.tracer is not None:
+        app.add_middleware(
+            TracingMiddleware,
+            tracer=app.state.tracer,
+            server_timing=settings.SERVER_TIMING_ENABLED,
+        )
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.add_middleware(DrainMiddleware, tracker=app.state.requests)
 
     app.include_router(chat.router, prefix=f"{settings.API_V1_STR}/chat", tags=["chat"])
+    app.include_router(
+        admin.router, prefix=f"{settings.API_V1_STR}/admin", tags=["admin"]
+    )
+    app.include_router(metrics.router, tags=["metrics"])
 
     @app.get("/")
     def root():
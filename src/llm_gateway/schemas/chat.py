@@ -16,6 +16,8 @@ class ChatRequest(BaseModel):
     temperature: float = Field(default=0.7, ge=0.0, le=2.0)
     max_tokens: int | None = None
     stream: bool = False
+    # 생성할 후보 수 (Gemini candidate_count 상한이 8)
+    n: int = Field(default=1, ge=1, le=8)
 
     # Structured Output 지원
     # 예: {"type": "json_object"} 또는 {"type": "json_schema", "json_schema": {...}}
@@ -25,6 +27,17 @@ class ChatRequest(BaseModel):
     tools: list[dict[str, Any]] | None = None
     tool_choice: str | dict[str, Any] | None = None
 
+    # Gateway 확장: False면 응답 캐시를 건너뛴다
+    cache: bool = True
+    # Gateway 확장: 혼잡 시 처리 순서 (interactive GM 요청은 high)
+    priority: Literal["high", "normal", "low"] = "normal"
+
+
+class ChatBatchRequest(BaseModel):
+    requests: list[ChatRequest] = Field(min_length=1)
+    # 미지정 시 서버 기본값(BATCH_MAX_CONCURRENCY) 사용
+    max_concurrency: int | None = Field(default=None, ge=1)
+
 
 class ChatResponseChoice(BaseModel):
     index: int
@@ -32,9 +45,42 @@ class ChatResponseChoice(BaseModel):
     finish_reason: str | None = None
 
 
+class PromptTokensDetails(BaseModel):
+    cached_tokens: int = 0  # provider 측 context cache에서 읽은 토큰
+
+
+class ChatUsage(BaseModel):
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    prompt_tokens_details: PromptTokensDetails | None = None
+
+
 class ChatResponse(BaseModel):
     id: str
     object: str = "chat.completion"
     created: int
     model: str
     choices: list[ChatResponseChoice]
+    usage: ChatUsage | None = None
+
+
+class ChatDelta(BaseModel):
+    role: Literal["assistant"] | None = None
+    content: str | None = None
+    tool_calls: list[dict[str, Any]] | None = None  # index 포함 증분 Tool 호출 정보
+
+
+class ChatChunkChoice(BaseModel):
+    index: int
+    delta: ChatDelta
+    finish_reason: str | None = None
+
+
+class ChatCompletionChunk(BaseModel):
+    id: str
+    object: str = "chat.completion.chunk"
+    created: int
+    model: str
+    choices: list[ChatChunkChoice]
+    usage: ChatUsage | None = None  # 마지막 chunk에만 포함
@@ -1,12 +1,25 @@
+import json
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
+import respx
+from fastapi.testclient import TestClient
 
-from llm_gateway.schemas.chat import ChatMessage, ChatResponse, ChatResponseChoice
+from llm_gateway.core.exceptions import OverloadedError
+from llm_gateway.main import app
+from llm_gateway.schemas.chat import (
+    ChatChunkChoice,
+    ChatCompletionChunk,
+    ChatDelta,
+    ChatMessage,
+    ChatResponse,
+    ChatResponseChoice,
+)
 
 
 @pytest.fixture
-def mock_engine(app_instance):
+def mock_engine(app_instance, client_instance):
     engine = app_instance.state.engine
     with patch.object(engine, "chat", new_callable=AsyncMock) as mock:
         yield mock
@@ -57,3 +70,214 @@ def test_chat_completions_provider_error(mock_engine, client_instance):
 
     assert response.status_code == 400
     assert response.json()["detail"] == "Invalid model"
+
+
+def test_chat_completions_invalid_body(mock_engine, client_instance):
+    response = client_instance.post(
+        "/api/v1/chat/completions", json={"model": "gemini-2.0-flash"}
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "messages"]
+    mock_engine.assert_not_called()
+
+
+def test_chat_completions_documents_request_body(client_instance):
+    spec = client_instance.get("/api/v1/openapi.json").json()
+
+    body = spec["paths"]["/api/v1/chat/completions"]["post"]["requestBody"]
+    ref = body["content"]["application/json"]["schema"]["$ref"]
+    assert ref.split("/")[-1] in spec["components"]["schemas"]
+
+
+def test_chat_completions_overloaded(mock_engine, client_instance):
+    mock_engine.side_effect = OverloadedError("Gateway is overloaded")
+
+    payload = {
+        "model": "gemini-1.5-flash",
+        "messages": [{"role": "user", "content": "Hi"}],
+    }
+
+    response = client_instance.post("/api/v1/chat/completions", json=payload)
+
+    assert response.status_code == 503
+
+
+def test_chat_completions_stream(app_instance, client_instance):
+    async def fake_stream(request, client=None):
+        for delta, finish_reason in [
+            (ChatDelta(role="assistant", content="Hel"), None),
+            (ChatDelta(content="lo"), None),
+            (ChatDelta(), "stop"),
+        ]:
+            yield ChatCompletionChunk(
+                id="test-id",
+                created=1234567890,
+                model="gemini-1.5-flash",
+                choices=[
+                    ChatChunkChoice(index=0, delta=delta, finish_reason=finish_reason)
+                ],
+            )
+
+    engine = app_instance.state.engine
+    with patch.object(engine, "chat_stream", side_effect=fake_stream):
+        payload = {
+            "model": "gemini-1.5-flash",
+            "messages": [{"role": "user", "content": "Hello"}],
+            "stream": True,
+        }
+        response = client_instance.post("/api/v1/chat/completions", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [
+        line.removeprefix("data: ")
+        for line in response.text.split("\n\n")
+        if line.startswith("data: ")
+    ]
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(event) for event in events[:-1]]
+    content = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks)
+    assert content == "Hello"
+    assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+
+
+def test_empty_upstream_stream_ends_with_done(app_instance, client_instance):
+    async def empty_stream(request, client=None):
+        return
+        yield
+
+    engine = app_instance.state.engine
+    with patch.object(engine, "chat_stream", side_effect=empty_stream):
+        payload = {
+            "model": "gemini-1.5-flash",
+            "messages": [{"role": "user", "content": "Hello"}],
+            "stream": True,
+        }
+        response = client_instance.post("/api/v1/chat/completions", json=payload)
+
+    assert response.status_code == 200
+    assert response.text == "data: [DONE]\n\n"
+
+
+def test_chat_batch_streams_ndjson(mock_engine, client_instance):
+    async def fake_chat(request, client=None):
+        if request.model == "unknown-model":
+            raise ValueError("Unsupported model: unknown-model")
+        return ChatResponse(
+            id="test-id",
+            created=1234567890,
+            model=request.model,
+            choices=[
+                ChatResponseChoice(
+                    index=0,
+                    message=ChatMessage(
+                        role="assistant", content=request.messages[0].content
+                    ),
+                    finish_reason="stop",
+                )
+            ],
+        )
+
+    mock_engine.side_effect = fake_chat
+
+    payload = {
+        "requests": [
+            {
+                "model": "gemini-1.5-flash",
+                "messages": [{"role": "user", "content": f"Judge player {i}"}],
+            }
+            for i in range(3)
+        ]
+        + [{"model": "unknown-model", "messages": [{"role": "user", "content": "?"}]}],
+        "max_concurrency": 2,
+    }
+
+    response = client_instance.post("/api/v1/chat/batch", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = {
+        line["index"]: line
+        for line in map(json.loads, response.text.strip().split("\n"))
+    }
+    assert sorted(results) == [0, 1, 2, 3]
+    assert (
+        results[1]["response"]["choices"][0]["message"]["content"] == "Judge player 1"
+    )
+    assert results[3]["error"]["status_code"] == 400
+
+
+def test_chat_completions_reports_server_timing_when_enabled():
+    chat = AsyncMock()
+    chat.return_value = ChatResponse(
+        id="test-id",
+        created=1234567890,
+        model="gemini-1.5-flash",
+        choices=[
+            ChatResponseChoice(
+                index=0,
+                message=ChatMessage(role="assistant", content="Hello"),
+                finish_reason="stop",
+            )
+        ],
+    )
+    payload = {
+        "model": "gemini-1.5-flash",
+        "messages": [{"role": "user", "content": "Hello"}],
+    }
+
+    # 내부 처리 시간이 노출되지 않도록 기본값은 꺼져 있다
+    with TestClient(app()) as client:
+        with patch.object(client.app.state.engine, "chat", chat):
+            response = client.post("/api/v1/chat/completions", json=payload)
+    assert "Server-Timing" not in response.headers
+
+    with patch("llm_gateway.main.settings.SERVER_TIMING_ENABLED", True):
+        server = app()
+    with TestClient(server) as client:
+        with patch.object(server.state.engine, "chat", chat):
+            response = client.post("/api/v1/chat/completions", json=payload)
+
+    stages = [
+        entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")
+    ]
+    assert stages == ["validate", "serialize", "total"]
+
+
+def test_sampled_traces_are_exported_to_collector():
+    collected = []
+
+    def collect(request):
+        collected.extend(json.loads(request.content)["post"])
+        return httpx.Response(202)
+
+    with (
+        patch.multiple(
+            "llm_gateway.main.settings",
+            FAKE_PROVIDER_ENABLED=True,
+            FAKE_PROVIDER_LATENCY_SECONDS=0.01,
+            LANGSMITH_TRACING=True,
+            LANGSMITH_ENDPOINT="http://collector.test",
+            TRACING_SAMPLE_RATE=1.0,
+            SERVER_TIMING_ENABLED=True,
+        ),
+        respx.mock(assert_all_mocked=False) as collector,
+    ):
+        collector.post("http://collector.test/runs/batch").mock(side_effect=collect)
+        with TestClient(app()) as client:
+            response = client.post(
+                "/api/v1/chat/completions",
+                json={
+                    "model": "fake-model",
+                    "messages": [{"role": "user", "content": "Hello"}],
+                },
+            )
+            assert "upstream;dur=" in response.headers["Server-Timing"]
+            stats = client.get("/api/v1/admin/tracing").json()
+            assert stats["sampled"] >= 1
+        # 종료 시 큐에 남은 trace까지 전송된다
+
+    names = {run["name"] for run in collected}
+    assert {"POST /api/v1/chat/completions", "route", "upstream"} <= names
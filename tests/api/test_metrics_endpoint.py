@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+from llm_gateway.api.metrics import route_label
+
+
+def test_metrics_records_http_requests(client_instance):
+    assert client_instance.get("/health").status_code == 200
+    assert client_instance.get("/api/v1/admin/cache").status_code == 200
+
+    response = client_instance.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'llm_gateway_http_requests_total{method="GET",route="/health",status="200"}'
+        in response.text
+    )
+    assert 'route="/api/v1/admin/cache"' in response.text
+    assert "llm_gateway_http_request_duration_seconds_bucket" in response.text
+    assert 'llm_gateway_overhead_duration_seconds_count{route="/health"}' in (
+        response.text
+    )
+    assert "llm_gateway_circuit_breaker_transitions" in response.text
+
+
+def testroute_label_keeps_prefix_and_bounds_templated_paths():
+    def scope(route_path, path):
+        return {"route": SimpleNamespace(path=route_path), "path": path}
+
+    # include_router의 route.path에는 prefix가 빠져 있을 수 있다
+    assert route_label(scope("/cache", "/api/v1/admin/cache")) == (
+        "/api/v1/admin/cache"
+    )
+    # path parameter가 있으면 요청 path 대신 템플릿을 쓴다
+    assert route_label(scope("/items/{item_id}", "/items/42")) == "/items/{item_id}"
+    assert route_label({"path": "/nope"}) == "unmatched"
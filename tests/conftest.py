@@ -4,6 +4,13 @@ import pytest
 from fastapi.testclient import TestClient
 
 from llm_gateway.main import app
+from llm_gateway.schemas.chat import (
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+    ChatResponseChoice,
+    ChatUsage,
+)
 
 
 @pytest.fixture(autouse=True)
@@ -22,10 +29,65 @@ def app_instance():
 
 @pytest.fixture
 def client_instance(app_instance):
-    return TestClient(app_instance)
+    # lifespan(startup/shutdown)을 실행해야 engine이 만들어진다
+    with TestClient(app_instance) as client:
+        yield client
 
 
 @pytest.fixture(autouse=True)
 def mock_genai_client():
     with patch("llm_gateway.extensions.providers.gemini.genai.Client") as mock:
         yield mock
+
+
+@pytest.fixture
+def make_request():
+    """
+    ChatRequest factory: one user message (after a system message when
+    `system` is given) unless `messages` is passed.
+    """
+
+    def make(
+        content: str = "Hello",
+        *,
+        model: str = "gemini-2.0-flash",
+        system: str | None = None,
+        **kwargs,
+    ) -> ChatRequest:
+        messages = kwargs.pop("messages", None)
+        if messages is None:
+            messages = [ChatMessage(role="user", content=content)]
+            if system is not None:
+                messages.insert(0, ChatMessage(role="system", content=system))
+        return ChatRequest(model=model, messages=messages, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def make_response():
+    """
+    ChatResponse factory with a single assistant choice.
+    """
+
+    def make(
+        content: str = "Hello",
+        *,
+        model: str = "gemini-2.0-flash",
+        usage: ChatUsage | None = None,
+    ) -> ChatResponse:
+        return ChatResponse(
+            id="test-id",
+            created=1234567890,
+            model=model,
+            usage=usage,
+            choices=[
+                ChatResponseChoice(
+                    index=0,
+                    message=ChatMessage(role="assistant", content=content),
+                    finish_reason="stop",
+                )
+            ],
+        )
+
+    return make
@@ -0,0 +1,77 @@
+from functools import partial
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from llm_gateway.core.cache import ResponseCache, request_cache_key
+from llm_gateway.core.engine import LLMEngine
+
+
+@pytest.fixture
+def make_request(make_request):
+    # 캐시 대상인 결정적 요청을 기본으로 한다
+    return partial(make_request, "Roll", temperature=0.0)
+
+
+def test_request_cache_key_is_canonical(make_request):
+    tools_a = [{"type": "function", "function": {"name": "roll", "parameters": {}}}]
+    tools_b = [{"function": {"parameters": {}, "name": "roll"}, "type": "function"}]
+
+    assert request_cache_key(make_request(tools=tools_a)) == request_cache_key(
+        make_request(tools=tools_b, stream=True, cache=False)
+    )
+    assert request_cache_key(make_request()) != request_cache_key(
+        make_request(temperature=0.5)
+    )
+
+
+def test_response_cache_ttl_and_lru(make_response):
+    now = [0.0]
+    cache = ResponseCache(max_entries=2, ttl_seconds=10.0, clock=lambda: now[0])
+
+    cache.set("a", make_response("a"))
+    cache.set("b", make_response("b"))
+    assert cache.get("a").choices[0].message.content == "a"
+
+    # "b"가 가장 오래 사용되지 않았으므로 제거된다
+    cache.set("c", make_response("c"))
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+
+
+def test_response_cache_byte_bound(make_response):
+    size = len(make_response("d20").model_dump_json())
+    cache = ResponseCache(max_bytes=size * 2)
+
+    for key in "abc":
+        cache.set(key, make_response("d20"))
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] <= size * 2
+
+
+@pytest.mark.asyncio
+async def test_engine_serves_repeated_requests_from_cache(make_request, make_response):
+    router = MagicMock()
+    router.resolve = lambda request: request
+    router.route_chat = AsyncMock(return_value=make_response("d20"))
+    engine = LLMEngine(router, cache=ResponseCache())
+
+    await engine.chat(make_request())
+    response = await engine.chat(make_request())
+
+    assert response.choices[0].message.content == "d20"
+    router.route_chat.assert_awaited_once()
+
+    # opt-out 및 temperature > 0 요청은 캐시를 거치지 않는다
+    await engine.chat(make_request(cache=False))
+    await engine.chat(make_request(temperature=0.7))
+    assert router.route_chat.await_count == 3
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from functools import partial
+
+import pytest
+
+from llm_gateway.core.candidates import split_candidates
+from llm_gateway.core.config import RateLimitQuota
+from llm_gateway.core.engine import LLMEngine
+from llm_gateway.core.exceptions import OverloadedError, UpstreamError
+from llm_gateway.core.ratelimit import RateLimiter
+from llm_gateway.core.scheduler import AdmissionScheduler
+from llm_gateway.core.tokens import estimate_request_tokens
+from llm_gateway.extensions.providers import FakeProvider
+from llm_gateway.extensions.routers import SimpleRouter
+
+
+@pytest.fixture
+def make_request(make_request):
+    return partial(make_request, "Narrate the ambush.", model="fake-model")
+
+
+def make_router(**kwargs) -> SimpleRouter:
+    provider = FakeProvider(
+        latency=0.05, distribution="constant", completion_tokens=10, **kwargs
+    )
+    return SimpleRouter({"fake": provider}, model_routes={"fake": "fake"})
+
+
+def test_split_candidates():
+    assert split_candidates(1, 1) == [1]
+    assert split_candidates(3, 1) == [1, 1, 1]
+    assert split_candidates(5, 2) == [2, 2, 1]
+    assert split_candidates(4, 8) == [4]
+
+
+@pytest.mark.asyncio
+async def test_fan_out_runs_candidates_concurrently_and_merges(make_request):
+    router = make_router()
+
+    started = time.perf_counter()
+    response = await router.route_chat(make_request(n=3))
+    elapsed = time.perf_counter() - started
+
+    assert [choice.index for choice in response.choices] == [0, 1, 2]
+    # 순차 실행(0.15s)이 아니라 병렬로 한 번의 지연 안에 끝난다
+    assert elapsed < 0.12
+    single = await router.route_chat(make_request())
+    assert response.usage.total_tokens == 3 * single.usage.total_tokens
+
+
+@pytest.mark.asyncio
+async def test_fan_out_stream_interleaves_candidates(make_request):
+    router = make_router(tokens_per_second=500.0, chunk_tokens=2)
+
+    chunks = [chunk async for chunk in router.route_chat_stream(make_request(n=2))]
+
+    indexes = [choice.index for chunk in chunks for choice in chunk.choices]
+    # 후보별 chunk가 도착 순서대로 섞여 나온다
+    assert indexes[:2] in ([0, 1], [1, 0])
+    assert sorted(set(indexes)) == [0, 1]
+    assert len({chunk.id for chunk in chunks}) == 1
+
+    finished = [
+        choice.index
+        for chunk in chunks
+        for choice in chunk.choices
+        if choice.finish_reason == "stop"
+    ]
+    assert sorted(finished) == [0, 1]
+    # 후보별 usage는 마지막 chunk 하나로 합친다
+    assert [chunk.usage is not None for chunk in chunks].count(True) == 1
+    assert chunks[-1].choices == []
+    assert chunks[-1].usage.completion_tokens == 20
+
+
+@pytest.mark.asyncio
+async def test_fan_out_failure_cancels_remaining_candidates(make_request):
+    router = make_router(error_rate=1.0)
+
+    with pytest.raises(Exception, match="Injected"):
+        await router.route_chat(make_request(n=3))
+    # 남은 fan-out task가 없어야 한다
+    await asyncio.sleep(0)
+    pending = [
+        task
+        for task in asyncio.all_tasks()
+        if task is not asyncio.current_task() and not task.done()
+    ]
+    assert pending == []
+
+
+@pytest.mark.asyncio
+async def test_engine_admits_every_upstream_call_of_a_fan_out(make_request):
+    limiter = RateLimiter(
+        model_quotas={"fake": RateLimitQuota(rpm=60, tpm=60_000)},
+        burst_seconds=6.0,
+        clock=lambda: 0.0,  # 버킷이 다시 차지 않게 시간을 멈춘다
+    )
+    limiter.reconcile = lambda reservation, actual: None
+    engine = LLMEngine(make_router(), rate_limiter=limiter)
+    request = make_request(n=3)
+
+    await engine.chat(request)
+
+    # provider가 호출당 후보 1개만 만들므로 세 번의 호출을 예약한다
+    stats = limiter.stats()["model:fake"]
+    assert stats["requests_available"] == 6 - 3
+    assert stats["tokens_available"] == 6_000 - 3 * estimate_request_tokens(request)
+
+
+@pytest.mark.asyncio
+async def test_engine_refunds_requests_that_never_reach_the_upstream(make_request):
+    limiter = RateLimiter(
+        model_quotas={"fake": RateLimitQuota(rpm=60, tpm=60_000)},
+        clock=lambda: 0.0,
+    )
+    scheduler = AdmissionScheduler(
+        initial_limit=1, min_limit=1, max_limit=1, max_queue_size=0
+    )
+    engine = LLMEngine(make_router(), rate_limiter=limiter, scheduler=scheduler)
+
+    first = asyncio.create_task(engine.chat(make_request()))
+    await asyncio.sleep(0.01)
+    # 슬롯이 모두 찼으므로 두 번째 요청은 shed된다
+    with pytest.raises(OverloadedError):
+        await engine.chat(make_request())
+    assert limiter.stats()["model:fake"]["requests_available"] == 6 - 1
+    await first
+
+    failing = LLMEngine(make_router(error_rate=1.0), rate_limiter=limiter)
+    available = limiter.stats()["model:fake"]["requests_available"]
+    with pytest.raises(UpstreamError):
+        await failing.chat(make_request())
+    assert limiter.stats()["model:fake"]["requests_available"] == available
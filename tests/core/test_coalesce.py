@@ -0,0 +1,125 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from llm_gateway.core.coalesce import SingleFlight
+from llm_gateway.core.engine import LLMEngine
+from llm_gateway.schemas.chat import (
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+    ChatResponseChoice,
+)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "result"
+
+    waiters = [asyncio.create_task(flight.do("k", upstream)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["result"] * 5
+    assert calls == 1
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancellation():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    upstream_cancelled = asyncio.Event()
+
+    async def upstream():
+        try:
+            await release.wait()
+            return "result"
+        except asyncio.CancelledError:
+            upstream_cancelled.set()
+            raise
+
+    first = asyncio.create_task(flight.do("k", upstream))
+    second = asyncio.create_task(flight.do("k", upstream))
+    await asyncio.sleep(0)
+
+    # 한 대기자가 끊겨도 나머지는 결과를 받는다
+    first.cancel()
+    await asyncio.sleep(0)
+    assert not upstream_cancelled.is_set()
+    release.set()
+    assert await second == "result"
+
+    # 모든 대기자가 끊기면 upstream 호출도 취소된다
+    release.clear()
+    third = asyncio.create_task(flight.do("k", upstream))
+    await asyncio.sleep(0)
+    third.cancel()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert upstream_cancelled.is_set()
+    assert flight.stats()["cancelled"] == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_engine_coalesces_identical_requests():
+    release = asyncio.Event()
+
+    async def route_chat(request):
+        await release.wait()
+        return ChatResponse(
+            id="test-id",
+            created=1234567890,
+            model=request.model,
+            choices=[
+                ChatResponseChoice(
+                    index=0,
+                    message=ChatMessage(role="assistant", content="Welcome!"),
+                    finish_reason="stop",
+                )
+            ],
+        )
+
+    router = MagicMock()
+    router.resolve = lambda request: request
+    router.route_chat = MagicMock(side_effect=route_chat)
+    engine = LLMEngine(router, coalescer=SingleFlight())
+
+    request = ChatRequest(
+        model="gemini-2.0-flash",
+        messages=[ChatMessage(role="user", content="Greet the party")],
+        temperature=0.0,
+    )
+    tasks = [asyncio.create_task(engine.chat(request)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    responses = await asyncio.gather(*tasks)
+
+    assert router.route_chat.call_count == 1
+    assert all(r.choices[0].message.content == "Welcome!" for r in responses)
+    assert responses[0] is not responses[1]
+
+    # 샘플링 요청과 다른 client의 요청은 묶지 않는다 (토큰은 leader에게 청구된다)
+    release.clear()
+    sampled = request.model_copy(update={"temperature": 0.7})
+    tasks = [
+        asyncio.create_task(engine.chat(sampled)),
+        asyncio.create_task(engine.chat(sampled)),
+        asyncio.create_task(engine.chat(request, client="gm")),
+        asyncio.create_task(engine.chat(request, client="npc")),
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*tasks)
+    assert router.route_chat.call_count == 5
@@ -0,0 +1,116 @@
+from llm_gateway.core.compaction import HistoryCompactor
+from llm_gateway.core.config import CompactionPolicy
+from llm_gateway.schemas.chat import ChatMessage, ChatRequest
+
+TOOL_CALL = [
+    {
+        "id": "roll_dice",
+        "type": "function",
+        "function": {"name": "roll_dice", "arguments": "{}"},
+    }
+]
+
+
+def make_request(messages: list[ChatMessage], model: str = "gemini-2.0-flash"):
+    return ChatRequest(model=model, messages=messages)
+
+
+def turn(text: str) -> list[ChatMessage]:
+    # 메시지당 약 104 토큰 (400자 / 4 + overhead 4)
+    return [
+        ChatMessage(role="user", content=f"{text} " + "u" * 399),
+        ChatMessage(role="assistant", content=f"{text} " + "a" * 399),
+    ]
+
+
+def test_short_history_is_returned_unchanged():
+    compactor = HistoryCompactor({"": CompactionPolicy(max_input_tokens=10_000)})
+    request = make_request([ChatMessage(role="user", content="Hi")])
+
+    compacted, result = compactor.compact(request)
+
+    assert compacted is request
+    assert result.saved_tokens == 0
+
+
+def test_sliding_window_keeps_system_and_recent_messages():
+    compactor = HistoryCompactor(
+        {"": CompactionPolicy(max_input_tokens=500, keep_recent_messages=2)}
+    )
+    messages = [ChatMessage(role="system", content="You are the GM.")]
+    for i in range(10):
+        messages += turn(f"turn-{i}")
+    request = make_request(messages)
+
+    compacted, result = compactor.compact(request)
+
+    assert compacted.messages[0].role == "system"
+    # system + 최근 4개 메시지가 예산 안에 들어간다
+    assert len(compacted.messages) == 5
+    assert compacted.messages[-1].content.startswith("turn-9")
+    assert compacted.messages[1].content.startswith("turn-8")
+    assert result.dropped_messages == 16
+    assert result.tokens <= 500 < result.original_tokens
+    assert compactor.stats()["saved_tokens"] == result.saved_tokens
+    assert len(request.messages) == 21
+
+
+def test_stale_tool_results_are_dropped_with_their_call():
+    compactor = HistoryCompactor({"": CompactionPolicy(stale_tool_result_turns=1)})
+    messages = [
+        ChatMessage(role="user", content="Attack the goblin"),
+        ChatMessage(role="assistant", tool_calls=TOOL_CALL),
+        ChatMessage(role="tool", tool_call_id="roll_dice", content='{"roll": 17}'),
+        ChatMessage(role="assistant", content="You hit!"),
+        ChatMessage(role="user", content="Search the room"),
+        ChatMessage(role="assistant", tool_calls=TOOL_CALL),
+        ChatMessage(role="tool", tool_call_id="roll_dice", content='{"roll": 3}'),
+    ]
+
+    compacted, result = compactor.compact(make_request(messages))
+
+    assert [m.role for m in compacted.messages] == [
+        "user",
+        "assistant",
+        "user",
+        "assistant",
+        "tool",
+    ]
+    assert compacted.messages[-1].content == '{"roll": 3}'
+    assert result.dropped_messages == 2
+
+
+def test_pinned_tool_role_keeps_tool_exchanges():
+    compactor = HistoryCompactor(
+        {
+            "": CompactionPolicy(
+                stale_tool_result_turns=0, pinned_roles=["system", "tool"]
+            )
+        }
+    )
+    messages = [
+        ChatMessage(role="assistant", tool_calls=TOOL_CALL),
+        ChatMessage(role="tool", tool_call_id="roll_dice", content='{"roll": 17}'),
+        ChatMessage(role="user", content="Next"),
+    ]
+    request = make_request(messages)
+
+    compacted, _ = compactor.compact(request)
+
+    assert compacted is request
+
+
+def test_policy_is_matched_by_longest_prefix():
+    compactor = HistoryCompactor(
+        {
+            "": CompactionPolicy(max_input_tokens=100_000),
+            "creative": CompactionPolicy(max_input_tokens=300, keep_recent_messages=1),
+        }
+    )
+    messages = turn("a") + turn("b") + turn("c")
+
+    compacted, _ = compactor.compact(make_request(messages, model="creative"))
+    assert len(compacted.messages) == 2
+
+    compacted, _ = compactor.compact(make_request(messages, model="gemini-2.0-flash"))
+    assert len(compacted.messages) == 6
@@ -0,0 +1,68 @@
+import httpx
+import pytest
+import respx
+
+from llm_gateway.core.config import UpstreamTimeout
+from llm_gateway.core.http import PooledTransport, build_http_client
+
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+
+
+def make_transport() -> PooledTransport:
+    return PooledTransport(
+        max_connections=4,
+        timeout=UpstreamTimeout(connect=1.0, read=10.0),
+        model_timeouts={"gemini-2.5": UpstreamTimeout(read=300.0)},
+    )
+
+
+def test_timeout_for_model_overrides_only_given_fields():
+    transport = make_transport()
+
+    assert transport.timeout_for("gemini-2.0-flash").read == 10.0
+    timeout = transport.timeout_for("gemini-2.5-pro")
+    assert timeout.read == 300.0
+    assert timeout.connect == 1.0
+
+
+@pytest.mark.asyncio
+async def test_requests_without_timeout_get_model_timeout():
+    transport = make_transport()
+    seen = {}
+
+    def capture(request: httpx.Request):
+        seen[request.url.path] = request.extensions["timeout"]
+        return httpx.Response(200, json={})
+
+    async with build_http_client(transport) as client:
+        with respx.mock:
+            respx.post(url__startswith=GEMINI_URL).mock(side_effect=capture)
+            # Gemini SDK는 timeout을 명시적으로 None으로 넘긴다
+            for model in ("gemini-2.5-flash", "gemini-2.0-flash"):
+                await client.post(
+                    f"{GEMINI_URL}/{model}:generateContent", json={}, timeout=None
+                )
+
+    assert seen["/v1beta/models/gemini-2.5-flash:generateContent"]["read"] == 300.0
+    assert seen["/v1beta/models/gemini-2.0-flash:generateContent"]["read"] == 10.0
+
+
+@pytest.mark.asyncio
+async def test_stream_counts_as_in_flight_until_closed():
+    transport = make_transport()
+
+    async with build_http_client(transport) as client:
+        with respx.mock:
+            respx.post(url__startswith=GEMINI_URL).mock(
+                return_value=httpx.Response(200, content=b"data: {}\n\n")
+            )
+            url = f"{GEMINI_URL}/gemini-2.0-flash:streamGenerateContent"
+            async with client.stream("POST", url, json={}) as response:
+                assert transport.stats()["in_flight"] == 1
+                await response.aread()
+
+    stats = transport.stats()
+    assert stats["in_flight"] == 0
+    assert stats["peak_in_flight"] == 1
+    assert stats["requests"] == 1
+    assert stats["max_connections"] == 4
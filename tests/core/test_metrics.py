@@ -0,0 +1,93 @@
+from unittest.mock import MagicMock
+
+from llm_gateway.core.compaction import COMPACTION_SAVED_TOKENS, HistoryCompactor
+from llm_gateway.core.config import CompactionPolicy
+from llm_gateway.core.metrics import MetricsRegistry, ModelLabels
+from llm_gateway.extensions.routers import AdaptiveRouter, HedgingPolicy
+from llm_gateway.schemas.chat import ChatMessage
+
+
+def test_render_counter_and_gauge():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests", "Requests.", ("route",))
+    in_flight = registry.gauge("in_flight", "In flight.")
+
+    requests.labels("/health").inc()
+    requests.labels("/health").inc()
+    requests.labels('/a"b').inc(0.5)
+    in_flight.inc()
+
+    text = registry.render()
+
+    assert "# TYPE requests counter" in text
+    assert 'requests_total{route="/health"} 2' in text
+    assert 'requests_total{route="/a\\"b"} 0.5' in text
+    assert "in_flight 1" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency", "Latency.", buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_bucket{le="0.1"} 1' in lines
+    assert 'latency_bucket{le="1"} 3' in lines
+    assert 'latency_bucket{le="+Inf"} 4' in lines
+    assert "latency_sum 4.25" in lines
+    assert "latency_count 4" in lines
+
+
+def test_registering_same_name_returns_existing_metric():
+    registry = MetricsRegistry()
+
+    assert registry.counter("requests", "Requests.") is registry.counter(
+        "requests", "Requests."
+    )
+
+
+def test_model_labels_group_unknown_models_beyond_the_cap():
+    labels = ModelLabels(known={"gemini-2.0-flash"}, max_models=1)
+
+    assert labels.label("gemini-2.0-flash") == "gemini-2.0-flash"
+    assert labels.label("gemini-typo") == "gemini-typo"
+    assert labels.label("gemini-typo-2") == "other"
+    # 이미 label을 받은 모델과 설정된 모델은 계속 자기 이름을 쓴다
+    assert labels.label("gemini-typo") == "gemini-typo"
+    assert labels.label("gemini-2.0-flash") == "gemini-2.0-flash"
+
+
+def test_model_keyed_state_uses_bounded_labels(monkeypatch, make_request):
+    labels = ModelLabels(known={"gemini-2.0-flash"}, max_models=0)
+    for module in ("core.compaction", "extensions.routers.hedging") + (
+        "extensions.routers.simple_router",
+    ):
+        monkeypatch.setattr(f"llm_gateway.{module}.model_labels", labels)
+
+    compactor = HistoryCompactor(
+        {"": CompactionPolicy(max_input_tokens=50, keep_recent_messages=1)}
+    )
+    messages = [
+        ChatMessage(role="user" if i % 2 == 0 else "assistant", content="x" * 200)
+        for i in range(5)
+    ]
+    compactor.compact(make_request(model="gemini-x1", messages=messages))
+    assert ("gemini-x1",) not in COMPACTION_SAVED_TOKENS._children
+    assert ("other",) in COMPACTION_SAVED_TOKENS._children
+
+    hedging = HedgingPolicy()
+    hedging.record("gemini-x1", 0.1)
+    hedging.record("gemini-x2", 0.1)
+    assert set(hedging.stats()["delays"]) == {"other"}
+
+    router = AdaptiveRouter(
+        {"google": MagicMock()}, aliases={"fast": ["gemini-2.0-flash"]}
+    )
+    assert router._breaker_key("gemini-x1") == "google:other"
+    assert router._breaker_key("gemini-2.0-flash") == "google:gemini-2.0-flash"
+    # 별칭 후보가 아닌 모델은 routing 상태를 남기지 않는다
+    router._record("gemini-x1", 0.1, failed=False)
+    assert router.stats()["models"] == {}
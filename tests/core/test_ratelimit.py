@@ -0,0 +1,192 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from llm_gateway.core.config import RateLimitQuota
+from llm_gateway.core.exceptions import RateLimitExceededError
+from llm_gateway.core.ratelimit import RateLimiter, TokenBucket
+from llm_gateway.core.state import MemoryStateStore, StateStoreError
+
+
+class SharedMemoryStore(MemoryStateStore):
+    shared = True
+
+
+class FailingStore(SharedMemoryStore):
+    async def incr(self, key, amount=1, ttl=None):
+        raise StateStoreError("down")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_paces_in_arrival_order():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=2.0, clock=clock)
+
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+
+    clock.now = 10.0
+    assert bucket.reserve(1) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_paces_instead_of_failing():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        model_quotas={"gemini": RateLimitQuota(rpm=60)},
+        burst_seconds=1.0,
+        clock=clock,
+    )
+
+    with patch("llm_gateway.core.ratelimit.asyncio.sleep", new=AsyncMock()) as sleep:
+        await limiter.acquire("gemini-2.0-flash", None, 10)
+        await limiter.acquire("gemini-2.0-flash", None, 10)
+
+    sleep.assert_awaited_once_with(pytest.approx(1.0))
+    assert limiter.stats()["model:gemini"]["paced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_tpm_reconcile_and_client_quota():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        model_quotas={
+            "gemini": RateLimitQuota(tpm=60_000),
+            "gemini-2.0-flash": RateLimitQuota(tpm=6_000),
+        },
+        client_quotas={"*": RateLimitQuota(rpm=6)},
+        burst_seconds=10.0,
+        max_wait_seconds=5.0,
+        clock=clock,
+    )
+
+    # 가장 긴 prefix의 quota가 적용된다 (6000 tpm -> 버킷 1000 토큰)
+    reservation = await limiter.acquire("gemini-2.0-flash", "npc-ai", 400)
+    limiter.reconcile(reservation, 900)
+    stats = limiter.stats()
+    assert stats["model:gemini-2.0-flash"]["tokens_available"] == 100
+
+    # 호출 서비스별 quota는 다른 서비스에 영향을 주지 않는다
+    with pytest.raises(RateLimitExceededError):
+        await limiter.acquire("other-model", "npc-ai", 0)
+    await limiter.acquire("other-model", "gm", 0)
+
+    assert limiter.stats()["client:npc-ai"]["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_reconcile_charges_each_bucket_against_its_own_reservation():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        model_quotas={"gemini": RateLimitQuota(tpm=600)},  # 버킷 100 토큰
+        client_quotas={"*": RateLimitQuota(tpm=60_000)},  # 버킷 10000 토큰
+        burst_seconds=10.0,
+        max_wait_seconds=100.0,
+        clock=clock,
+    )
+
+    with patch("llm_gateway.core.ratelimit.asyncio.sleep", new=AsyncMock()):
+        reservation = await limiter.acquire("gemini-2.0-flash", "gm", 500)
+    # model 버킷은 용량(100)만 예약했으므로 나머지 400을 더 청구한다
+    limiter.reconcile(reservation, 500)
+
+    stats = limiter.stats()
+    assert stats["model:gemini"]["tokens_available"] == -400
+    assert stats["client:gm"]["tokens_available"] == 9_500
+
+
+@pytest.mark.asyncio
+async def test_cancelled_pacing_wait_refunds_reservation():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        model_quotas={"gemini": RateLimitQuota(rpm=60, tpm=600)},
+        burst_seconds=1.0,
+        clock=clock,
+    )
+    await limiter.acquire("gemini-2.0-flash", None, 10)
+
+    waiting = asyncio.create_task(limiter.acquire("gemini-2.0-flash", None, 10))
+    await asyncio.sleep(0)
+    assert limiter.stats()["model:gemini"]["requests_available"] == -1
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    stats = limiter.stats()["model:gemini"]
+    assert stats["requests_available"] == 0
+    assert stats["tokens_available"] == 0
+
+
+@pytest.mark.asyncio
+async def test_workers_share_one_quota_through_the_store():
+    store = SharedMemoryStore()
+    workers = [
+        RateLimiter(
+            model_quotas={"gemini": RateLimitQuota(rpm=2, tpm=1_000)},
+            burst_seconds=60.0,
+            max_wait_seconds=100.0,
+            store=store,
+            clock=FakeClock(),
+            wall_clock=lambda: 30.0,
+        )
+        for _ in range(2)
+    ]
+
+    with patch("llm_gateway.core.ratelimit.asyncio.sleep", new=AsyncMock()) as sleep:
+        await workers[0].acquire("gemini-2.0-flash", None, 100)
+        await workers[0].acquire("gemini-2.0-flash", None, 100)
+        sleep.assert_not_awaited()
+        # 두 번째 worker의 로컬 버킷은 비어 있지만 공유 window는 이미 찼다
+        reservation = await workers[1].acquire("gemini-2.0-flash", None, 100)
+
+    sleep.assert_awaited_once_with(pytest.approx(30.0))
+    assert [key for key, _ in reservation.shared_requests] == [
+        "ratelimit:model:gemini:requests:1"
+    ]
+    workers[1].reconcile(reservation, 300)
+    await asyncio.sleep(0)
+    assert await store.get("ratelimit:model:gemini:tokens:1") == b"300"
+
+
+@pytest.mark.asyncio
+async def test_store_failure_falls_back_to_local_pacing():
+    limiter = RateLimiter(
+        model_quotas={"gemini": RateLimitQuota(rpm=60)},
+        store=FailingStore(),
+        clock=FakeClock(),
+    )
+
+    await limiter.acquire("gemini-2.0-flash", None, 10)
+
+    assert limiter.shared_failures == 1
+
+
+@pytest.mark.asyncio
+async def test_wildcard_client_quota_folds_extra_clients_into_other():
+    limiter = RateLimiter(
+        client_quotas={"*": RateLimitQuota(rpm=60), "gm": RateLimitQuota(rpm=600)},
+        max_clients=2,
+        clock=FakeClock(),
+    )
+
+    for client in ("npc-1", "npc-2", "npc-3", "npc-4", "gm"):
+        await limiter.acquire("gemini-2.0-flash", client, 10)
+
+    # 명시적으로 설정된 client는 한도와 무관하게 자기 limit을 받는다
+    assert set(limiter.stats()) == {
+        "client:npc-1",
+        "client:npc-2",
+        "client:other",
+        "client:gm",
+    }
+    assert limiter.stats()["client:other"]["requests_available"] == 6 - 2
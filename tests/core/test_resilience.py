@@ -0,0 +1,206 @@
+import pytest
+
+from llm_gateway.core.exceptions import (
+    CircuitOpenError,
+    UpstreamError,
+    UpstreamRateLimitError,
+)
+from llm_gateway.core.resilience import CircuitBreaker, CircuitState, ResiliencePolicy
+from llm_gateway.core.scheduler import AdmissionScheduler
+from llm_gateway.schemas.chat import (
+    ChatChunkChoice,
+    ChatCompletionChunk,
+    ChatDelta,
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_policy(**kwargs) -> ResiliencePolicy:
+    kwargs.setdefault("backoff_base", 0)
+    kwargs.setdefault("backoff_max", 0)
+    return ResiliencePolicy(**kwargs)
+
+
+def breaker_key(model: str) -> str:
+    return f"google:{model}"
+
+
+REQUEST = ChatRequest(
+    model="gemini-2.0-flash-lite-001",
+    messages=[ChatMessage(role="user", content="Hi")],
+)
+
+
+def test_breaker_opens_and_recovers_through_half_open():
+    clock = FakeClock()
+    transitions = []
+    breaker = CircuitBreaker(
+        "google:gemini",
+        failure_threshold=2,
+        reset_timeout=10,
+        on_transition=lambda name, a, b: transitions.append((a, b)),
+        clock=clock,
+    )
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow()
+
+    clock.now = 10
+    # half-open 상태에서는 probe 하나만 통과시킨다
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+
+    assert breaker.state is CircuitState.CLOSED
+    assert transitions == [
+        (CircuitState.CLOSED, CircuitState.OPEN),
+        (CircuitState.OPEN, CircuitState.HALF_OPEN),
+        (CircuitState.HALF_OPEN, CircuitState.CLOSED),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_retries_retryable_errors(make_response):
+    policy = make_policy(max_attempts=3)
+    calls = []
+
+    async def call(request: ChatRequest) -> ChatResponse:
+        calls.append(request.model)
+        if len(calls) < 3:
+            raise UpstreamError("unavailable", retryable=True)
+        return make_response(model=request.model)
+
+    response = await policy.run(REQUEST, call, breaker_key)
+
+    assert response.model == REQUEST.model
+    assert calls == [REQUEST.model] * 3
+    assert policy.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_each_rate_limit_is_signalled_to_the_scheduler(make_response):
+    scheduler = AdmissionScheduler(initial_limit=16, min_limit=1, max_limit=16)
+    policy = make_policy(max_attempts=3, on_rate_limited=scheduler.on_rate_limited)
+    calls = []
+
+    async def call(request: ChatRequest) -> ChatResponse:
+        calls.append(request.model)
+        if len(calls) < 3:
+            raise UpstreamRateLimitError("429")
+        return make_response(model=request.model)
+
+    # 재시도가 성공해도 도중의 429마다 동시성 한도를 줄인다
+    async with scheduler.slot(REQUEST.model):
+        await policy.run(REQUEST, call, breaker_key)
+    assert scheduler.stats()["models"][REQUEST.model]["limit"] == pytest.approx(4.25)
+    assert policy.stats()["rate_limited"] == 2
+
+    # 끝내 실패한 429는 slot에서 다시 세지 않는다
+    calls.clear()
+    policy.max_attempts = 1
+    with pytest.raises(UpstreamRateLimitError):
+        async with scheduler.slot(REQUEST.model):
+            await policy.run(REQUEST, call, breaker_key)
+    assert scheduler.stats()["models"][REQUEST.model]["limit"] == pytest.approx(2.12)
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_error_is_raised_immediately():
+    policy = make_policy(fallbacks={REQUEST.model: ["gemini-2.0-flash"]})
+    calls = []
+
+    async def call(request: ChatRequest) -> ChatResponse:
+        calls.append(request.model)
+        raise UpstreamError("bad request", status_code=400)
+
+    with pytest.raises(UpstreamError):
+        await policy.run(REQUEST, call, breaker_key)
+
+    assert calls == [REQUEST.model]
+    assert policy.breaker(breaker_key(REQUEST.model)).failures == 0
+
+
+@pytest.mark.asyncio
+async def test_falls_back_and_skips_open_circuit(make_response):
+    policy = make_policy(
+        fallbacks={REQUEST.model: ["gemini-2.0-flash"]},
+        max_attempts=2,
+        failure_threshold=2,
+    )
+    calls = []
+
+    async def call(request: ChatRequest) -> ChatResponse:
+        calls.append(request.model)
+        if request.model == REQUEST.model:
+            raise UpstreamError("unavailable", retryable=True)
+        return make_response(model=request.model)
+
+    response = await policy.run(REQUEST, call, breaker_key)
+    assert response.model == "gemini-2.0-flash"
+    assert calls == [REQUEST.model, REQUEST.model, "gemini-2.0-flash"]
+
+    # circuit이 열린 모델은 호출하지 않고 바로 다음 모델로 넘어간다
+    calls.clear()
+    response = await policy.run(REQUEST, call, breaker_key)
+    assert response.model == "gemini-2.0-flash"
+    assert calls == ["gemini-2.0-flash"]
+    assert policy.short_circuited == 1
+
+    stats = policy.stats()
+    assert stats["breakers"][breaker_key(REQUEST.model)]["state"] == "open"
+    assert {
+        "breaker": breaker_key(REQUEST.model),
+        "from": "closed",
+        "to": "open",
+        "count": 1,
+    } in stats["transitions"]
+
+
+@pytest.mark.asyncio
+async def test_raises_circuit_open_when_whole_chain_is_open():
+    policy = make_policy(failure_threshold=1, max_attempts=1)
+
+    async def call(request: ChatRequest) -> ChatResponse:
+        raise UpstreamError("unavailable", retryable=True)
+
+    with pytest.raises(UpstreamError):
+        await policy.run(REQUEST, call, breaker_key)
+    with pytest.raises(CircuitOpenError):
+        await policy.run(REQUEST, call, breaker_key)
+
+
+@pytest.mark.asyncio
+async def test_stream_fails_over_before_first_chunk():
+    policy = make_policy(
+        fallbacks={REQUEST.model: ["gemini-2.0-flash"]}, max_attempts=1
+    )
+
+    async def open_stream(request: ChatRequest):
+        if request.model == REQUEST.model:
+            raise UpstreamError("unavailable", retryable=True)
+        for text in ["Hel", "lo"]:
+            yield ChatCompletionChunk(
+                id="chunk-id",
+                created=1234567890,
+                model=request.model,
+                choices=[ChatChunkChoice(index=0, delta=ChatDelta(content=text))],
+            )
+
+    chunks = [c async for c in policy.run_stream(REQUEST, open_stream, breaker_key)]
+
+    assert [c.choices[0].delta.content for c in chunks] == ["Hel", "lo"]
+    assert {c.model for c in chunks} == {"gemini-2.0-flash"}
+    assert policy.fallbacks_used == 1
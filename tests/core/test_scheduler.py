@@ -0,0 +1,132 @@
+import asyncio
+import random
+
+import pytest
+
+from llm_gateway.core.exceptions import OverloadedError, UpstreamRateLimitError
+from llm_gateway.core.metrics import ModelLabels
+from llm_gateway.core.scheduler import AdaptiveLimit, AdmissionScheduler
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_high_priority_first():
+    scheduler = AdmissionScheduler(initial_limit=1, min_limit=1, max_limit=1)
+    order = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("gemini-2.0-flash"):
+            await release.wait()
+
+    async def run(name, priority):
+        async with scheduler.slot("gemini-2.0-flash", priority):
+            order.append(name)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(run("npc", "low")),
+        asyncio.create_task(run("rules", "normal")),
+        asyncio.create_task(run("gm", "high")),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queued"] == 3
+
+    release.set()
+    await asyncio.gather(holder, *waiters)
+
+    assert order == ["gm", "rules", "npc"]
+    assert scheduler.stats()["models"]["gemini-2.0-flash"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_sheds_load():
+    scheduler = AdmissionScheduler(
+        initial_limit=1, max_limit=1, max_queue_size=1, max_queue_seconds=0.01
+    )
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("m"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    queued = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    # 큐가 가득 차면 즉시 거절
+    with pytest.raises(OverloadedError):
+        async with scheduler.slot("m"):
+            pass
+
+    # 큐 대기 시간 초과
+    with pytest.raises(OverloadedError):
+        await queued
+
+    release.set()
+    await holder
+
+    stats = scheduler.stats()
+    assert stats["shed"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_backs_off_on_rate_limit():
+    scheduler = AdmissionScheduler(initial_limit=8, min_limit=1, max_limit=16)
+
+    with pytest.raises(UpstreamRateLimitError):
+        async with scheduler.slot("m"):
+            raise UpstreamRateLimitError("429")
+
+    assert scheduler.stats()["models"]["m"]["limit"] == 4
+
+
+@pytest.mark.asyncio
+async def test_unknown_models_share_one_lane(monkeypatch):
+    monkeypatch.setattr(
+        "llm_gateway.core.scheduler.model_labels",
+        ModelLabels(known={"gemini-2.0-flash"}, max_models=0),
+    )
+    scheduler = AdmissionScheduler()
+
+    for model in ("gemini-2.0-flash", "gemini-x1", "gemini-x2"):
+        async with scheduler.slot(model):
+            pass
+    scheduler.on_rate_limited("gemini-x3")
+
+    models = scheduler.stats()["models"]
+    assert set(models) == {"gemini-2.0-flash", "other"}
+    assert models["other"]["limit"] < models["gemini-2.0-flash"]["limit"]
+
+
+def test_adaptive_limit_aimd():
+    limit = AdaptiveLimit(initial=4, min_limit=1, max_limit=8, latency_tolerance=2.0)
+
+    for _ in range(4):
+        limit.on_success(1.0)
+    assert limit.value > 4.5
+
+    before = limit.value
+    limit.on_success(5.0)  # baseline의 2배 초과
+    assert limit.value < before
+
+
+def test_adaptive_limit_tolerates_long_tailed_latency():
+    # 부하와 무관한 lognormal 분산만으로 한도가 무너지면 안 된다
+    rng = random.Random(1)
+    limit = AdaptiveLimit(initial=16, min_limit=1, max_limit=64, latency_tolerance=2.0)
+
+    for _ in range(2000):
+        limit.on_success(0.05 * rng.lognormvariate(0.0, 0.5))
+
+    assert limit.value >= 16
+
+    # 지연이 계속 늘어나면 (실제 혼잡) 줄인다
+    before = limit.value
+    for _ in range(10):
+        limit.on_success(0.5)
+    assert limit.value < before
@@ -0,0 +1,135 @@
+import threading
+from functools import partial
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from llm_gateway.core.engine import LLMEngine
+from llm_gateway.schemas.chat import (
+    ChatMessage,
+    ChatRequest,
+)
+
+pytest.importorskip("numpy")
+
+from llm_gateway.core.semantic_cache import (  # noqa: E402
+    HashingEmbedder,
+    SemanticCache,
+)
+
+PERSONA = "You are Brom, a grumpy blacksmith."
+
+
+@pytest.fixture
+def make_request(make_request):
+    # 같은 NPC(system prompt)에게 한 질문
+    return partial(make_request, system=PERSONA)
+
+
+def make_cache(**kwargs) -> SemanticCache:
+    return SemanticCache(HashingEmbedder(), **kwargs)
+
+
+def test_hashing_embedder_scores_near_duplicates_higher():
+    embed = HashingEmbedder()
+    base = embed("Where can I buy a sword?")
+
+    assert float(base @ embed("where can i buy a sword")) == pytest.approx(1.0)
+    near = float(base @ embed("where can I buy swords?"))
+    # 단어 하나만 다른 질문은 기본 threshold(0.9) 아래에 머문다
+    swapped = float(base @ embed("Where can I buy a shield?"))
+    far = float(base @ embed("Tell me about the dragon in the north."))
+    assert near > 0.8
+    assert swapped < 0.9
+    assert far < 0.2
+
+
+def test_near_duplicate_hits_only_within_same_context(make_request, make_response):
+    cache = make_cache(threshold=0.8)
+    cache.set(cache.key(make_request("Where can I buy a sword?")), make_response("a"))
+
+    response, similarity = cache.get(cache.key(make_request("where can I buy a sword")))
+    assert response.choices[0].message.content == "a"
+    assert similarity >= 0.8
+
+    # 다른 NPC(system prompt)에게 한 질문은 재사용하지 않는다
+    other = "You are Lira, an elven archer."
+    assert (
+        cache.get(cache.key(make_request("Where can I buy a sword?", system=other)))[0]
+        is None
+    )
+    assert cache.get(cache.key(make_request("What is the dragon's name?")))[0] is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["lookup_ms_p95"] >= 0.0
+
+
+def test_ring_buffer_evicts_oldest_and_ttl_expires(make_request, make_response):
+    now = [0.0]
+    cache = make_cache(max_entries=2, ttl_seconds=10.0, clock=lambda: now[0])
+    for question in ("sword?", "shield?", "helmet?"):
+        cache.set(cache.key(make_request(question)), make_response(question))
+
+    assert cache.get(cache.key(make_request("sword?")))[0] is None
+    assert cache.get(cache.key(make_request("helmet?")))[0] is not None
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+
+    now[0] = 11.0
+    assert cache.get(cache.key(make_request("helmet?")))[0] is None
+
+
+def test_accepts_only_cacheable_final_user_turns(make_request):
+    cache = make_cache(max_temperature=1.0)
+
+    assert cache.accepts(make_request("Hi", temperature=0.7))
+    assert not cache.accepts(make_request("Hi", temperature=1.5))
+    assert not cache.accepts(make_request("Hi", cache=False))
+    assert not cache.accepts(make_request("Hi", stream=True))
+    tool_turn = ChatRequest(
+        model="gemini-2.0-flash",
+        messages=[ChatMessage(role="tool", content="17", tool_call_id="call_1")],
+    )
+    assert not cache.accepts(tool_turn)
+
+
+@pytest.mark.asyncio
+async def test_engine_serves_near_duplicates_from_semantic_cache(
+    make_request, make_response
+):
+    router = MagicMock()
+    router.resolve = lambda request: request
+    router.route_chat = AsyncMock(return_value=make_response("Forty gold."))
+    engine = LLMEngine(router, semantic_cache=make_cache(threshold=0.8))
+
+    await engine.chat(make_request("How much for the axe?"))
+    response = await engine.chat(make_request("how much for the axe"))
+
+    assert response.choices[0].message.content == "Forty gold."
+    router.route_chat.assert_awaited_once()
+
+    await engine.chat(make_request("Can you repair my armor?"))
+    assert router.route_chat.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_engine_runs_model_embedders_off_the_event_loop(
+    make_request, make_response
+):
+    threads = []
+    hashing = HashingEmbedder()
+
+    def embed(text):
+        threads.append(threading.current_thread())
+        return hashing(text)
+
+    router = MagicMock()
+    router.resolve = lambda request: request
+    router.route_chat = AsyncMock(return_value=make_response("Forty gold."))
+    engine = LLMEngine(router, semantic_cache=SemanticCache(embed))
+
+    await engine.chat(make_request("How much for the axe?"))
+
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,358 @@
+import asyncio
+import inspect
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+
+from llm_gateway.core.cache import ResponseCache, request_cache_key
+from llm_gateway.core.engine import LLMEngine
+from llm_gateway.core.exceptions import CircuitOpenError, UpstreamError
+from llm_gateway.core.resilience import ResiliencePolicy
+from llm_gateway.core.state import (
+    MemoryStateStore,
+    RedisStateStore,
+    StateStoreError,
+    _read_reply,
+)
+from llm_gateway.core.usage import UsageAggregator
+from llm_gateway.schemas.chat import (
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+    ChatResponseChoice,
+    ChatUsage,
+)
+
+
+class StandInRedis:
+    """
+    Minimal RESP server implementing the commands the gateway uses.
+    """
+
+    def __init__(self):
+        self.data: dict[bytes, object] = {}
+        self.expiry: dict[bytes, float] = {}
+        self.reads = 0
+        self.commands = 0
+        self.delay = 0.0
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"redis://{host}:{port}/0"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                command = await _read_reply(reader)
+                self.reads += 1
+                replies = [self._execute(command)]
+                # 이미 도착한 명령(pipeline)은 한 번에 처리한다
+                while reader._buffer:
+                    replies.append(self._execute(await _read_reply(reader)))
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(b"".join(replies))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+
+    def _get(self, key: bytes):
+        if key in self.expiry and self.expiry[key] <= time.monotonic():
+            self.data.pop(key, None)
+            self.expiry.pop(key)
+        return self.data.get(key)
+
+    def _execute(self, command: list[bytes]) -> bytes:
+        self.commands += 1
+        name, *args = command
+        name = name.upper()
+        if name == b"GET":
+            return _bulk(self._get(args[0]))
+        if name == b"MGET":
+            return b"*%d\r\n" % len(args) + b"".join(_bulk(self._get(k)) for k in args)
+        if name == b"SET":
+            key, value, *options = args
+            options = [o.upper() for o in options]
+            if b"NX" in options and self._get(key) is not None:
+                return b"$-1\r\n"
+            self.data[key] = value
+            self.expiry.pop(key, None)
+            if b"PX" in options:
+                ttl = int(options[options.index(b"PX") + 1])
+                self.expiry[key] = time.monotonic() + ttl / 1000
+            return b"+OK\r\n"
+        if name == b"INCRBY":
+            value = int(self._get(args[0]) or 0) + int(args[1])
+            self.data[args[0]] = str(value).encode()
+            return b":%d\r\n" % value
+        if name == b"DEL":
+            return b":%d\r\n" % int(self.data.pop(args[0], None) is not None)
+        if name == b"SADD":
+            members = self.data.setdefault(args[0], set())
+            members.update(args[1:])
+            return b":%d\r\n" % len(args[1:])
+        if name == b"SMEMBERS":
+            members = self.data.get(args[0], set())
+            return b"*%d\r\n" % len(members) + b"".join(map(_bulk, members))
+        return b"-ERR unknown command\r\n"
+
+
+def _bulk(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+@pytest_asyncio.fixture
+async def redis_server():
+    server = StandInRedis()
+    server.url = await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest_asyncio.fixture(params=["memory", "redis"])
+async def store(request, redis_server):
+    if request.param == "memory":
+        yield MemoryStateStore()
+        return
+    store = RedisStateStore(redis_server.url, timeout=1.0)
+    yield store
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_store_operations(store):
+    assert await store.get("missing") is None
+
+    await store.set("a", b"1")
+    await store.set("short", b"x", ttl=0.01)
+    assert await store.mget(["a", "missing"]) == [b"1", None]
+
+    assert await store.incr("n", 2, ttl=10) == 2
+    assert await store.incr("n", 3, ttl=10) == 5
+
+    await store.sadd("s", "x", "y")
+    await store.sadd("s", "y")
+    assert await store.smembers("s") == {"x", "y"}
+
+    await store.delete("a")
+    await asyncio.sleep(0.02)
+    assert await store.get("a") is None
+    assert await store.get("short") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_commands_are_pipelined(redis_server):
+    store = RedisStateStore(redis_server.url, timeout=1.0)
+    await store.set("warm", b"1")
+
+    results = await asyncio.gather(*(store.incr("counter") for _ in range(100)))
+
+    assert sorted(results) == list(range(1, 101))
+    # 100개의 명령이 하나의 write/read로 묶인다
+    assert store.stats()["writes"] == 2
+    assert redis_server.reads == 2
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_timeout_raises_and_reconnects(redis_server):
+    store = RedisStateStore(redis_server.url, timeout=0.01)
+    redis_server.delay = 0.05
+
+    with pytest.raises(StateStoreError):
+        await store.get("a")
+
+    redis_server.delay = 0
+    await store.set("a", b"1")
+    assert await store.get("a") == b"1"
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_store_raises_and_backs_off():
+    store = RedisStateStore("redis://127.0.0.1:1/0", reconnect_backoff=60.0)
+
+    with pytest.raises(StateStoreError, match="unreachable"):
+        await store.get("a")
+    # backoff 중에는 다시 연결하지 않고 바로 실패한다
+    with pytest.raises(StateStoreError, match="retrying later"):
+        await store.get("a")
+    assert store.stats()["connect_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hung_handshake_is_bounded_by_timeout():
+    async def never_reply(reader, writer):
+        await reader.read()  # AUTH에 응답하지 않는다
+        writer.close()
+
+    server = await asyncio.start_server(never_reply, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    store = RedisStateStore(
+        f"redis://:secret@{host}:{port}/0", timeout=0.05, reconnect_backoff=0.05
+    )
+
+    started = time.monotonic()
+    with pytest.raises(StateStoreError):
+        await store.get("a")
+    assert time.monotonic() - started < 0.5
+    assert not store.stats()["connected"]
+
+    server.close()
+    await server.wait_closed()
+
+
+def make_request(model: str = "gemini-2.0-flash") -> ChatRequest:
+    return ChatRequest(
+        model=model,
+        messages=[ChatMessage(role="user", content="hello")],
+        temperature=0.0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_response_cache_is_shared_between_workers(redis_server):
+    router = MagicMock()
+    router.resolve = lambda request: request
+    router.route_chat = AsyncMock(
+        return_value=ChatResponse(
+            id="test-id",
+            created=1234567890,
+            model="gemini-2.0-flash",
+            choices=[
+                ChatResponseChoice(
+                    index=0,
+                    message=ChatMessage(role="assistant", content="d20"),
+                    finish_reason="stop",
+                )
+            ],
+        )
+    )
+    workers = [
+        LLMEngine(
+            router,
+            cache=ResponseCache(),
+            state=RedisStateStore(redis_server.url, timeout=1.0),
+        )
+        for _ in range(2)
+    ]
+
+    await workers[0].chat(make_request())
+    await asyncio.sleep(0.01)  # write-behind
+    response = await workers[1].chat(make_request())
+
+    assert response.choices[0].message.content == "d20"
+    router.route_chat.assert_awaited_once()
+    assert workers[1].cache.stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_corrupt_shared_cache_entry_is_a_miss(redis_server):
+    router = MagicMock()
+    router.resolve = lambda request: request
+    router.route_chat = AsyncMock(
+        return_value=ChatResponse(
+            id="test-id",
+            created=1234567890,
+            model="gemini-2.0-flash",
+            choices=[
+                ChatResponseChoice(
+                    index=0,
+                    message=ChatMessage(role="assistant", content="d20"),
+                    finish_reason="stop",
+                )
+            ],
+        )
+    )
+    engine = LLMEngine(
+        router,
+        cache=ResponseCache(),
+        state=RedisStateStore(redis_server.url, timeout=1.0),
+    )
+    request = make_request()
+    key = request_cache_key(request)
+    await engine.state.set(f"cache:{key}", b"{not json")
+
+    response = await engine.chat(request)
+
+    assert response.choices[0].message.content == "d20"
+    router.route_chat.assert_awaited_once()
+
+
+async def wait_for(check, timeout: float = 1.0) -> None:
+    async with asyncio.timeout(timeout):
+        while True:
+            result = check()
+            if inspect.isawaitable(result):
+                result = await result
+            if result:
+                return
+            await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_breaker_opened_in_one_worker_short_circuits_another(redis_server):
+    workers = [
+        ResiliencePolicy(
+            max_attempts=1,
+            failure_threshold=1,
+            store=RedisStateStore(redis_server.url, timeout=1.0),
+            sync_seconds=0,
+        )
+        for _ in range(2)
+    ]
+    calls = []
+
+    async def call(request: ChatRequest):
+        calls.append(request.model)
+        if len(calls) == 1:
+            raise UpstreamError("unavailable", retryable=True)
+        return "ok"
+
+    with pytest.raises(UpstreamError):
+        await workers[0].run(make_request(), call, lambda model: model)
+    # OPEN 상태 게시는 write-behind로 끝난다
+    await wait_for(lambda: workers[1].store.get("breaker:gemini-2.0-flash"))
+
+    # 첫 조회는 백그라운드로 동기화하고, 이후 요청부터 반영된다
+    assert await workers[1].run(make_request(), call, lambda model: model) == "ok"
+    await wait_for(lambda: workers[1].stats()["open_elsewhere"])
+    with pytest.raises(CircuitOpenError):
+        await workers[1].run(make_request(), call, lambda model: model)
+
+    assert len(calls) == 2
+    assert workers[1].breaker("gemini-2.0-flash").state.value == "closed"
+    assert workers[1].stats()["open_elsewhere"] == ["gemini-2.0-flash"]
+
+
+@pytest.mark.asyncio
+async def test_usage_cluster_report_sums_workers(redis_server):
+    workers = [
+        UsageAggregator(
+            sink=lambda record: None,
+            store=RedisStateStore(redis_server.url, timeout=1.0),
+        )
+        for _ in range(2)
+    ]
+    usage = ChatUsage(prompt_tokens=100, completion_tokens=20, total_tokens=120)
+    for worker in workers:
+        worker.record_request("npc-ai", "gemini-2.0-flash", 0.5)
+        worker.record_tokens("npc-ai", "gemini-2.0-flash", usage)
+        await worker.flush()
+
+    report = await workers[0].cluster_report()
+    totals = report["callers"]["npc-ai"]["models"]["gemini-2.0-flash"]
+
+    assert totals["requests"] == 2
+    assert totals["prompt_tokens"] == 200
+    assert totals["latency_seconds"] == 1.0
+    assert (await workers[0].cluster_report(client="gm"))["callers"] == {}
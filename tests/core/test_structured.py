@@ -0,0 +1,322 @@
+import json
+from functools import partial
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from llm_gateway.core.engine import LLMEngine
+from llm_gateway.core.exceptions import StructuredOutputError
+from llm_gateway.core.ratelimit import Reservation
+from llm_gateway.core.structured import (
+    JSONStreamChecker,
+    StructuredOutputValidator,
+    compile_schema,
+)
+from llm_gateway.core.tokens import CHARS_PER_TOKEN, estimate_request_tokens
+from llm_gateway.core.usage import UsageAggregator
+from llm_gateway.schemas.chat import (
+    ChatChunkChoice,
+    ChatCompletionChunk,
+    ChatDelta,
+)
+
+NPC_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "minLength": 1},
+        "level": {"type": "integer", "minimum": 1},
+        "mood": {"enum": ["calm", "angry"]},
+        "inventory": {"type": "array", "items": {"$ref": "#/$defs/item"}},
+    },
+    "required": ["name", "level"],
+    "additionalProperties": False,
+    "$defs": {
+        "item": {
+            "type": "object",
+            "properties": {"name": {"type": "string"}, "count": {"type": "integer"}},
+            "required": ["name"],
+        }
+    },
+}
+
+NPC_ID = compile_schema(NPC_SCHEMA, "npc").id
+VALID = '{"name": "Brom", "level": 3, "inventory": [{"name": "axe", "count": 1}]}'
+
+
+@pytest.fixture
+def make_request(make_request):
+    return partial(
+        make_request,
+        "Describe the blacksmith.",
+        response_format={
+            "type": "json_schema",
+            "json_schema": {"name": "npc", "schema": NPC_SCHEMA},
+        },
+    )
+
+
+def make_chunks(*parts: str) -> list[ChatCompletionChunk]:
+    return [
+        ChatCompletionChunk(
+            id="test-id",
+            created=1234567890,
+            model="gemini-2.0-flash",
+            choices=[ChatChunkChoice(index=0, delta=ChatDelta(content=part))],
+        )
+        for part in parts
+    ]
+
+
+def test_compiled_schema_reports_violations_with_paths():
+    compiled = compile_schema(NPC_SCHEMA)
+
+    assert compiled.validate(json.loads(VALID)) == []
+    errors = compiled.validate(
+        {
+            "name": "",
+            "level": 2.5,
+            "mood": "sleepy",
+            "inventory": [{"count": "two"}],
+            "secret": True,
+        }
+    )
+    assert "$.name: shorter than 1 characters" in errors
+    assert "$.level: expected integer, got number" in errors
+    assert any(error.startswith("$.mood:") for error in errors)
+    assert "$.inventory[0]: missing required property 'name'" in errors
+    assert len(errors) == 5  # 오류 수는 제한된다
+
+
+def test_any_of_and_nullable():
+    compiled = compile_schema(
+        {"anyOf": [{"type": "string"}, {"type": "integer", "nullable": True}]}
+    )
+    assert compiled.validate("x") == []
+    assert compiled.validate(None) == []
+    assert compiled.validate([]) == ["$: does not match any allowed schema"]
+
+
+@pytest.mark.parametrize(
+    "defs",
+    [
+        {"a": {"$ref": "#/$defs/a"}},
+        {
+            "a": {"allOf": [{"$ref": "#/$defs/b"}]},
+            "b": {"anyOf": [{"$ref": "#/$defs/a"}]},
+        },
+        # 값 안으로 내려가는 경로가 먼저 컴파일돼도 같은 값의 순환은 잡는다
+        {
+            "a": {
+                "properties": {"x": {"$ref": "#/$defs/b"}},
+                "allOf": [{"$ref": "#/$defs/b"}],
+            },
+            "b": {"allOf": [{"$ref": "#/$defs/a"}]},
+        },
+    ],
+)
+def test_circular_refs_are_rejected(defs):
+    with pytest.raises(ValueError, match="circular \\$ref"):
+        compile_schema({"$defs": defs, "$ref": "#/$defs/a"})
+
+
+def test_recursive_schema_through_properties_is_allowed():
+    compiled = compile_schema(
+        {
+            "$defs": {
+                "node": {
+                    "type": "object",
+                    "properties": {
+                        "level": {"type": "integer"},
+                        "child": {"$ref": "#/$defs/node"},
+                    },
+                }
+            },
+            "$ref": "#/$defs/node",
+        }
+    )
+
+    assert compiled.validate({"child": {"child": {"level": 2}}}) == []
+    assert compiled.validate({"child": {"child": {"level": "x"}}}) == [
+        "$.child.child.level: expected integer, got string"
+    ]
+    checker = JSONStreamChecker(compiled)
+    assert checker.feed('{"child": {"level": "x"') == (
+        "$.child.level: expected number, got string"
+    )
+
+
+@pytest.mark.parametrize(
+    "text, error",
+    [
+        ('Sure! {"name": "Brom"}', "$: expected a JSON value, got 'S'"),
+        ('{"name": 7', "$.name: expected string, got number"),
+        ('{"name": "Brom", "secret"', "$.secret: unexpected property"),
+        ('{"inventory": [{"name": "axe"}, 3', "$.inventory[1]: expected object"),
+    ],
+)
+def test_stream_checker_fails_on_first_visible_violation(text, error):
+    checker = JSONStreamChecker(compile_schema(NPC_SCHEMA))
+
+    for char in text:
+        if checker.feed(char) is not None:
+            break
+    assert checker.error.startswith(error)
+
+
+def test_stream_checker_accepts_valid_output_in_pieces():
+    checker = JSONStreamChecker(compile_schema(NPC_SCHEMA))
+
+    for start in range(0, len(VALID), 7):
+        assert checker.feed(VALID[start : start + 7]) is None
+    assert checker.finish() == []
+
+    # 구조는 맞지만 필수 필드가 없으면 끝에서 잡는다
+    checker = JSONStreamChecker(compile_schema(NPC_SCHEMA))
+    assert checker.feed('{"name": "Brom"}') is None
+    assert checker.finish() == ["$: missing required property 'level'"]
+
+
+def test_validator_caches_compiled_schema_and_repairs_fenced_json(make_request):
+    validator = StructuredOutputValidator()
+    compiled = validator.compiled_for(make_request())
+    assert validator.compiled_for(make_request()) is compiled
+    assert validator.compiled_for(make_request(response_format=None)) is None
+
+    content, errors = validator.check(compiled, f"```json\n{VALID}\n```")
+    assert errors == []
+    assert content == VALID
+
+    stats = validator.stats()
+    assert stats["compiles"] == 1
+    assert stats["compile_hits"] == 1
+    assert stats["schemas"][NPC_ID]["repaired"] == 1
+
+
+def test_schema_stats_are_per_schema_and_bounded(make_request):
+    validator = StructuredOutputValidator(max_schemas=2)
+
+    for level in range(3):
+        schema = {"type": "object", "properties": {"level": {"minimum": level}}}
+        validator.compiled_for(
+            make_request(
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {"name": "npc", "schema": schema},
+                }
+            )
+        )
+
+    # 같은 이름이어도 스키마가 다르면 따로 세고, 오래된 통계부터 버린다
+    schemas = validator.stats()["schemas"]
+    assert len(schemas) == 2
+    assert all(schema_id.startswith("npc:") for schema_id in schemas)
+
+
+@pytest.mark.asyncio
+async def test_engine_retries_invalid_output_with_errors(make_request, make_response):
+    router = MagicMock()
+    router.resolve = lambda request: request
+    router.route_chat = AsyncMock(
+        side_effect=[make_response('{"name": "Brom"}'), make_response(VALID)]
+    )
+    validator = StructuredOutputValidator(max_retries=1)
+    engine = LLMEngine(router, structured=validator)
+
+    response = await engine.chat(make_request())
+
+    assert response.choices[0].message.content == VALID
+    retry = router.route_chat.await_args_list[1].args[0]
+    assert retry.messages[1].content == '{"name": "Brom"}'
+    assert "missing required property 'level'" in retry.messages[2].content
+    stats = validator.stats()["schemas"][NPC_ID]
+    assert stats["retries"] == 1
+    assert stats["retry_rate"] == 1.0
+
+    router.route_chat = AsyncMock(return_value=make_response("not json"))
+    with pytest.raises(StructuredOutputError):
+        await engine.chat(make_request())
+    assert router.route_chat.await_count == 2
+    assert validator.stats()["schemas"][NPC_ID]["exhausted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_engine_aborts_bad_stream_and_retries_before_output(make_request):
+    streams = [
+        make_chunks("Sure! Here", " is the NPC"),
+        make_chunks('{"name": "Brom", ', '"level": 3}'),
+    ]
+    closed = []
+
+    async def route_chat_stream(request):
+        chunks = streams.pop(0)
+        try:
+            for chunk in chunks:
+                yield chunk
+        finally:
+            closed.append(request)
+
+    router = MagicMock()
+    router.resolve = lambda request: request
+    router.route_chat_stream = route_chat_stream
+    validator = StructuredOutputValidator(max_retries=1)
+    rate_limiter = MagicMock()
+    rate_limiter.acquire = AsyncMock(return_value=Reservation(estimated_tokens=10))
+    usage = UsageAggregator()
+    engine = LLMEngine(
+        router, structured=validator, rate_limiter=rate_limiter, usage=usage
+    )
+    request = make_request(stream=True)
+
+    chunks = [chunk async for chunk in engine.chat_stream(request)]
+
+    assert "".join(c.choices[0].delta.content for c in chunks) == (
+        '{"name": "Brom", "level": 3}'
+    )
+    # 첫 스트림은 첫 chunk에서 끊겼다
+    assert len(closed) == 2
+    stats = validator.stats()["schemas"][NPC_ID]
+    assert stats["stream_aborts"] == 1
+    assert stats["retries"] == 1
+
+    # 끊긴 시도도 prompt + 받은 출력만큼 추정해 청구한다
+    rejected = estimate_request_tokens(request) + len("Sure! Here") // CHARS_PER_TOKEN
+    accepted = 10 + len('{"name": "Brom", "level": 3}') // CHARS_PER_TOKEN
+    rate_limiter.reconcile.assert_called_once_with(
+        rate_limiter.acquire.return_value, accepted + rejected
+    )
+    totals = usage.report()["callers"]["anonymous"]["models"]["gemini-2.0-flash"]
+    assert totals["prompt_tokens"] == estimate_request_tokens(request)
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [
+        {"type": "string", "pattern": "("},
+        {"$ref": "#/$defs/missing"},
+        {"type": "object", "properties": ["name"]},
+        {"type": "string", "minLength": "3"},
+    ],
+)
+@pytest.mark.asyncio
+async def test_malformed_schema_is_rejected_before_admission(schema, make_request):
+    router = MagicMock()
+    router.resolve = lambda request: request
+    router.route_chat = AsyncMock()
+    rate_limiter = MagicMock()
+    rate_limiter.acquire = AsyncMock()
+    engine = LLMEngine(
+        router, structured=StructuredOutputValidator(), rate_limiter=rate_limiter
+    )
+    response_format = {"type": "json_schema", "json_schema": {"schema": schema}}
+
+    with pytest.raises(ValueError):
+        await engine.chat(make_request(response_format=response_format))
+    with pytest.raises(ValueError):
+        await anext(
+            engine.chat_stream(
+                make_request(response_format=response_format, stream=True)
+            )
+        )
+    # 토큰을 예약하거나 upstream을 호출하기 전에 거절한다
+    rate_limiter.acquire.assert_not_awaited()
+    router.route_chat.assert_not_awaited()
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+import respx
+
+from llm_gateway.core.tracing import (
+    BatchExporter,
+    LangSmithSink,
+    Tracer,
+    add_span,
+    current_trace,
+    span,
+)
+
+COLLECTOR = "http://collector.test"
+
+
+def record_request(tracer: Tracer, **attributes):
+    trace = tracer.begin("POST /api/v1/chat/completions")
+    with span("validate"):
+        pass
+    with span("route", model="fake-model"):
+        add_span("upstream", time.perf_counter(), provider="fake")
+    tracer.end(trace, **attributes)
+    return trace
+
+
+def test_spans_nest_and_render_server_timing():
+    trace = record_request(Tracer())
+
+    assert current_trace() is None
+    validate, upstream, route = trace.spans
+    assert validate.parent is trace.root
+    assert upstream.parent is route
+    header = trace.server_timing()
+    assert header.startswith("validate;dur=")
+    assert "route;dur=" in header and "upstream;dur=" in header
+    assert header.split(", ")[-1].startswith("total;dur=")
+
+    # trace가 없으면 span은 아무것도 기록하지 않는다
+    with span("validate") as current:
+        assert current is None
+
+
+@pytest.mark.asyncio
+async def test_exporter_batches_and_drops_without_blocking():
+    batches = []
+    release = asyncio.Event()
+
+    async def sink(traces):
+        await release.wait()
+        batches.append(len(traces))
+
+    exporter = BatchExporter(sink, max_queue=3, batch_size=2, flush_seconds=0.01)
+    tracer = Tracer(exporter, sample_rate=1.0)
+
+    for _ in range(3):
+        record_request(tracer)
+    await asyncio.sleep(0.05)
+    # 첫 batch(2개)는 멈춘 sink에 들어가 있고, 큐에는 3개까지만 쌓인다
+    for _ in range(5):
+        record_request(tracer)
+
+    stats = exporter.stats()
+    assert stats["queued"] == 3
+    assert stats["dropped"] == 3
+
+    release.set()
+    await exporter.aclose()
+    assert sum(batches) == 5
+    assert max(batches) == 2
+    assert exporter.stats()["exported"] == 5
+
+
+@pytest.mark.asyncio
+async def test_tracer_exports_sampled_and_slow_requests_only():
+    submitted = []
+    exporter = BatchExporter(lambda traces: asyncio.sleep(0))
+    exporter.submit = submitted.append
+    tracer = Tracer(exporter, sample_rate=0.5, slow_seconds=0.0, random_fn=lambda: 0.9)
+
+    record_request(tracer)
+    assert len(submitted) == 1
+    assert tracer.stats()["slow"] == 1
+
+    tracer.slow_seconds = None
+    record_request(tracer)
+    assert len(submitted) == 1
+
+
+@pytest.mark.asyncio
+async def test_langsmith_sink_posts_run_tree():
+    sink = LangSmithSink(COLLECTOR, api_key="ls-key", project="gateway-test")
+    trace = record_request(Tracer(), status=200)
+
+    with respx.mock:
+        route = respx.post(f"{COLLECTOR}/runs/batch").mock(
+            return_value=httpx.Response(202)
+        )
+        await sink([trace])
+    await sink.aclose()
+
+    request = route.calls.last.request
+    assert request.headers["x-api-key"] == "ls-key"
+    runs = {run["name"]: run for run in json.loads(request.content)["post"]}
+    root = runs["POST /api/v1/chat/completions"]
+    assert root["parent_run_id"] is None
+    assert root["extra"]["metadata"] == {"status": 200}
+    assert runs["upstream"]["run_type"] == "llm"
+    assert runs["upstream"]["parent_run_id"] == runs["route"]["id"]
+    # dotted_order는 root부터 이어진 경로다
+    assert runs["upstream"]["dotted_order"].startswith(runs["route"]["dotted_order"])
+    assert runs["route"]["dotted_order"].startswith(root["dotted_order"] + ".")
+    assert {run["trace_id"] for run in runs.values()} == {root["id"]}
+    assert {run["session_name"] for run in runs.values()} == {"gateway-test"}
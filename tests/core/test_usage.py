@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from llm_gateway.core.config import ModelPrice
+from llm_gateway.core.usage import UsageAggregator
+from llm_gateway.schemas.chat import ChatUsage, PromptTokensDetails
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_usage(prompt: int, completion: int, cached: int = 0) -> ChatUsage:
+    return ChatUsage(
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        total_tokens=prompt + completion,
+        prompt_tokens_details=PromptTokensDetails(cached_tokens=cached),
+    )
+
+
+def test_report_aggregates_per_caller_and_model():
+    clock = FakeClock()
+    usage = UsageAggregator(
+        prices={
+            "gemini-2.0-flash": ModelPrice(input=1.0, output=4.0, cached_input=0.25),
+        },
+        clock=clock,
+    )
+
+    usage.record_request("npc-ai", "gemini-2.0-flash", 0.5)
+    usage.record_tokens("npc-ai", "gemini-2.0-flash", make_usage(1_000, 200, 800))
+    usage.record_request("npc-ai", "gemini-2.0-flash", 0.1, cache_hit=True)
+    usage.record_request("gm", "gemini-2.0-flash", 1.0, failed=True)
+    clock.now = 60
+
+    report = usage.report()
+    npc = report["callers"]["npc-ai"]["models"]["gemini-2.0-flash"]
+
+    assert npc["requests"] == 2
+    assert npc["cache_hits"] == 1
+    assert npc["prompt_tokens"] == 1_000
+    assert npc["avg_latency_seconds"] == 0.3
+    assert npc["requests_per_minute"] == 2
+    # (200 * 1.0 + 800 * 0.25 + 200 * 4.0) / 1M
+    assert npc["cost_usd"] == pytest.approx(0.0012)
+    assert report["callers"]["gm"]["models"]["gemini-2.0-flash"]["errors"] == 1
+
+    assert list(usage.report(client="gm")["callers"]) == ["gm"]
+
+
+@pytest.mark.asyncio
+async def test_flush_hands_window_to_sink_without_blocking():
+    clock = FakeClock()
+    records = []
+    usage = UsageAggregator(flush_seconds=10, sink=records.append, clock=clock)
+
+    usage.record_request("gm", "gemini-2.0-flash", 0.2)
+    assert records == []
+
+    clock.now = 10
+    usage.record_request("gm", "gemini-2.0-flash", 0.2)
+    await asyncio.sleep(0.05)
+
+    assert len(records) == 1
+    assert records[0]["usage"][0]["requests"] == 2
+    assert records[0]["usage"][0]["cost_usd"] is None
+
+    # flush 이후에는 새 window가 시작되지만 누적값은 유지된다
+    await usage.flush()
+    assert len(records) == 1
+    assert (
+        usage.report()["callers"]["gm"]["models"]["gemini-2.0-flash"]["requests"] == 2
+    )
+
+
+@pytest.mark.asyncio
+async def test_periodic_flush_and_close_flush_without_requests():
+    records = []
+    usage = UsageAggregator(flush_seconds=0.01, sink=records.append)
+    usage.start()
+
+    usage.record_request("gm", "gemini-2.0-flash", 0.2)
+    await asyncio.sleep(0.05)
+    # 다음 요청이 없어도 window가 내보내진다
+    assert len(records) == 1
+
+    usage.record_request("gm", "gemini-2.0-flash", 0.2)
+    await usage.aclose()
+    assert len(records) == 2
+
+
+def test_client_ids_beyond_the_cap_are_grouped():
+    usage = UsageAggregator(max_clients=2)
+
+    for client in ("gm", "npc", "spam-1", "spam-2"):
+        usage.record_request(client, "gemini-2.0-flash", 0.1)
+    usage.record_request("gm", "gemini-2.0-flash", 0.1)
+
+    callers = usage.report()["callers"]
+    assert set(callers) == {"gm", "npc", "other"}
+    assert callers["other"]["models"]["gemini-2.0-flash"]["requests"] == 2
+    assert callers["gm"]["models"]["gemini-2.0-flash"]["requests"] == 2
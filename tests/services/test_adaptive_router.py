@@ -0,0 +1,189 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from llm_gateway.core.compaction import HistoryCompactor
+from llm_gateway.core.config import CompactionPolicy
+from llm_gateway.core.engine import LLMEngine
+from llm_gateway.core.exceptions import UpstreamError
+from llm_gateway.core.ratelimit import Reservation
+from llm_gateway.extensions.routers import AdaptiveRouter
+from llm_gateway.schemas.chat import (
+    ChatChunkChoice,
+    ChatCompletionChunk,
+    ChatDelta,
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+    ChatResponseChoice,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_router(latencies: dict[str, float], failing: set[str] = frozenset()):
+    clock = FakeClock()
+
+    async def chat_complete(request):
+        if request.model in failing:
+            raise UpstreamError("upstream error", retryable=True)
+        if request.temperature == 9.0:
+            raise UpstreamError("bad request", status_code=400)
+        clock.now += latencies[request.model]
+        return ChatResponse(
+            id="test-id",
+            created=1234567890,
+            model=request.model,
+            choices=[
+                ChatResponseChoice(
+                    index=0,
+                    message=ChatMessage(role="assistant", content="..."),
+                    finish_reason="stop",
+                )
+            ],
+        )
+
+    async def chat_stream(request):
+        yield chunk_of(await chat_complete(request))
+
+    provider = MagicMock()
+    provider.chat_complete = AsyncMock(side_effect=chat_complete)
+    provider.chat_stream = chat_stream
+    router = AdaptiveRouter(
+        {"google": provider},
+        aliases={"creative": ["gemini-slow", "gemini-fast"]},
+        alpha=0.5,
+        max_error_rate=0.4,
+        health_half_life=10.0,
+        clock=clock,
+    )
+    return router, clock
+
+
+def chunk_of(response: ChatResponse) -> ChatCompletionChunk:
+    return ChatCompletionChunk(
+        id=response.id,
+        created=response.created,
+        model=response.model,
+        choices=[ChatChunkChoice(index=0, delta=ChatDelta(content="..."))],
+    )
+
+
+def request_for(model: str) -> ChatRequest:
+    return ChatRequest(model=model, messages=[ChatMessage(role="user", content="Hi")])
+
+
+@pytest.mark.asyncio
+async def test_alias_routes_to_fastest_candidate():
+    router, _ = make_router({"gemini-slow": 2.0, "gemini-fast": 0.5})
+
+    # 처음에는 각 후보를 한 번씩 측정한다
+    first = await router.route_chat(request_for("creative"))
+    second = await router.route_chat(request_for("creative"))
+    assert [first.model, second.model] == ["gemini-slow", "gemini-fast"]
+
+    third = await router.route_chat(request_for("creative"))
+    assert third.model == "gemini-fast"
+
+    stats = router.stats()
+    assert [d["reason"] for d in stats["recent_decisions"]] == [
+        "explore",
+        "explore",
+        "fastest",
+    ]
+    assert stats["models"]["gemini-fast"]["latency_ewma"] == 0.5
+
+    # 별칭이 아닌 모델명은 그대로 전달된다
+    direct = await router.route_chat(request_for("gemini-slow"))
+    assert direct.model == "gemini-slow"
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_candidate_is_avoided_until_it_recovers():
+    router, clock = make_router(
+        {"gemini-slow": 2.0, "gemini-fast": 0.5}, failing={"gemini-fast"}
+    )
+    await router.route_chat(request_for("creative"))
+    with pytest.raises(UpstreamError):
+        await router.route_chat(request_for("creative"))
+
+    assert router.error_rate("gemini-fast") == 0.5
+    assert router.select_model("creative") == "gemini-slow"
+
+    clock.now += 20.0  # 반감기 두 번 → 에러율 0.125
+    assert router.select_model("creative") == "gemini-fast"
+
+
+@pytest.mark.asyncio
+async def test_caller_errors_do_not_count_against_the_model():
+    router, _ = make_router({"gemini-slow": 2.0, "gemini-fast": 0.5})
+    request = request_for("gemini-fast").model_copy(update={"temperature": 9.0})
+
+    with pytest.raises(UpstreamError):
+        await router.route_chat(request)
+
+    assert router.error_rate("gemini-fast") == 0.0
+
+
+def test_concurrent_exploration_is_spread_across_candidates():
+    router, clock = make_router({"gemini-slow": 2.0, "gemini-fast": 0.5})
+
+    # 측정값이 오기 전의 동시 요청은 한 후보에 몰리지 않는다
+    selected = [router.select_model("creative") for _ in range(4)]
+    assert selected == ["gemini-slow", "gemini-fast", "gemini-slow", "gemini-fast"]
+
+    # 한 후보가 측정되면 나머지 측정 중인 후보 대신 그쪽으로 보낸다
+    router._record("gemini-slow", 2.0, failed=False)
+    assert router.select_model("creative") == "gemini-slow"
+    clock.now += router.probe_interval
+    assert router.select_model("creative") == "gemini-fast"
+
+
+@pytest.mark.asyncio
+async def test_stream_outcomes_are_recorded():
+    router, _ = make_router({"gemini-slow": 2.0, "gemini-fast": 0.5})
+
+    chunks = [c async for c in router.route_chat_stream(request_for("creative"))]
+
+    assert chunks[0].model == "gemini-slow"
+    assert router.stats()["models"]["gemini-slow"]["requests"] == 1
+    assert router.stats()["models"]["gemini-slow"]["latency_ewma"] == 2.0
+
+
+@pytest.mark.asyncio
+async def test_engine_resolves_alias_before_admission():
+    router, _ = make_router({"gemini-slow": 2.0, "gemini-fast": 0.5})
+    rate_limiter = MagicMock()
+    rate_limiter.acquire = AsyncMock(return_value=Reservation(estimated_tokens=10))
+    engine = LLMEngine(router, rate_limiter=rate_limiter)
+
+    response = await engine.chat(request_for("creative"))
+
+    # 속도 제한과 스케줄러는 별칭이 아닌 실제 모델 기준으로 적용된다
+    assert rate_limiter.acquire.await_args.args[0] == response.model == "gemini-slow"
+    assert len(router.decisions) == 1
+
+
+@pytest.mark.asyncio
+async def test_engine_compacts_by_the_requested_alias():
+    router, _ = make_router({"gemini-slow": 2.0, "gemini-fast": 0.5})
+    compactor = HistoryCompactor({"creative": CompactionPolicy(max_input_tokens=50)})
+    engine = LLMEngine(router, compactor=compactor)
+    messages = [
+        ChatMessage(role="user" if i % 2 == 0 else "assistant", content="x" * 100)
+        for i in range(11)
+    ]
+
+    await engine.chat(ChatRequest(model="creative", messages=messages))
+
+    # 별칭에 걸린 정책이 실제 모델로 resolve 되기 전에 적용된다
+    sent = router.providers["google"].chat_complete.await_args.args[0]
+    assert sent.model == "gemini-slow"
+    assert len(sent.messages) < len(messages)
+    assert compactor.stats()["compacted"] == 1
@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+import pytest
+
+from llm_gateway.core.exceptions import UpstreamError
+from llm_gateway.extensions.providers import FakeProvider
+from llm_gateway.main import build_engine
+from llm_gateway.schemas.chat import ChatMessage, ChatRequest
+
+REQUEST = ChatRequest(
+    model="fake-model", messages=[ChatMessage(role="user", content="Hi")]
+)
+
+
+def test_latency_distributions():
+    assert FakeProvider(latency=0.2, distribution="constant").sample_latency() == 0.2
+
+    uniform = FakeProvider(latency=1.0, distribution="uniform", spread=0.5, seed=1)
+    assert all(0.5 <= uniform.sample_latency() <= 1.5 for _ in range(100))
+
+    lognormal = FakeProvider(latency=1.0, spread=0.5, seed=1)
+    samples = sorted(lognormal.sample_latency() for _ in range(1001))
+    assert samples[500] == pytest.approx(1.0, rel=0.1)
+    assert samples[-1] > 2.0
+
+
+@pytest.mark.parametrize("distribution", ["constant", "uniform", "lognormal"])
+def test_zero_latency_is_not_sampled(distribution):
+    assert FakeProvider(latency=0, distribution=distribution).sample_latency() == 0
+
+
+@pytest.mark.asyncio
+async def test_chat_complete_reports_usage():
+    provider = FakeProvider(latency=0.001, completion_tokens=7)
+
+    response = await provider.chat_complete(REQUEST)
+
+    assert response.model == "fake-model"
+    assert response.usage.completion_tokens == 7
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_retryable():
+    provider = FakeProvider(latency=0.001, error_rate=1.0)
+
+    with pytest.raises(UpstreamError) as exc_info:
+        await provider.chat_complete(REQUEST)
+    assert exc_info.value.retryable
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_emits_tokens_in_chunks():
+    provider = FakeProvider(
+        latency=0.001,
+        completion_tokens=12,
+        chunk_tokens=5,
+        tokens_per_second=10_000,
+    )
+
+    chunks = [chunk async for chunk in provider.chat_stream(REQUEST)]
+
+    assert [c.choices[0].delta.content.count("lorem") for c in chunks[:-1]] == [
+        5,
+        5,
+        2,
+    ]
+    assert chunks[0].choices[0].delta.role == "assistant"
+    assert chunks[-1].choices[0].finish_reason == "stop"
+    assert chunks[-1].usage.completion_tokens == 12
+
+
+def test_fake_models_are_routed_through_model_routes():
+    with patch("llm_gateway.main.settings.FAKE_PROVIDER_ENABLED", True):
+        engine = build_engine()
+
+    assert engine.router.model_routes["fake"] == "fake"
+    assert engine.router._select_provider("fake-model") is engine.providers["fake"]
@@ -2,6 +2,7 @@ import json
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from google.genai import types
 
 from llm_gateway.extensions.providers import GeminiProvider
 from llm_gateway.schemas.chat import ChatMessage, ChatRequest
@@ -119,3 +120,161 @@ async def test_gemini_chat_complete_tool_call(mock_genai_client):
 
     _, kwargs = mock_client_instance.aio.chats.create.call_args
     assert kwargs["config"].tools is not None
+
+
+@pytest.mark.asyncio
+async def test_gemini_chat_stream(mock_genai_client):
+    mock_client_instance = MagicMock()
+    mock_chat_session = MagicMock()
+
+    mock_genai_client.return_value = mock_client_instance
+    mock_client_instance.aio.chats.create.return_value = mock_chat_session
+
+    def make_chunk(text=None, function_call=None):
+        part = MagicMock()
+        part.text = text
+        part.function_call = function_call
+        return MagicMock(candidates=[MagicMock(content=MagicMock(parts=[part]))])
+
+    function_call = MagicMock()
+    function_call.name = "roll_dice"
+    function_call.args = {"sides": 20}
+
+    async def fake_stream():
+        for chunk in [
+            make_chunk(text="The goblin "),
+            make_chunk(text="attacks!"),
+            make_chunk(function_call=function_call),
+        ]:
+            yield chunk
+
+    mock_chat_session.send_message_stream = AsyncMock(return_value=fake_stream())
+
+    provider = GeminiProvider()
+
+    request = ChatRequest(
+        model="gemini-2.0-flash",
+        messages=[ChatMessage(role="user", content="Narrate")],
+        stream=True,
+    )
+
+    chunks = [chunk async for chunk in provider.chat_stream(request)]
+
+    assert chunks[0].choices[0].delta.role == "assistant"
+    assert chunks[0].choices[0].delta.content == "The goblin "
+    assert chunks[1].choices[0].delta.content == "attacks!"
+    tool_call = chunks[2].choices[0].delta.tool_calls[0]
+    assert tool_call["index"] == 0
+    assert json.loads(tool_call["function"]["arguments"]) == {"sides": 20}
+    assert chunks[-1].choices[0].finish_reason == "tool_calls"
+    mock_chat_session.send_message_stream.assert_awaited_once_with(message="Narrate")
+
+
+def test_gemini_conversion_is_memoized(mock_genai_client):
+    provider = GeminiProvider()
+
+    messages = [ChatMessage(role="system", content="You are the GM.")]
+    for turn in range(10):
+        messages.append(ChatMessage(role="user", content=f"Turn {turn}"))
+        messages.append(
+            ChatMessage(
+                role="assistant",
+                tool_calls=[
+                    {
+                        "id": "roll",
+                        "type": "function",
+                        "function": {"name": "roll", "arguments": '{"sides": 20}'},
+                    }
+                ],
+            )
+        )
+
+    first, system_instruction = provider._convert_messages(messages)
+    assert system_instruction == "You are the GM."
+    assert first[1].parts[0].function_call.args == {"sides": 20}
+
+    # 이전 history를 prefix로 갖는 요청은 새 메시지만 변환한다
+    messages.append(ChatMessage(role="user", content="Turn 10"))
+    second, _ = provider._convert_messages(messages)
+
+    assert second[:-1] == first
+    assert all(a is b for a, b in zip(first, second, strict=False))
+    stats = provider.conversion_cache_stats()["messages"]
+    assert stats["misses"] == 12  # 고유 메시지 11개 + 새 메시지 1개
+    assert stats["hits"] == 9 + 20
+
+
+@pytest.mark.asyncio
+async def test_gemini_chat_complete_usage(mock_genai_client):
+    mock_client_instance = MagicMock()
+    mock_chat_session = MagicMock()
+    mock_response = MagicMock()
+
+    mock_genai_client.return_value = mock_client_instance
+    mock_client_instance.aio.chats.create.return_value = mock_chat_session
+    mock_chat_session.send_message = AsyncMock(return_value=mock_response)
+
+    mock_part = MagicMock()
+    mock_part.text = "Hello"
+    mock_part.function_call = None
+    mock_response.candidates = [MagicMock(content=MagicMock(parts=[mock_part]))]
+    mock_response.usage_metadata = types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=120,
+        candidates_token_count=8,
+        thoughts_token_count=2,
+        cached_content_token_count=100,
+    )
+
+    provider = GeminiProvider()
+
+    response = await provider.chat_complete(
+        ChatRequest(
+            model="gemini-2.0-flash",
+            messages=[ChatMessage(role="user", content="Hi")],
+        )
+    )
+
+    assert response.usage.prompt_tokens == 120
+    assert response.usage.completion_tokens == 10
+    assert response.usage.total_tokens == 130
+    assert response.usage.prompt_tokens_details.cached_tokens == 100
+
+
+@pytest.mark.asyncio
+async def test_gemini_generates_candidates_natively(mock_genai_client):
+    mock_client_instance = MagicMock()
+    mock_chat_session = MagicMock()
+    mock_response = MagicMock()
+
+    mock_genai_client.return_value = mock_client_instance
+    mock_client_instance.aio.chats.create.return_value = mock_chat_session
+    mock_chat_session.send_message = AsyncMock(return_value=mock_response)
+
+    def make_candidate(index, text):
+        part = MagicMock()
+        part.text = text
+        part.function_call = None
+        return MagicMock(index=index, content=MagicMock(parts=[part]))
+
+    mock_response.candidates = [
+        make_candidate(0, "The goblins ambush you."),
+        make_candidate(1, "Arrows rain from the trees."),
+    ]
+
+    provider = GeminiProvider()
+
+    response = await provider.chat_complete(
+        ChatRequest(
+            model="gemini-2.0-flash",
+            messages=[ChatMessage(role="user", content="Narrate")],
+            n=2,
+        )
+    )
+
+    _, kwargs = mock_client_instance.aio.chats.create.call_args
+    assert kwargs["config"].candidate_count == 2
+    mock_chat_session.send_message.assert_awaited_once()
+    assert [(c.index, c.message.content) for c in response.choices] == [
+        (0, "The goblins ambush you."),
+        (1, "Arrows rain from the trees."),
+    ]
@@ -0,0 +1,156 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from google.genai import errors, types
+
+from llm_gateway.extensions.providers import GeminiProvider
+from llm_gateway.extensions.providers.gemini_cache import GeminiContextCache
+from llm_gateway.schemas.chat import ChatMessage, ChatRequest
+
+LORE = "The kingdom of Eldoria lies beyond the misty mountains. " * 100
+
+
+class FakeCaches:
+    """Local stand-in for `client.aio.caches`."""
+
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.deleted = []
+
+    async def create(self, *, model, config):
+        name = f"cachedContents/{len(self.created)}"
+        self.created.append((model, config))
+        return SimpleNamespace(name=name)
+
+    async def update(self, *, name, config):
+        self.updated.append(name)
+
+    async def delete(self, *, name):
+        self.deleted.append(name)
+
+
+def make_request(turns: int) -> ChatRequest:
+    messages = [ChatMessage(role="system", content=LORE)]
+    for turn in range(turns):
+        messages.append(ChatMessage(role="user", content=f"Action {turn}"))
+        messages.append(ChatMessage(role="assistant", content=f"Outcome {turn}"))
+    messages.append(ChatMessage(role="user", content="What happens next?"))
+    return ChatRequest(model="gemini-2.0-flash", messages=messages)
+
+
+def make_reply(text: str):
+    part = MagicMock()
+    part.text = text
+    part.function_call = None
+    return MagicMock(candidates=[MagicMock(content=MagicMock(parts=[part]))])
+
+
+@pytest.fixture
+def cached_provider(mock_genai_client):
+    mock_client_instance = MagicMock()
+    mock_chat_session = MagicMock()
+    mock_genai_client.return_value = mock_client_instance
+    mock_client_instance.aio.chats.create.return_value = mock_chat_session
+    mock_chat_session.send_message = AsyncMock(return_value=make_reply("..."))
+
+    with (
+        patch(
+            "llm_gateway.extensions.providers.gemini.settings."
+            "GEMINI_CONTEXT_CACHE_ENABLED",
+            True,
+        ),
+        patch(
+            "llm_gateway.extensions.providers.gemini.settings."
+            "GEMINI_CONTEXT_CACHE_MIN_TOKENS",
+            1000,
+        ),
+    ):
+        provider = GeminiProvider()
+    provider.context_cache.caches = FakeCaches()
+    return provider, mock_client_instance, mock_chat_session
+
+
+@pytest.mark.asyncio
+async def test_context_cache_created_then_referenced(cached_provider):
+    provider, client, _ = cached_provider
+
+    await provider.chat_complete(make_request(turns=1))
+    _, kwargs = client.aio.chats.create.call_args
+    assert kwargs["config"].cached_content is None
+    assert kwargs["config"].system_instruction == LORE
+
+    # 백그라운드 생성 완료 대기
+    await asyncio.sleep(0)
+    assert len(provider.context_cache.caches.created) == 1
+
+    await provider.chat_complete(make_request(turns=2))
+    _, kwargs = client.aio.chats.create.call_args
+    assert kwargs["config"].cached_content == "cachedContents/0"
+    assert kwargs["config"].system_instruction is None
+    # 캐시된 두 턴 이후의 history만 보낸다
+    assert [c.parts[0].text for c in kwargs["history"]] == ["Action 1", "Outcome 1"]
+
+    stats = provider.context_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_context_cache_falls_back_when_expired_upstream(cached_provider):
+    provider, client, chat_session = cached_provider
+
+    await provider.chat_complete(make_request(turns=1))
+    await asyncio.sleep(0)
+
+    not_found = errors.ClientError(
+        404, {"error": {"message": "CachedContent not found", "status": "NOT_FOUND"}}
+    )
+    chat_session.send_message = AsyncMock(side_effect=[not_found, make_reply("ok")])
+
+    response = await provider.chat_complete(make_request(turns=2))
+
+    assert response.choices[0].message.content == "ok"
+    _, kwargs = client.aio.chats.create.call_args
+    assert kwargs["config"].cached_content is None
+    assert kwargs["config"].system_instruction == LORE
+    assert provider.context_cache.stats()["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_context_cache_ttl_refresh_and_expiry():
+    now = [0.0]
+    caches = FakeCaches()
+    cache = GeminiContextCache(
+        caches,
+        min_tokens=100,
+        ttl_seconds=600,
+        refresh_margin_seconds=60,
+        clock=lambda: now[0],
+    )
+    request = make_request(turns=1)
+    messages = request.messages[1:-1]
+    history = [
+        types.Content(role="user", parts=[types.Part(text=msg.content)])
+        for msg in messages
+    ]
+
+    def lookup():
+        return cache.lookup(
+            "gemini-2.0-flash", LORE, None, None, messages, history, None, None
+        )
+
+    assert lookup() == (None, 0)
+    await asyncio.sleep(0)
+
+    now[0] = 550.0  # 만료 60초 이내 → 백그라운드 TTL 갱신
+    assert lookup() == ("cachedContents/0", 2)
+    await asyncio.sleep(0)
+    assert caches.updated == ["cachedContents/0"]
+
+    now[0] = 2000.0  # 로컬 만료 → 참조하지 않고 다시 생성
+    assert lookup() == (None, 0)
+    await asyncio.sleep(0)
+    assert len(caches.created) == 2
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from llm_gateway.core.engine import LLMEngine
+from llm_gateway.core.interfaces import BaseLLMProvider
+from llm_gateway.core.scheduler import AdmissionScheduler
+from llm_gateway.core.tokens import estimate_request_tokens
+from llm_gateway.core.usage import UsageAggregator
+from llm_gateway.extensions.routers import HedgingPolicy, SimpleRouter
+from llm_gateway.schemas.chat import (
+    ChatMessage,
+    ChatRequest,
+    ChatUsage,
+)
+
+
+def make_policy(**kwargs) -> HedgingPolicy:
+    policy = HedgingPolicy(min_samples=5, **kwargs)
+    for _ in range(5):
+        policy.record("gemini-2.0-flash", 0.01)
+    return policy
+
+
+REQUEST = ChatRequest(
+    model="gemini-2.0-flash", messages=[ChatMessage(role="user", content="Hi")]
+)
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_and_loser_is_cancelled(make_response):
+    policy = make_policy(max_fraction=1.0, alternates={"gemini-2.0-flash": "alt"})
+    attempts = []
+    primary_cancelled = asyncio.Event()
+
+    async def call(request):
+        attempts.append(request.model)
+        if len(attempts) == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+        return make_response(model=request.model)
+
+    response = await policy.run(REQUEST, call)
+    await asyncio.sleep(0)
+
+    assert response.model == "alt"
+    assert attempts == ["gemini-2.0-flash", "alt"]
+    assert primary_cancelled.is_set()
+    assert policy.stats()["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_budget_and_fast_path(make_response):
+    policy = make_policy(max_fraction=0.0)
+    calls = 0
+
+    async def slow_call(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return make_response(model=request.model)
+
+    await policy.run(REQUEST, slow_call)
+    assert calls == 1
+    assert policy.stats()["budget_denied"] == 1
+
+    async def fast_call(request):
+        return make_response(model=request.model)
+
+    await policy.run(REQUEST, fast_call)
+    assert policy.stats()["hedged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_falls_back_when_first_finisher_fails(make_response):
+    policy = make_policy(max_fraction=1.0)
+    attempts = 0
+
+    async def call(request):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            await asyncio.sleep(0.05)
+            return make_response(model="primary")
+        raise RuntimeError("hedge failed")
+
+    response = await policy.run(REQUEST, call)
+
+    assert response.model == "primary"
+    assert policy.stats()["hedge_wins"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_is_admitted_and_the_discarded_call_is_charged(make_response):
+    class SlowThenFast(BaseLLMProvider):
+        calls = 0
+
+        async def chat_complete(self, request):
+            self.calls += 1
+            if self.calls == 1:
+                await asyncio.sleep(10)
+            return make_response(
+                model=request.model,
+                usage=ChatUsage(prompt_tokens=10, completion_tokens=5, total_tokens=15),
+            )
+
+    scheduler = AdmissionScheduler()
+    usage = UsageAggregator()
+    engine = LLMEngine(
+        SimpleRouter({"google": SlowThenFast()}, hedging=make_policy(max_fraction=1.0)),
+        scheduler=scheduler,
+        usage=usage,
+    )
+
+    await engine.chat(REQUEST, client="gm")
+
+    # hedge도 scheduler 슬롯을 받아 보낸다
+    assert scheduler.stats()["admitted"] == 2
+    totals = usage.report()["callers"]["gm"]["models"]["gemini-2.0-flash"]
+    # 취소된 primary의 입력 토큰도 청구된다
+    assert totals["prompt_tokens"] == 10 + estimate_request_tokens(REQUEST)
+    assert totals["completion_tokens"] == 5
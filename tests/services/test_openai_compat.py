@@ -0,0 +1,184 @@
+import json
+from functools import partial
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+import respx
+
+from llm_gateway.core.exceptions import UpstreamError, UpstreamRateLimitError
+from llm_gateway.extensions.providers import OpenAICompatibleProvider
+from llm_gateway.extensions.routers import SimpleRouter
+
+BASE_URL = "http://vllm.test/v1"
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "roll_dice",
+            "parameters": {"type": "object", "properties": {"sides": {}}},
+        },
+    }
+]
+
+
+USAGE = {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}
+
+
+@pytest.fixture
+def make_request(make_request):
+    return partial(make_request, model="local/llama-3.1-8b", system="You are an NPC.")
+
+
+def make_provider() -> OpenAICompatibleProvider:
+    return OpenAICompatibleProvider(BASE_URL, api_key="secret", model_prefix="local/")
+
+
+@pytest.mark.asyncio
+async def test_chat_complete_sends_openai_wire_format(make_request):
+    provider = make_provider()
+    completion = {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 1234567890,
+        "model": "llama-3.1-8b",
+        "system_fingerprint": "fp",
+        "choices": [
+            {
+                "index": 0,
+                "message": {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [
+                        {
+                            "id": "call_1",
+                            "type": "function",
+                            "function": {
+                                "name": "roll_dice",
+                                "arguments": '{"sides": 20}',
+                            },
+                        }
+                    ],
+                },
+                "finish_reason": "tool_calls",
+            }
+        ],
+        "usage": {"prompt_tokens": 12, "completion_tokens": 5, "total_tokens": 17},
+    }
+
+    with respx.mock:
+        route = respx.post(f"{BASE_URL}/chat/completions").mock(
+            return_value=httpx.Response(200, json=completion)
+        )
+        response = await provider.chat_complete(
+            make_request(
+                tools=TOOLS,
+                tool_choice="auto",
+                response_format={"type": "json_object"},
+                priority="high",
+                n=2,
+            )
+        )
+
+    sent = json.loads(route.calls.last.request.content)
+    assert sent["model"] == "llama-3.1-8b"
+    assert sent["n"] == 2
+    assert sent["tools"] == TOOLS
+    assert sent["response_format"] == {"type": "json_object"}
+    assert sent["messages"][0] == {"role": "system", "content": "You are an NPC."}
+    # gateway 확장 필드는 upstream에 보내지 않는다
+    assert "priority" not in sent and "cache" not in sent
+    assert route.calls.last.request.headers["authorization"] == "Bearer secret"
+
+    assert response.model == "local/llama-3.1-8b"
+    assert response.choices[0].message.tool_calls[0]["function"]["name"] == (
+        "roll_dice"
+    )
+    assert response.usage.total_tokens == 17
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_parses_sse_and_usage(make_request):
+    provider = make_provider()
+
+    def event(delta: dict, finish_reason=None, usage=None) -> str:
+        chunk = {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 1234567890,
+            "model": "llama-3.1-8b",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            if usage is None
+            else [],
+            "usage": usage,
+        }
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    body = (
+        ": keep-alive\n\n"
+        + event({"role": "assistant", "content": "Well "})
+        + event({"content": "met."}, finish_reason="stop")
+        + event({}, usage=USAGE)
+        + "data: [DONE]\n\n"
+    )
+
+    with respx.mock:
+        route = respx.post(f"{BASE_URL}/chat/completions").mock(
+            return_value=httpx.Response(
+                200, content=body, headers={"content-type": "text/event-stream"}
+            )
+        )
+        chunks = [chunk async for chunk in provider.chat_stream(make_request())]
+
+    sent = json.loads(route.calls.last.request.content)
+    assert sent["stream"] is True
+    assert "n" not in sent
+    assert sent["stream_options"] == {"include_usage": True}
+
+    assert "".join(c.choices[0].delta.content for c in chunks if c.choices) == (
+        "Well met."
+    )
+    assert chunks[-1].usage.total_tokens == 5
+    assert {chunk.model for chunk in chunks} == {"local/llama-3.1-8b"}
+
+
+@pytest.mark.asyncio
+async def test_upstream_errors_are_mapped(make_request):
+    provider = make_provider()
+
+    with respx.mock:
+        route = respx.post(f"{BASE_URL}/chat/completions")
+
+        route.mock(
+            return_value=httpx.Response(429, json={"error": {"message": "slow"}})
+        )
+        with pytest.raises(UpstreamRateLimitError):
+            await provider.chat_complete(make_request())
+
+        route.mock(return_value=httpx.Response(503, text="loading model"))
+        with pytest.raises(UpstreamError) as excinfo:
+            await provider.chat_complete(make_request())
+        assert excinfo.value.retryable
+
+        route.mock(return_value=httpx.Response(400, json={"error": {"message": "bad"}}))
+        with pytest.raises(UpstreamError) as excinfo:
+            await provider.chat_stream(make_request()).__anext__()
+        assert excinfo.value.status_code == 400
+
+
+def test_router_sends_routed_prefixes_to_provider():
+    openai = MagicMock()
+    router = SimpleRouter(
+        {"google": MagicMock(), "openai": openai},
+        model_routes={"local/": "openai", "gemini-2.0-flash-lite": "openai"},
+    )
+
+    assert router._select_provider("local/llama-3.1-8b") is openai
+    assert router._select_provider("gemini-2.0-flash-lite-001") is openai
+    assert router._provider_name("gemini-2.5-flash") == "google"
+
+    # 등록되지 않은 provider로 가는 route는 무시한다
+    router = SimpleRouter({"google": MagicMock()}, model_routes={"local/": "openai"})
+    with pytest.raises(ValueError):
+        router._select_provider("local/llama-3.1-8b")
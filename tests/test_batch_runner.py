@@ -0,0 +1,130 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from llm_gateway.batch_runner import CLIENT_ID, main, parse_args, run_batch
+from llm_gateway.core.config import RateLimitQuota
+from llm_gateway.schemas.chat import ChatMessage, ChatResponse, ChatResponseChoice
+
+
+def make_engine(fail_ids: set[str]):
+    async def chat(request, client=None):
+        content = request.messages[0].content
+        if content in fail_ids:
+            raise RuntimeError("upstream failed")
+        return ChatResponse(
+            id="test-id",
+            created=1234567890,
+            model=request.model,
+            choices=[
+                ChatResponseChoice(
+                    index=0,
+                    message=ChatMessage(role="assistant", content=content.upper()),
+                    finish_reason="stop",
+                )
+            ],
+        )
+
+    engine = MagicMock()
+    engine.chat = MagicMock(side_effect=chat)
+    return engine
+
+
+def write_input(path, count):
+    with path.open("w") as f:
+        for i in range(count):
+            request = {
+                "id": f"q{i}",
+                "model": "gemini-2.0-flash",
+                "messages": [{"role": "user", "content": f"q{i}"}],
+            }
+            f.write(json.dumps(request) + "\n")
+        f.write("not json\n")
+
+
+def read_output(path):
+    records = []
+    for line in path.read_text().splitlines():
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
+
+
+@pytest.mark.asyncio
+async def test_run_batch_writes_results_and_resumes(tmp_path):
+    input_path = tmp_path / "in.jsonl"
+    output_path = tmp_path / "out.jsonl"
+    write_input(input_path, 10)
+
+    report = await run_batch(
+        make_engine(fail_ids={"q3"}), input_path, output_path, concurrency=4
+    )
+
+    assert report.completed == 9
+    assert report.failed == 2  # q3 + 잘못된 JSON 줄
+    records = read_output(output_path)
+    responses = {r["id"]: r for r in records if "response" in r}
+    assert responses["q5"]["response"]["choices"][0]["message"]["content"] == "Q5"
+    assert report.summary()["latency_p50"] >= 0
+
+    # 크래시로 잘린 줄을 흉내낸 뒤 재실행하면 실패한 id만 다시 처리한다
+    with output_path.open("a") as f:
+        f.write('{"id": "q9", "resp')
+    engine = make_engine(fail_ids=set())
+    report = await run_batch(engine, input_path, output_path, concurrency=4)
+
+    assert report.skipped == 9
+    assert report.completed == 1
+    assert engine.chat.call_count == 1
+    assert any(r["id"] == "q3" and "response" in r for r in read_output(output_path))
+
+
+def test_main_flushes_usage_and_closes_engine(tmp_path, monkeypatch):
+    input_path = tmp_path / "in.jsonl"
+    output_path = tmp_path / "out.jsonl"
+    write_input(input_path, 1)
+    with input_path.open("a") as f:
+        f.write("[1, 2]\n")
+
+    engine = make_engine(fail_ids=set())
+    engine.aclose = AsyncMock()
+    engine.usage = MagicMock(aclose=AsyncMock())
+    monkeypatch.setattr("llm_gateway.batch_runner.build_engine", lambda: engine)
+
+    with pytest.raises(SystemExit):
+        main([str(input_path), str(output_path)])
+
+    errors = {r["id"]: r["error"] for r in read_output(output_path) if "error" in r}
+    assert errors["line-3"] == "Expected a JSON object"
+    engine.usage.start.assert_called_once()
+    engine.usage.aclose.assert_awaited_once()
+    engine.aclose.assert_awaited_once()
+
+
+def test_concurrency_below_one_is_rejected():
+    with pytest.raises(SystemExit):
+        parse_args(["in.jsonl", "out.jsonl", "--concurrency", "0"])
+
+
+def test_cli_quota_is_added_to_configured_rate_limits(tmp_path, monkeypatch):
+    input_path = tmp_path / "in.jsonl"
+    write_input(input_path, 1)
+
+    engine = make_engine(fail_ids=set())
+    engine.aclose = AsyncMock()
+    engine.usage = None
+    engine.state = None
+    monkeypatch.setattr("llm_gateway.batch_runner.build_engine", lambda: engine)
+    quota = RateLimitQuota(rpm=2000)
+    monkeypatch.setattr(
+        "llm_gateway.batch_runner.settings.RATE_LIMITS", {"gemini": quota}
+    )
+
+    with pytest.raises(SystemExit):
+        main([str(input_path), str(tmp_path / "out.jsonl"), "--rpm", "60"])
+
+    assert engine.rate_limiter.model_quotas == {"gemini": quota}
+    assert engine.rate_limiter.client_quotas[CLIENT_ID] == RateLimitQuota(rpm=60)
@@ -1,3 +1,11 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from llm_gateway.api.lifecycle import RequestTracker
+
+
 def test_health_check(client_instance):
     response = client_instance.get("/health")
     assert response.status_code == 200
@@ -8,3 +16,37 @@ def test_root(client_instance):
     response = client_instance.get("/")
     assert response.status_code == 200
     assert "LLM Gateway is running" in response.json()["message"]
+
+
+def test_lifespan_builds_engine_and_reports_startup(app_instance, client_instance):
+    assert app_instance.state.engine is not None
+    client_instance.get("/health")
+
+    response = client_instance.get("/api/v1/admin/lifecycle")
+    data = response.json()
+
+    assert data["startup_seconds"] > 0
+    assert data["first_request_seconds"] is not None
+    assert data["in_flight"] == 1  # 이 요청 자신
+
+
+def test_shutdown_flushes_the_last_usage_window(app_instance):
+    records = []
+    with TestClient(app_instance):
+        usage = app_instance.state.engine.usage
+        usage.sink = records.append
+        usage.record_request("npc", "gemini-2.0-flash", 0.1)
+
+    assert [row["client"] for row in records[0]["usage"]] == ["npc"]
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_requests():
+    tracker = RequestTracker()
+    tracker.enter()
+
+    assert await tracker.drain(timeout=0.01) == 1
+
+    asyncio.get_running_loop().call_later(0.01, tracker.exit)
+    assert await tracker.drain(timeout=1.0) == 0
+    assert tracker.draining